@@ -0,0 +1 @@
+# admin module
@@ -0,0 +1,203 @@
+# admin/caches.py
+"""
+One view over every in-process cache (entity, search and response namespaces, uniqueness
+filters, tree forests, reference bundle) for the /admin/cache endpoints: uniform stats, flush and warm-up hooks.
+"""
+import sys
+from typing import Any, Callable, Dict, Optional
+import entity_cache
+import forest
+import negative_cache
+from reference import bundle
+
+# Namespace -> function that fills it (opens its own session, returns a short detail)
+_warmers: Dict[str, Callable[[], Any]] = {}
+
+def register_warmer(name: str, warm: Callable[[], Any]):
+    """Pre-warm hook for a namespace, run by POST /admin/cache/{name}/warm"""
+    _warmers[name] = warm
+
+def approx_size(obj, _seen=None) -> int:
+    """Rough deep size in bytes (containers, ORM snapshots' attribute dicts)"""
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k, _seen) + approx_size(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item, _seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        state = {k: v for k, v in vars(obj).items() if k != "_sa_instance_state"}
+        size += approx_size(state, _seen)
+    return size
+
+def _entity_stats(ns: entity_cache.Namespace) -> Dict[str, Any]:
+    with ns.lock:
+        values = [value for _, value in ns.entries.values()]
+    # "search:persons" -> search, "responses:companies" -> responses, "companies" -> entity
+    kind = ns.name.split(":", 1)[0] if ":" in ns.name else "entity"
+    return {"kind": kind, "table": ns.table, **ns.stats(), "approx_bytes": sum(approx_size(v) for v in values)}
+
+def _negative_stats(index: negative_cache.UniqueIndex) -> Dict[str, Any]:
+    stats = index.stats()
+    checks = stats["checks"]
+    return {
+        "kind": "negative",
+        "table": index.table,
+        "entries": stats["bloom_values"] + stats["misses_cached"],
+        "approx_bytes": stats["bloom_bytes"] + approx_size(dict(index.misses)),
+        "hit_ratio": round(stats["served_without_db"] / checks, 4) if checks else None,
+        "evictions": None,
+        "age_seconds": None,
+        **stats,
+    }
+
+def _forest_stats(tree: forest.Forest) -> Dict[str, Any]:
+    stats = tree.stats()
+    return {
+        "kind": "forest",
+        "table": tree.table,
+        "entries": stats["nodes"],
+        "approx_bytes": approx_size(tree.hierarchy.rows) + approx_size(tree.hierarchy.children) + approx_size(tree.serialized),
+        "hit_ratio": None,
+        "evictions": None,
+        "age_seconds": stats["verified_seconds_ago"],
+        **stats,
+    }
+
+def _reference_stats() -> Optional[Dict[str, Any]]:
+    current = bundle._bundle
+    if current is None:
+        return None
+    info = current.info()
+    return {
+        "kind": "reference",
+        "table": "industries",
+        "entries": 1,
+        "approx_bytes": info["bytes"] + info["gzip_bytes"],
+        "hit_ratio": None,
+        "evictions": None,
+        **info,
+    }
+
+def namespaces() -> Dict[str, Dict[str, Any]]:
+    """Stats for every cache namespace currently present in this worker"""
+    result = {name: _entity_stats(ns) for name, ns in sorted(entity_cache.namespaces().items())}
+    for key, index in sorted(negative_cache.indexes().items()):
+        result[f"negative:{key}"] = _negative_stats(index)
+    for table, tree in sorted(forest.forests().items()):
+        result[f"forest:{table}"] = _forest_stats(tree)
+    reference = _reference_stats()
+    if reference is not None:
+        result["reference"] = reference
+    for name, stats in result.items():
+        stats["warmable"] = _warmer_for(name) is not None
+    return result
+
+def _entity_keys(key: str):
+    # Entity namespaces are keyed by record id, search namespaces by lowercased term
+    keys = {key, key.lower()}
+    if key.isdigit():
+        keys.add(int(key))
+    return keys
+
+def flush(name: str, key: Optional[str] = None) -> bool:
+    """
+    Flush a namespace (or one key of it); False if there is no such namespace.
+    Raises ValueError if the namespace cannot be flushed by key, KeyError if the key is not cached.
+    """
+    ns = entity_cache.namespaces().get(name)
+    if ns is not None:
+        if key is None:
+            ns.invalidate()
+            return True
+        if name.startswith("responses:"):
+            raise ValueError(f"{name} is keyed by data version - flush the whole namespace")
+        keys = _entity_keys(key)
+        with ns.lock:
+            cached = any(entry_key in keys for _, entry_key in ns.entries)
+        if not cached:
+            raise KeyError(f"Key not cached in {name}: {key}")
+        ns.invalidate(keys)
+        return True
+    if name.startswith("negative:"):
+        index = negative_cache.indexes().get(name[len("negative:"):])
+        if index is None:
+            return False
+        if key is None:
+            index.invalidate()
+            return True
+        with index.lock:
+            if index.misses.pop(index.normalize(key), None) is None:
+                raise KeyError(f"Key not cached in {name}: {key}")
+        return True
+    if name.startswith("forest:"):
+        tree = forest.forests().get(name[len("forest:"):])
+        if tree is None:
+            return False
+        if key is None:
+            tree.invalidate()
+        elif key.isdigit():
+            tree.changed([int(key)])
+        else:
+            raise ValueError(f"{name} is keyed by record id, got: {key}")
+        return True
+    if name == "reference":
+        if key is not None:
+            raise ValueError("reference holds a single bundle - flush it without a key")
+        bundle.clear()
+        return True
+    return False
+
+def _warmer_for(name: str) -> Optional[Callable[[], Any]]:
+    if name in _warmers:
+        return _warmers[name]
+    if name.startswith("negative:") and name[len("negative:"):] in negative_cache.indexes():
+        return _warm_negative(name[len("negative:"):])
+    if name.startswith("forest:") and name[len("forest:"):] in forest.forests():
+        return _warm_forest(name[len("forest:"):])
+    return None
+
+def warm(name: str) -> Optional[Dict[str, Any]]:
+    """Run the namespace's pre-warm hook; None if it has none"""
+    warmer = _warmer_for(name)
+    return None if warmer is None else {"detail": warmer()}
+
+def _warm_industries():
+    from database import ReadSessionLocal
+    from industries import crud as industry_crud
+
+    db = ReadSessionLocal()
+    try:
+        return {"rows": len(industry_crud.get_all_industries(db))}
+    finally:
+        db.close()
+
+def _warm_negative(key: str):
+    def warm():
+        from database import SessionLocal
+
+        index = negative_cache.indexes()[key]
+        db = SessionLocal()
+        try:
+            index.load(db)
+        finally:
+            db.close()
+        return {"values": index.bloom.count}
+    return warm
+
+def _warm_forest(table: str):
+    def warm():
+        tree = forest.forests()[table]
+        tree.refresh()
+        return {"nodes": len(tree.nodes)}
+    return warm
+
+def _warm_reference():
+    import warmup
+    return warmup.prime_reference_data()
+
+register_warmer("industries", _warm_industries)
+register_warmer("reference", _warm_reference)
@@ -0,0 +1,60 @@
+# admin/routes.py
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from . import caches
+
+# Every /admin request must send it in X-Admin-Token; without one configured /admin is closed
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled: ADMIN_TOKEN is not set")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+@router.get("/cache")
+def list_caches():
+    """Every cache namespace in this worker with entries, approximate memory, hit ratio, evictions and age"""
+    namespaces = caches.namespaces()
+    return {
+        "pid": os.getpid(),
+        "total_entries": sum(stats["entries"] for stats in namespaces.values()),
+        "total_approx_bytes": sum(stats["approx_bytes"] for stats in namespaces.values()),
+        "namespaces": namespaces,
+    }
+
+@router.get("/cache/{name}")
+def get_cache(name: str):
+    """Stats for one cache namespace"""
+    stats = caches.namespaces().get(name)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Cache namespace not found: {name}")
+    return stats
+
+@router.delete("/cache/{name}")
+def flush_cache(name: str, key: Optional[str] = Query(None, description="Flush only this key")):
+    """Flush a cache namespace, or a single key of it (this worker only)"""
+    try:
+        found = caches.flush(name, key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    if not found:
+        raise HTTPException(status_code=404, detail=f"Cache namespace not found: {name}")
+    return {"message": "Cache flushed", "namespace": name, "key": key}
+
+@router.post("/cache/{name}/warm")
+def warm_cache(name: str):
+    """Run the namespace's pre-warm hook"""
+    try:
+        result = caches.warm(name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error warming cache: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No warm-up hook for cache namespace: {name}")
+    return {"namespace": name, **result, "stats": caches.namespaces().get(name)}
@@ -0,0 +1,91 @@
+# admission.py
+"""
+Admission control: cap in-flight requests per route class at what the connection pool can
+serve and shed the excess immediately (503 + Retry-After) instead of letting it queue for a
+pool connection until DB_POOL_TIMEOUT
+"""
+import os
+import re
+import time
+from typing import Dict, Optional
+from database import DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+READS = "reads"
+WRITES = "writes"
+HEAVY = "heavy"
+
+# Seconds clients are told to wait before retrying a shed request
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+# One page load fires the tree and full-list endpoints together - never shed those on a small pool
+ADMISSION_HEAVY_FLOOR = int(os.getenv("ADMISSION_HEAVY_FLOOR", "4"))
+
+def default_limits() -> Dict[str, int]:
+    """Per-class limits derived from the pool (ADMISSION_LIMIT_<CLASS> overrides, 0 disables)"""
+    capacity = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    derived = {
+        READS: capacity,                   # every pool connection, overflow included
+        WRITES: max(1, DB_POOL_SIZE),      # writes hold their connection longest (flush + audit + commit)
+        HEAVY: max(ADMISSION_HEAVY_FLOOR, DB_POOL_SIZE // 2),  # full-table exports and trees never take the whole pool
+    }
+    return {name: int(os.getenv(f"ADMISSION_LIMIT_{name.upper()}", str(limit))) for name, limit in derived.items()}
+
+# Not subject to admission control: probes, docs and CORS preflights never touch the database pool,
+# and operators must still reach /admin while the worker is shedding load
+_exempt = re.compile(r"^/(health|ready|admin|docs|redoc|openapi\.json|routes)?(/|$)")
+_heavy = re.compile(r"/(all|tree|advanced-search)/?$|^/audit-logs/?$")
+# Served from the in-memory forests (forest.py) - they hold a pool connection only for deltas
+_forest_backed = re.compile(r"^/(companies|groups)/tree/?$|/tree/nodes/?$")
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class of a request, or None if it is exempt"""
+    if method == "OPTIONS" or _exempt.match(path):
+        return None
+    if method not in ("GET", "HEAD"):
+        return WRITES
+    if _heavy.search(path) and not _forest_backed.search(path):
+        return HEAVY
+    return READS
+
+class RouteClass:
+    """In-flight counter and shed statistics for one route class"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self.admitted = 0
+        self.shed = 0
+        self.last_shed_at: Optional[float] = None
+
+    def try_acquire(self) -> bool:
+        # Runs on the event loop thread, so plain counters are race-free
+        if self.limit and self.in_flight >= self.limit:
+            self.shed += 1
+            self.last_shed_at = time.time()
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak = max(self.peak, self.in_flight)
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    def status(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "peak": self.peak,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "last_shed_at": self.last_shed_at,
+        }
+
+route_classes: Dict[str, RouteClass] = {name: RouteClass(name, limit) for name, limit in default_limits().items()}
+
+def status() -> Dict:
+    return {
+        "retry_after": ADMISSION_RETRY_AFTER,
+        "classes": {name: route_class.status() for name, route_class in route_classes.items()},
+    }
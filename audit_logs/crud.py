@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, insert
 from typing import List, Optional
 from . import models, schemas
 from datetime import datetime
@@ -25,6 +25,12 @@ def create_audit_logs_batch(db: Session, audit_logs: List[schemas.AuditLogCreate
         db.refresh(db_audit_log)
     return db_audit_logs
 
+def insert_audit_logs(db: Session, audit_logs: List[schemas.AuditLogCreate]) -> int:
+    """Insert audit log entries with one executemany, within the caller's transaction (no commit)"""
+    if audit_logs:
+        db.execute(insert(models.AuditLog), [audit_log.dict() for audit_log in audit_logs])
+    return len(audit_logs)
+
 def get_audit_logs(
     db: Session, 
     skip: int = 0, 
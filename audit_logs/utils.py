@@ -225,6 +225,22 @@ def create_audit_logs_for_delete(
     user_name: Optional[str] = None
 ) -> List[schemas.AuditLogResponse]:
     """Create audit logs for a DELETE operation"""
+    audit_logs = delete_audit_entries(table_name, record_id, deleted_data, user_id, user_name)
+    
+    # Create logs in batch
+    if audit_logs:
+        db_logs = crud.create_audit_logs_batch(db, audit_logs)
+        return [schemas.AuditLogResponse.from_orm(log) for log in db_logs]
+    return []
+
+def delete_audit_entries(
+    table_name: str,
+    record_id: str,
+    deleted_data: Dict[str, Any],
+    user_id: Optional[str] = None,
+    user_name: Optional[str] = None
+) -> List[schemas.AuditLogCreate]:
+    """Audit entries describing one deleted record"""
     audit_logs = []
     
     for field_name, value in deleted_data.items():
@@ -241,12 +257,21 @@ def create_audit_logs_for_delete(
                 user_name=user_name
             )
             audit_logs.append(audit_log)
-    
-    # Create logs in batch
-    if audit_logs:
-        db_logs = crud.create_audit_logs_batch(db, audit_logs)
-        return [schemas.AuditLogResponse.from_orm(log) for log in db_logs]
-    return []
+    return audit_logs
+
+def add_audit_logs_for_subtree_delete(
+    db: Session,
+    table_name: str,
+    deleted_rows: List[Dict[str, Any]],
+    key: str = "record_id",
+    user_id: Optional[str] = None,
+    user_name: Optional[str] = None
+) -> int:
+    """Audit every row of a deleted subtree in one batched insert, inside the caller's transaction"""
+    audit_logs = []
+    for deleted_data in deleted_rows:
+        audit_logs.extend(delete_audit_entries(table_name, deleted_data[key], deleted_data, user_id, user_name))
+    return crud.insert_audit_logs(db, audit_logs)
 
 def model_to_dict(model_instance) -> Dict[str, Any]:
     """Convert SQLAlchemy model instance to dictionary using Python attribute names"""
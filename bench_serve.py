@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark requests/s: main:app in one uvicorn process vs the serve.py launcher
+
+    python bench_serve.py --duration 10 --concurrency 64 --path /industries/all
+
+With a2wsgi installed the Passenger entry point (passenger_wsgi.application, the WSGI wrapper)
+is measured too, under a single-threaded WSGI server. All servers run against the same local
+SQLite database (DATABASE_URL defaults to a temp file).
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# passenger_wsgi.application under wsgiref: one request at a time, like a Passenger process
+WSGI_SERVER = """
+import sys
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+from passenger_wsgi import application
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+make_server("127.0.0.1", int(sys.argv[1]), application, handler_class=QuietHandler).serve_forever()
+"""
+
+def has_a2wsgi() -> bool:
+    try:
+        import a2wsgi  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def wait_until_up(url: str, timeout: float = 30.0):
+    import httpx
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+async def hammer(url: str, duration: float, concurrency: int):
+    import httpx
+    done = 0
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client):
+        nonlocal done, errors
+        while time.perf_counter() < deadline:
+            try:
+                response = await client.get(url)
+                if response.status_code < 400:
+                    done += 1
+                else:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return done / elapsed, errors
+
+def run_case(name: str, command, port: int, args, env):
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(f"http://127.0.0.1:{port}/health")
+        rps, errors = asyncio.run(hammer(f"http://127.0.0.1:{port}{args.path}", args.duration, args.concurrency))
+        print(f"{name:<40} {rps:10.1f} req/s   errors: {errors}")
+        return rps
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--path", default="/industries/all")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    subprocess.run([sys.executable, "migrate.py"], cwd=BASE_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    print(f"GET {args.path} for {args.duration:.0f}s at concurrency {args.concurrency}")
+    if has_a2wsgi():
+        run_case(
+            "passenger_wsgi.application (WSGI, 1 thread)",
+            [sys.executable, "-c", WSGI_SERVER, "8100"],
+            8100, args, env
+        )
+    baseline = run_case(
+        "main:app (1 uvicorn process)",
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", "8101", "--log-level", "warning"],
+        8101, args, env
+    )
+    launcher = run_case(
+        f"serve.py ({args.workers} workers)",
+        [sys.executable, "serve.py", "--port", "8102", "--workers", str(args.workers), "--log-level", "warning"],
+        8102, args, env
+    )
+    if baseline:
+        print(f"Speedup: {launcher / baseline:.2f}x")
+
+if __name__ == "__main__":
+    main()
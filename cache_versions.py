@@ -0,0 +1,147 @@
+# cache_versions.py
+"""
+Cross-worker cache coherence through a shared memory-mapped version file: one 8-byte slot
+per table, rewritten whenever a worker commits a write to that table. Every worker compares
+the file with its last snapshot (at most once per CACHE_COHERENCE_INTERVAL_MS) and drops the
+cache namespaces whose slot changed. No Redis / memcached, one page of shared memory.
+"""
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_COHERENCE_INTERVAL_MS = float(os.getenv("CACHE_COHERENCE_INTERVAL_MS", "200"))
+
+SLOTS = 512
+SLOT = struct.Struct("<Q")
+FILE_SIZE = SLOTS * SLOT.size
+
+# Pseudo-table whose slot changes whenever the version file itself is created
+EPOCH = "__epoch__"
+
+def slot_of(table: str) -> int:
+    """Stable slot for a table in every process (a collision only costs an extra invalidation)"""
+    return zlib.crc32(table.encode()) % SLOTS
+
+def default_path() -> str:
+    """One version file per database, shared by every worker on the host"""
+    from database import SQLALCHEMY_DATABASE_URL
+    return os.getenv("CACHE_VERSION_FILE") or os.path.join(
+        tempfile.gettempdir(), f"dm_cache_versions_{zlib.crc32(SQLALCHEMY_DATABASE_URL.encode()):08x}.bin"
+    )
+
+class VersionFile:
+    """Memory-mapped table version slots"""
+
+    def __init__(self, path: str, interval_ms: float = None):
+        self.path = path
+        self.interval = (CACHE_COHERENCE_INTERVAL_MS if interval_ms is None else interval_ms) / 1000
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o664)
+        try:
+            created = os.fstat(fd).st_size < FILE_SIZE
+            if created:
+                os.ftruncate(fd, FILE_SIZE)
+            self.map = mmap.mmap(fd, FILE_SIZE)
+        finally:
+            os.close(fd)
+        self.lock = threading.Lock()
+        self.seen = self.map[:FILE_SIZE]
+        self.checked_at = time.monotonic()
+        self.checks = 0
+        self.stale_drops = 0
+        self.listeners: List[Callable[[List[int]], None]] = []
+        if created:
+            # A recreated file (e.g. /tmp cleared on reboot) must not repeat old versions
+            self.bump([EPOCH])
+
+    def version(self, table: str) -> int:
+        return SLOT.unpack_from(self.map, slot_of(table) * SLOT.size)[0]
+
+    def seen_version(self, table: str) -> int:
+        """Version as of this worker's last check - its caches hold nothing older"""
+        return SLOT.unpack_from(self.seen, slot_of(table) * SLOT.size)[0]
+
+    def bump(self, tables: Iterable[str]):
+        """Give each table a new version (called after this worker commits a write)"""
+        with self.lock:
+            for table in set(tables):
+                offset = slot_of(table) * SLOT.size
+                current = SLOT.unpack_from(self.map, offset)[0]
+                # Any value other than the one readers saw marks the slot stale
+                SLOT.pack_into(self.map, offset, max(time.time_ns(), current + 1) & 0xFFFFFFFFFFFFFFFF)
+                if self.seen[offset:offset + SLOT.size] == SLOT.pack(current):
+                    # Nothing unseen from other workers in this slot - don't report our own write back to us
+                    self.seen = self.seen[:offset] + self.map[offset:offset + SLOT.size] + self.seen[offset + SLOT.size:]
+
+    def check(self, force: bool = False) -> List[int]:
+        """Slots changed since the last check; listeners drop their matching namespaces"""
+        now = time.monotonic()
+        if not force and now - self.checked_at < self.interval:
+            return []
+        with self.lock:
+            self.checked_at = now
+            self.checks += 1
+            current = self.map[:FILE_SIZE]
+            if current == self.seen:
+                return []
+            changed = [i for i in range(SLOTS)
+                       if current[i * SLOT.size:(i + 1) * SLOT.size] != self.seen[i * SLOT.size:(i + 1) * SLOT.size]]
+            self.seen = current
+        self.stale_drops += len(changed)
+        for listener in self.listeners:
+            listener(changed)
+        return changed
+
+    def status(self) -> Dict:
+        return {
+            "path": self.path,
+            "interval_ms": self.interval * 1000,
+            "checks": self.checks,
+            "stale_slots_dropped": self.stale_drops,
+        }
+
+_versions: Optional[VersionFile] = None
+_disabled = False
+_versions_lock = threading.Lock()
+_listeners: List[Callable[[List[int]], None]] = []
+
+def versions() -> Optional[VersionFile]:
+    """The shared version file, opened on first use (None if it cannot be created)"""
+    global _versions, _disabled
+    if _versions is None and not _disabled:
+        with _versions_lock:
+            if _versions is None and not _disabled:
+                try:
+                    _versions = VersionFile(default_path())
+                    _versions.listeners.extend(_listeners)
+                except (OSError, ValueError) as e:
+                    logger.warning("Cross-worker cache coherence disabled: %s", e)
+                    _disabled = True
+    return _versions
+
+def on_stale(listener: Callable[[List[int]], None]):
+    """Register a callback receiving the slots another worker changed"""
+    _listeners.append(listener)
+    if _versions is not None:
+        _versions.listeners.append(listener)
+
+def bump(tables: Iterable[str]):
+    vf = versions()
+    if vf is not None:
+        vf.bump(tables)
+
+def check(force: bool = False):
+    vf = versions()
+    if vf is not None:
+        vf.check(force)
+
+def version(table: str) -> int:
+    vf = versions()
+    return vf.version(table) if vf is not None else 0
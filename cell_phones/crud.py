@@ -1,7 +1,9 @@
 # cell_phones/crud.py
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, func, select
 from typing import List, Optional, Tuple
+import negative_cache
 from . import models, schemas
 
 
@@ -34,9 +36,18 @@ def get_phone(db: Session, phone_id: int) -> Optional[models.CellPhoneDirectory]
     return db.query(models.CellPhoneDirectory).filter(models.CellPhoneDirectory.phone_id == phone_id).first()
 
 
+# Answers "definitely not registered" for new numbers without a query
+phone_number_index = negative_cache.register(models.CellPhoneDirectory.phone_number)
+
 def get_phone_by_number(db: Session, phone_number: str) -> Optional[models.CellPhoneDirectory]:
     """Get a phone by phone number"""
-    return db.query(models.CellPhoneDirectory).filter(models.CellPhoneDirectory.phone_number == phone_number).first()
+    if not phone_number_index.might_exist(phone_number):
+        return None
+    generation = phone_number_index.generation
+    phone = db.query(models.CellPhoneDirectory).filter(models.CellPhoneDirectory.phone_number == phone_number).first()
+    if phone is None:
+        phone_number_index.record_miss(phone_number, generation)
+    return phone
 
 
 def get_phones(db: Session, skip: int = 0, limit: int = 100) -> List[models.CellPhoneDirectory]:
@@ -201,4 +212,92 @@ def create_phone_with_associations(
         db_association = create_association(db, assoc_data)
         db_associations.append(db_association)
     
-    return db_phone, db_associations
\ No newline at end of file
+    return db_phone, db_associations
+
+
+# Async read operations (used by the async GET routes)
+async def get_phone_async(db: AsyncSession, phone_id: int) -> Optional[models.CellPhoneDirectory]:
+    """Get a phone by ID"""
+    result = await db.execute(select(models.CellPhoneDirectory).where(models.CellPhoneDirectory.phone_id == phone_id))
+    return result.scalars().first()
+
+
+async def get_phones_async(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.CellPhoneDirectory]:
+    """Get phones with pagination"""
+    result = await db.execute(select(models.CellPhoneDirectory).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+
+async def get_all_phones_async(db: AsyncSession) -> List[models.CellPhoneDirectory]:
+    """Get all phones"""
+    result = await db.execute(select(models.CellPhoneDirectory))
+    return list(result.scalars().all())
+
+
+async def search_phones_async(db: AsyncSession, search_term: str) -> List[models.CellPhoneDirectory]:
+    """Search phones by number or description"""
+    search_pattern = f"%{search_term}%"
+    result = await db.execute(
+        select(models.CellPhoneDirectory).where(
+            or_(
+                models.CellPhoneDirectory.phone_number.like(search_pattern),
+                models.CellPhoneDirectory.description.like(search_pattern)
+            )
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def get_phone_with_associations_async(db: AsyncSession, phone_id: int) -> Optional[models.CellPhoneDirectory]:
+    """Get a phone with its associations"""
+    result = await db.execute(
+        select(models.CellPhoneDirectory)
+        .options(selectinload(models.CellPhoneDirectory.associations))
+        .where(models.CellPhoneDirectory.phone_id == phone_id)
+    )
+    return result.scalars().first()
+
+
+async def search_phones_with_associations_async(
+    db: AsyncSession,
+    search_term: Optional[str] = None,
+    company_id: Optional[int] = None,
+    person_id: Optional[int] = None,
+    department: Optional[str] = None
+) -> List[models.CellPhoneDirectory]:
+    """Advanced search for phones with association filters"""
+    query = select(models.CellPhoneDirectory).options(
+        selectinload(models.CellPhoneDirectory.associations)
+    )
+    
+    # Apply phone search filter
+    if search_term:
+        search_pattern = f"%{search_term}%"
+        query = query.where(
+            or_(
+                models.CellPhoneDirectory.phone_number.like(search_pattern),
+                models.CellPhoneDirectory.description.like(search_pattern)
+            )
+        )
+    
+    # Apply association filters by joining with associations table
+    if company_id or person_id or department:
+        query = query.join(models.CellPhoneAssociation)
+        
+        if company_id:
+            query = query.where(models.CellPhoneAssociation.company_id == company_id)
+        
+        if person_id:
+            query = query.where(models.CellPhoneAssociation.person_id == person_id)
+        
+        if department:
+            query = query.where(models.CellPhoneAssociation.departments.contains([department]))
+    
+    result = await db.execute(query.distinct())
+    return list(result.scalars().all())
+
+
+async def get_associations_by_phone_async(db: AsyncSession, phone_id: int) -> List[models.CellPhoneAssociation]:
+    """Get all associations for a specific phone"""
+    result = await db.execute(select(models.CellPhoneAssociation).where(models.CellPhoneAssociation.phone_id == phone_id))
+    return list(result.scalars().all())
@@ -1,8 +1,9 @@
 # cell_phones/routes.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_async_read_db
 from . import crud, schemas
 from audit_logs.utils import create_audit_logs_for_create, create_audit_logs_for_update, create_audit_logs_for_delete, model_to_dict
 
@@ -82,36 +83,36 @@ def create_phone_with_associations(request: schemas.CellPhoneCreateRequest, db:
         raise HTTPException(status_code=400, detail=f"Error creating phone: {str(e)}")
 
 @router.get("/", response_model=List[schemas.CellPhoneDirectory])
-def read_phones(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_phones(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_read_db)):
     """Get phones with pagination"""
-    phones = crud.get_phones(db, skip=skip, limit=limit)
+    phones = await crud.get_phones_async(db, skip=skip, limit=limit)
     return phones
 
 @router.get("/all", response_model=List[schemas.CellPhoneDirectory])
-def read_all_phones(db: Session = Depends(get_db)):
+async def read_all_phones(db: AsyncSession = Depends(get_async_read_db)):
     """Get all phones"""
-    phones = crud.get_all_phones(db)
+    phones = await crud.get_all_phones_async(db)
     return phones
 
 @router.get("/search", response_model=List[schemas.CellPhoneDirectory])
-def search_phones(q: str = Query(..., description="Search term"), db: Session = Depends(get_db)):
+async def search_phones(q: str = Query(..., description="Search term"), db: AsyncSession = Depends(get_async_read_db)):
     """Search phones by number or description"""
     if len(q.strip()) < 2:
         raise HTTPException(status_code=400, detail="Search term must be at least 2 characters")
     
-    phones = crud.search_phones(db, q)
+    phones = await crud.search_phones_async(db, q)
     return phones
 
 @router.get("/advanced-search", response_model=List[schemas.CellPhoneWithAssociations])
-def advanced_search_phones(
+async def advanced_search_phones(
     q: Optional[str] = Query(None, description="Search term"),
     company_id: Optional[int] = Query(None, description="Company ID"),
     person_id: Optional[int] = Query(None, description="Person ID"),
     department: Optional[str] = Query(None, description="Department"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Advanced search for phones with association filters"""
-    phones = crud.search_phones_with_associations(
+    phones = await crud.search_phones_with_associations_async(
         db=db, 
         search_term=q, 
         company_id=company_id, 
@@ -121,9 +122,9 @@ def advanced_search_phones(
     return phones
 
 @router.get("/{phone_id}", response_model=schemas.CellPhoneWithAssociations)
-def read_phone(phone_id: int, db: Session = Depends(get_db)):
+async def read_phone(phone_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific phone with its associations"""
-    db_phone = crud.get_phone_with_associations(db, phone_id=phone_id)
+    db_phone = await crud.get_phone_with_associations_async(db, phone_id=phone_id)
     if db_phone is None:
         raise HTTPException(status_code=404, detail="Phone not found")
     return db_phone
@@ -247,14 +248,14 @@ def create_phone_association(
         raise HTTPException(status_code=400, detail=f"Error creating association: {str(e)}")
 
 @router.get("/{phone_id}/associations", response_model=List[schemas.CellPhoneAssociation])
-def get_phone_associations(phone_id: int, db: Session = Depends(get_db)):
+async def get_phone_associations(phone_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get all associations for a specific phone"""
     # Check if phone exists
-    phone = crud.get_phone(db, phone_id)
+    phone = await crud.get_phone_async(db, phone_id)
     if not phone:
         raise HTTPException(status_code=404, detail="Phone not found")
     
-    associations = crud.get_associations_by_phone(db, phone_id)
+    associations = await crud.get_associations_by_phone_async(db, phone_id)
     return associations
 
 @router.put("/associations/{association_id}", response_model=schemas.CellPhoneAssociation)
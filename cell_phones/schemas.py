@@ -3,44 +3,13 @@ from pydantic import BaseModel, field_validator
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+from reference.schemas import Department  # shared department list
 
 # Status enum
 class PhoneStatus(str, Enum):
     ACTIVE = "Active"
     INACTIVE = "Inactive"
 
-# Department enum (same as emails)
-class Department(str, Enum):
-    BOARD_MEMBER = "Board Member"
-    MANAGEMENT_ALL = "Management All"
-    MANAGEMENT_OPERATIONS = "Management Operations"
-    MANAGEMENT_ADMINISTRATION = "Management Administration"
-    ENGINEERING_DEPARTMENT = "Engineering Department"
-    RESEARCH_DEVELOPMENT = "Research & Development"
-    REGULATORY_LEGAL = "Regulatory & Legal"
-    QUALITY_CONTROL = "Quality Control"
-    HUMAN_RESOURCE = "Human Resource"
-    TRAINING_DEVELOPMENT = "Training & Development"
-    PURCHASE_PROCUREMENT = "Purchase & Procurement"
-    LOGISTICS_DISTRIBUTION = "Logistics & Distribution"
-    FINANCE_ACCOUNTS = "Finance & Accounts"
-    AUDIT_DEPARTMENT = "Audit Department"
-    INFORMATION_TECHNOLOGY = "Information Technology"
-    CREATIVE_DEPARTMENT = "Creative Department"
-    CUSTOMER_SUPPORT = "Customer Support"
-    SALES_SUPPORT = "Sales & Support"
-    MARKETING_SALES = "Marketing & Sales"
-    MARKETING_PLANNING = "Marketing & Planning"
-    MARKETING_DIGITAL = "Marketing & Digital"
-    ECOMMERCE_DEPARTMENT = "eCommerce Department"
-    PR_DEPARTMENT = "PR Department"
-    EDITORIAL_DEPARTMENT = "Editorial Department"
-    IMPORT_EXPORT = "Import Export"
-    PROTOCOL_SECURITY = "Protocol & Security"
-    EXAMINATION_DEPARTMENT = "Examination Department"
-    ACADEMICS_DEPARTMENT = "Academics Department"
-    ADMISSIONS_DEPARTMENT = "Admissions Department"
-
 # Cell Phone Directory Schemas
 class CellPhoneDirectoryBase(BaseModel):
     phone_number: str
@@ -1,36 +1,51 @@
 # companies/crud.py
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from typing import List, Optional
+import entity_cache
+import forest
+import hierarchy
+import search_cache
+import tree_nodes
+from audit_logs.utils import add_audit_logs_for_subtree_delete
 from . import models, schemas
 
+def attach_operations(company: models.Company) -> models.Company:
+    """Attach the operations object derived from business_operations to a company"""
+    # Convert business_operations back to operations object for frontend compatibility
+    if hasattr(company, 'business_operations') and company.business_operations:
+        operations_list = [op.strip() for op in company.business_operations.split(',')]
+        # Create operations object
+        operations = {
+            'imports': 'imports' in operations_list,
+            'exports': 'exports' in operations_list,
+            'manufacture': 'manufacture' in operations_list,
+            'distribution': 'distribution' in operations_list,
+            'wholesale': 'wholesale' in operations_list,
+            'retail': 'retail' in operations_list,
+            'services': 'services' in operations_list,
+            'online': 'online' in operations_list,
+            'soft_products': 'soft_products' in operations_list,
+        }
+        # Add operations as a dynamic attribute for the response
+        company.operations = operations
+    else:
+        company.operations = {
+            'imports': False, 'exports': False, 'manufacture': False,
+            'distribution': False, 'wholesale': False, 'retail': False,
+            'services': False, 'online': False, 'soft_products': False,
+        }
+    return company
+
 def get_company(db: Session, record_id: int) -> Optional[models.Company]:
     """Get a single company by ID"""
-    company = db.query(models.Company).filter(models.Company.record_id == record_id).first()
+    company = entity_cache.get_one(
+        db, models.Company, record_id,
+        lambda: db.query(models.Company).filter(models.Company.record_id == record_id).first()
+    )
     if company:
-        # Convert business_operations back to operations object for frontend compatibility
-        if hasattr(company, 'business_operations') and company.business_operations:
-            operations_list = [op.strip() for op in company.business_operations.split(',')]
-            # Create operations object
-            operations = {
-                'imports': 'imports' in operations_list,
-                'exports': 'exports' in operations_list,
-                'manufacture': 'manufacture' in operations_list,
-                'distribution': 'distribution' in operations_list,
-                'wholesale': 'wholesale' in operations_list,
-                'retail': 'retail' in operations_list,
-                'services': 'services' in operations_list,
-                'online': 'online' in operations_list,
-                'soft_products': 'soft_products' in operations_list,
-            }
-            # Add operations as a dynamic attribute for the response
-            company.operations = operations
-        else:
-            company.operations = {
-                'imports': False, 'exports': False, 'manufacture': False,
-                'distribution': False, 'wholesale': False, 'retail': False,
-                'services': False, 'online': False, 'soft_products': False,
-            }
+        attach_operations(company)
     return company
 
 def get_companies(db: Session, skip: int = 0, limit: int = 100) -> List[models.Company]:
@@ -113,20 +128,13 @@ def update_company(db: Session, record_id: int, company: schemas.CompanyUpdate)
         db.refresh(db_company)
     return db_company
 
-def delete_company(db: Session, record_id: int) -> bool:
-    """Delete a company and all its children"""
-    db_company = get_company(db, record_id)
-    if db_company:
-        # First delete all children recursively
-        children = db.query(models.Company).filter(models.Company.parent_id == record_id).all()
-        for child in children:
-            delete_company(db, child.record_id)
-
-        # Then delete the company itself
-        db.delete(db_company)
+def delete_company(db: Session, record_id: int, user_id: Optional[str] = None, user_name: Optional[str] = None) -> int:
+    """Delete a company and all its children in one transaction, auditing every deleted row; returns the number deleted"""
+    deleted = hierarchy.delete_subtree(db, models.Company, record_id)
+    if deleted:
+        add_audit_logs_for_subtree_delete(db, "companies", deleted, user_id=user_id, user_name=user_name)
         db.commit()
-        return True
-    return False
+    return len(deleted)
 
 def get_companies_by_type(db: Session, company_type: str) -> List[models.Company]:
     """Get companies filtered by type"""
@@ -153,6 +161,23 @@ def get_company_children(db: Session, parent_id: int) -> List[models.Company]:
     """Get direct children of a company"""
     return db.query(models.Company).filter(models.Company.parent_id == parent_id).all()
 
+company_forest = forest.register(models.Company)
+
+def build_company_tree() -> List[dict]:
+    """Nested company tree, walked from the in-memory forest"""
+    return company_forest.tree(lambda company: schemas.Company.from_orm(company).dict())
+
+def get_company_tree_nodes(parent_id: Optional[int] = None, depth: int = 1, cursor: Optional[int] = None, limit: int = 100) -> Optional[dict]:
+    """A page of lightweight company nodes under parent_id (None if the parent does not exist)"""
+    def page(view):
+        if parent_id is not None and parent_id not in view:
+            return None
+        return tree_nodes.expand(
+            view, lambda company: {"name": company.company_group_print_name, "type": company.company_group_data_type},
+            parent_id, depth, cursor, limit,
+        )
+    return company_forest.read(page)
+
 def update_company_parent(db: Session, company_id: int, new_parent_id: Optional[int]) -> Optional[models.Company]:
     """Update a company's parent relationship"""
     db_company = get_company(db, company_id)
@@ -166,4 +191,51 @@ def update_company_parent(db: Session, company_id: int, new_parent_id: Optional[
         db_company.parent_id = new_parent_id
         db.commit()
         db.refresh(db_company)
-    return db_company
\ No newline at end of file
+    return db_company
+
+
+# Async read operations (used by the async GET routes)
+async def get_company_async(db: AsyncSession, record_id: int) -> Optional[models.Company]:
+    """Get a single company by ID"""
+    async def load():
+        result = await db.execute(select(models.Company).where(models.Company.record_id == record_id))
+        return result.scalars().first()
+    company = await entity_cache.get_one_async(db, models.Company, record_id, load)
+    if company:
+        attach_operations(company)
+    return company
+
+async def get_companies_async(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Company]:
+    """Get companies with pagination"""
+    result = await db.execute(select(models.Company).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def get_all_companies_async(db: AsyncSession) -> List[models.Company]:
+    """Get all companies"""
+    result = await db.execute(select(models.Company))
+    return list(result.scalars().all())
+
+async def get_companies_by_type_async(db: AsyncSession, company_type: str) -> List[models.Company]:
+    """Get companies filtered by type"""
+    result = await db.execute(
+        select(models.Company).where(models.Company.company_group_data_type == company_type)
+    )
+    return list(result.scalars().all())
+
+COMPANY_SEARCH_FIELDS = ("company_group_print_name", "legal_name", "other_names")
+
+async def search_companies_async(db: AsyncSession, search_term: str) -> List[models.Company]:
+    """Search companies by name or legal name"""
+    async def load():
+        search_pattern = f"%{search_term}%"
+        result = await db.execute(
+            select(models.Company).where(
+                or_(
+                    models.Company.company_group_print_name.ilike(search_pattern),
+                    models.Company.legal_name.ilike(search_pattern),
+                    models.Company.other_names.ilike(search_pattern)
+                )
+            )
+        )
+        return list(result.scalars().all())
+    return await search_cache.search_async(db, models.Company, search_term, COMPANY_SEARCH_FIELDS, load)
@@ -1,10 +1,12 @@
 # companies/routes.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_async_read_db
+import tree_nodes
 from . import crud, schemas
-from audit_logs.utils import create_audit_logs_for_create, create_audit_logs_for_update, create_audit_logs_for_delete, model_to_dict
+from audit_logs.utils import create_audit_logs_for_create, create_audit_logs_for_update, model_to_dict
 
 router = APIRouter()
 
@@ -38,58 +40,62 @@ def create_company(company: schemas.CompanyCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=400, detail=f"Error creating company: {str(e)}")
 
 @router.get("/", response_model=List[schemas.Company])
-def read_companies(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_companies(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_read_db)):
     """Get companies with pagination"""
-    companies = crud.get_companies(db, skip=skip, limit=limit)
+    companies = await crud.get_companies_async(db, skip=skip, limit=limit)
     return companies
 
 @router.get("/all", response_model=List[schemas.Company])
-def read_all_companies(db: Session = Depends(get_db)):
+async def read_all_companies(db: AsyncSession = Depends(get_async_read_db)):
     """Get all companies"""
-    companies = crud.get_all_companies(db)
+    companies = await crud.get_all_companies_async(db)
     return companies
 
 @router.get("/tree", response_model=List[schemas.CompanyWithChildren])
-def get_company_tree(db: Session = Depends(get_db)):
+def get_company_tree():
     """Get company hierarchy tree"""
     try:
-        top_level_companies = crud.get_company_hierarchy(db)
-
-        def build_tree(company):
-            children = crud.get_company_children(db, company.record_id)
-            return {
-                **schemas.Company.from_orm(company).dict(),
-                "children": [build_tree(child) for child in children]
-            }
-
-        return [build_tree(company) for company in top_level_companies]
+        return crud.build_company_tree()
     except Exception as e:
         print(f"Error getting company tree: {e}")  # Add logging
         raise HTTPException(status_code=500, detail=f"Error getting company tree: {str(e)}")
 
+@router.get("/tree/nodes", response_model=tree_nodes.TreeNodePage)
+def get_company_tree_nodes(
+    parent_id: Optional[int] = Query(None, description="Expand this company's children (roots when omitted)"),
+    depth: int = Query(1, ge=1, le=tree_nodes.TREE_NODES_MAX_DEPTH, description="Levels to expand"),
+    cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=tree_nodes.TREE_NODES_MAX_LIMIT, description="Nodes per sibling list"),
+):
+    """Get one level (or a few) of the company tree as lightweight, paginated nodes"""
+    page = crud.get_company_tree_nodes(parent_id, depth, cursor, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return page
+
 @router.get("/search", response_model=List[schemas.Company])
-def search_companies(q: str = Query("", description="Search term"), db: Session = Depends(get_db)):
+async def search_companies(q: str = Query("", description="Search term"), db: AsyncSession = Depends(get_async_read_db)):
     """Search companies by name"""
     if len(q.strip()) < 1:
-        return crud.get_all_companies(db)
+        return await crud.get_all_companies_async(db)
 
-    companies = crud.search_companies(db, q)
+    companies = await crud.search_companies_async(db, q)
     return companies
 
 @router.get("/by-type/{company_type}", response_model=List[schemas.Company])
-def get_companies_by_type(company_type: str, db: Session = Depends(get_db)):
+async def get_companies_by_type(company_type: str, db: AsyncSession = Depends(get_async_read_db)):
     """Get companies filtered by type"""
     valid_types = ["Company", "Group", "Division"]
     if company_type not in valid_types:
         raise HTTPException(status_code=400, detail=f"Invalid company type. Must be one of: {valid_types}")
 
-    companies = crud.get_companies_by_type(db, company_type)
+    companies = await crud.get_companies_by_type_async(db, company_type)
     return companies
 
 @router.get("/{company_id}", response_model=schemas.Company)
-def read_company(company_id: int, db: Session = Depends(get_db)):
+async def read_company(company_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific company by ID"""
-    db_company = crud.get_company(db, record_id=company_id)  # Fixed: parameter name should be 'record_id'
+    db_company = await crud.get_company_async(db, record_id=company_id)  # Fixed: parameter name should be 'record_id'
     if db_company is None:
         raise HTTPException(status_code=404, detail="Company not found")
     return db_company
@@ -144,29 +150,17 @@ def update_company(company_id: int, company: schemas.CompanyUpdate, db: Session
 @router.delete("/{company_id}")
 def delete_company(company_id: int, db: Session = Depends(get_db)):
     """Delete a company and all its children"""
-    # Get the company data before deletion for audit logging
-    existing_company = crud.get_company(db, company_id)
-    if existing_company is None:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
-    company_data = model_to_dict(existing_company)
-    
-    success = crud.delete_company(db, company_id)
-    if not success:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
-    # Create audit logs for the deletion
-    audit_logs = create_audit_logs_for_delete(
-        db=db,
-        table_name="companies",
-        record_id=str(company_id),
-        deleted_data=company_data,
+    # Every deleted row is audited in the same transaction as the delete
+    deleted_count = crud.delete_company(
+        db, company_id,
         user_id="system",  # TODO: Replace with actual user ID from authentication
         user_name="System User"  # TODO: Replace with actual user name from authentication
     )
-    print(f"AUDIT: Created {len(audit_logs)} audit log entries for company deletion")
+    if not deleted_count:
+        raise HTTPException(status_code=404, detail="Company not found")
+    print(f"AUDIT: Created audit log entries for {deleted_count} deleted companies")
     
-    return {"message": "Company and its children deleted successfully"}
+    return {"message": "Company and its children deleted successfully", "deleted_count": deleted_count}
 
 @router.post("/update-parent", response_model=schemas.Company)
 def update_company_parent(
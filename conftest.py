@@ -0,0 +1,14 @@
+"""
+Point the test suite at a throwaway local SQLite database instead of the production MySQL host
+"""
+import os
+import tempfile
+
+_test_db_dir = tempfile.mkdtemp(prefix="dm_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_test_db_dir, 'test.db')}")
+
+# Tables are created by the migrations rather than at import time
+from database import engine
+from schema_version import migrate
+
+migrate(engine)
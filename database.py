@@ -1,40 +1,170 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
-
-# MySQL connection - replace with your actual credentials
-DB_HOST = "magicfingers.com.pk"  # Production host
-DB_USER = "magicfin_industries"
-DB_PASSWORD = "magicfin_industries"
-DB_NAME = "magicfin_industries"
-
-SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-
-# Configure engine with connection pool and timeout settings
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,  # Validates connections before use
-    pool_recycle=3600,   # Recycle connections every hour
-    pool_timeout=30,     # Timeout when getting connection from pool
-    max_overflow=20,     # Allow up to 20 connections beyond pool_size
-    echo=False           # Set to True for debugging SQL queries
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
-
-def get_db():
-    """Dependency to get database session with retry logic"""
-    db = SessionLocal()
-    try:
-        # Test the connection to ensure it's alive
-        db.execute(text("SELECT 1"))
-        yield db
-    except Exception as e:
-        # If connection fails, try to recreate it
-        db.close()
-        db = SessionLocal()
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from fastapi import Request, Response
+from health.pool import TimedQueuePool, TimedAsyncQueuePool, PoolPinger
+from query_stats import instrument_engine
+from deadlines import install_deadlines
+import entity_cache  # registers the session commit hooks, so every writer keeps the caches coherent
+import os
+import time
+
+# MySQL connection - replace with your actual credentials
+DB_HOST = "magicfingers.com.pk"  # Production host
+DB_USER = "magicfin_industries"
+DB_PASSWORD = "magicfin_industries"
+DB_NAME = "magicfin_industries"
+
+# DATABASE_URL overrides the production MySQL URL (e.g. sqlite:///./local.db for offline work)
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+)
+
+def is_sqlite_url(url) -> bool:
+    """Check whether a database URL points at SQLite"""
+    return make_url(url).get_backend_name() == "sqlite"
+
+def to_async_url(url) -> str:
+    """Map a sync database URL onto the matching asyncio driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "mysql":
+        url = url.set(drivername="mysql+aiomysql")
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+# Connection pool settings (override through the environment per deployment)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+# Idle connections are checked by the background pinger, so checkout-time pings are off by default
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+# The pinger's thread cannot use the event-loop bound async pools - they keep checkout-time pings
+DB_ASYNC_POOL_PRE_PING = os.getenv("DB_ASYNC_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_PING_INTERVAL = float(os.getenv("DB_PING_INTERVAL", "60"))
+
+def make_engine(url):
+    """Create a sync engine with the shared pool settings"""
+    # SQLite connections are shared across FastAPI's threadpool workers
+    connect_args = {"check_same_thread": False} if is_sqlite_url(url) else {}
+    sync_engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,         # QueuePool that records checkout wait times
+        pool_size=DB_POOL_SIZE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,     # Recycle connections before the server drops them
+        pool_timeout=DB_POOL_TIMEOUT,     # Timeout when getting connection from pool
+        max_overflow=DB_MAX_OVERFLOW,     # Connections allowed beyond pool_size
+        echo=False,                       # Set to True for debugging SQL queries
+        connect_args=connect_args
+    )
+    return instrument_engine(install_deadlines(sync_engine))
+
+def make_async_engine(url):
+    """Create an async engine with the shared pool settings"""
+    try:
+        new_engine = create_async_engine(
+            url,
+            poolclass=TimedAsyncQueuePool,
+            pool_size=DB_POOL_SIZE,
+            pool_pre_ping=DB_ASYNC_POOL_PRE_PING,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_timeout=DB_POOL_TIMEOUT,
+            max_overflow=DB_MAX_OVERFLOW,
+            echo=False
+        )
+    except ImportError as e:
+        # The list / search / get-by-id routes all read through the async engine - refuse to start without it
+        raise RuntimeError(
+            f"Async database driver for {make_url(url).drivername} is not installed ({e}) - run `pip install -r requirements.txt`"
+        ) from e
+    instrument_engine(install_deadlines(new_engine.sync_engine))
+    return new_engine
+
+def make_async_sessionmaker(bind):
+    return async_sessionmaker(bind=bind, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Primary (read-write) database
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Started and stopped by the application lifespan in main.py
+pool_pinger = PoolPinger(engine, interval=DB_PING_INTERVAL)
+
+# Async engine for the read-heavy routes (aiomysql in production, aiosqlite locally)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL))
+async_engine = make_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = make_async_sessionmaker(async_engine)
+
+# Read replica - list, search, tree and get-by-id routes read from here when configured
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+if READ_DATABASE_URL:
+    read_engine = make_engine(READ_DATABASE_URL)
+    read_pool_pinger = PoolPinger(read_engine, interval=DB_PING_INTERVAL)
+    ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_READ_DATABASE_URL", to_async_url(READ_DATABASE_URL))
+    async_read_engine = make_async_engine(ASYNC_READ_DATABASE_URL)
+else:
+    # No replica configured - reads share the primary pools
+    read_engine = engine
+    read_pool_pinger = None
+    async_read_engine = async_engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = make_async_sessionmaker(async_read_engine)
+
+# Read-your-writes: after a write the client reads from the primary for this many seconds
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+PRIMARY_PIN_COOKIE = "db_primary_until"
+PRIMARY_PIN_HEADER = "X-DB-Primary-Until"
+
+Base = declarative_base()
+
+def get_db():
+    """Dependency to get a database session"""
+    # Liveness is handled by pool_pinger/pool_recycle, not by a per-request SELECT 1
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pin_to_primary(response: Response) -> float:
+    """Pin the client to the primary for READ_YOUR_WRITES_SECONDS after a write"""
+    until = time.time() + READ_YOUR_WRITES_SECONDS
+    response.set_cookie(PRIMARY_PIN_COOKIE, f"{until:.3f}", max_age=int(READ_YOUR_WRITES_SECONDS) + 1, httponly=True)
+    response.headers[PRIMARY_PIN_HEADER] = f"{until:.3f}"
+    return until
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """Check whether the client wrote recently (cookie or echoed header)"""
+    value = request.headers.get(PRIMARY_PIN_HEADER) or request.cookies.get(PRIMARY_PIN_COOKIE)
+    if not value:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+def get_read_db(request: Request):
+    """Dependency to get a session on the read replica (primary if the client is pinned)"""
+    session_factory = SessionLocal if is_pinned_to_primary(request) else ReadSessionLocal
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    """Dependency to get an async session on the read replica (primary if the client is pinned)"""
+    session_factory = AsyncSessionLocal if is_pinned_to_primary(request) else AsyncReadSessionLocal
+    async with session_factory() as db:
+        yield db
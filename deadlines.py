@@ -0,0 +1,141 @@
+# deadlines.py
+"""
+Per-request statement deadlines: each router gets a time budget and the database stops
+any statement still running when it runs out (MAX_EXECUTION_TIME on MySQL, a progress
+handler on SQLite). The request then fails fast with a 503 instead of holding a worker.
+"""
+import logging
+import os
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# SQLite calls the progress handler every this many virtual machine instructions
+SQLITE_PROGRESS_STEPS = int(os.getenv("SQLITE_PROGRESS_STEPS", "1000"))
+
+# MySQL: 3024 = maximum statement execution time exceeded, 1317 = query execution was interrupted
+MYSQL_TIMEOUT_ERRORS = (3024, 1317)
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("statement_deadline", default=None)
+
+_select = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+class DeadlineExceeded(Exception):
+    """Raised before a statement is sent once the request's budget is already spent"""
+
+class Deadline:
+    """Time budget shared by every statement of one request"""
+
+    def __init__(self):
+        self.budget_ms: Optional[int] = None
+        self.expires_at: Optional[float] = None
+        self.expired = False
+
+    def arm(self, budget_ms: int):
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000
+
+    def remaining_ms(self) -> Optional[int]:
+        if self.expires_at is None:
+            return None
+        return int((self.expires_at - time.monotonic()) * 1000)
+
+def budget_ms(name: str, default: int) -> int:
+    """Deadline for a router, overridable with DB_DEADLINE_MS_<NAME> (0 disables)"""
+    return int(os.getenv(f"DB_DEADLINE_MS_{name.upper()}", str(default)))
+
+def start_request():
+    """Give the current request an (unarmed) deadline, returns (token, deadline)"""
+    deadline = Deadline()
+    return _current_deadline.set(deadline), deadline
+
+def finish_request(token):
+    _current_deadline.reset(token)
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+def statement_deadline(ms: int):
+    """Router dependency arming the request's deadline: include_router(..., dependencies=[Depends(statement_deadline(5000))])"""
+    async def arm_deadline():
+        # async so it runs on the request's own context and sync endpoints inherit it
+        deadline = _current_deadline.get()
+        if deadline is None:
+            deadline = Deadline()
+            _current_deadline.set(deadline)
+        if ms:
+            deadline.arm(ms)
+    return arm_deadline
+
+def is_deadline_error(error: BaseException) -> bool:
+    """Check whether a DBAPI error is the database cancelling a statement"""
+    args = getattr(error, "args", ())
+    if args and args[0] in MYSQL_TIMEOUT_ERRORS:
+        return True
+    return type(error).__name__ == "OperationalError" and "interrupted" in str(error).lower()
+
+class _Slot:
+    """Deadline of the statement currently running on one SQLite connection"""
+    __slots__ = ("expires_at",)
+
+    def __init__(self):
+        self.expires_at = None
+
+    def __call__(self) -> int:
+        # Non-zero aborts the statement with OperationalError("interrupted")
+        return 1 if self.expires_at is not None and time.monotonic() > self.expires_at else 0
+
+def _on_connect(dbapi_connection, connection_record):
+    slot = _Slot()
+    connection_record.info["deadline_slot"] = slot
+    if hasattr(dbapi_connection, "set_progress_handler"):
+        dbapi_connection.set_progress_handler(slot, SQLITE_PROGRESS_STEPS)
+    else:
+        # aiosqlite adapter: the handler has to be installed on aiosqlite's own thread
+        dbapi_connection.run_async(lambda conn: conn.set_progress_handler(slot, SQLITE_PROGRESS_STEPS))
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    deadline = _current_deadline.get()
+    if deadline is None or deadline.expires_at is None:
+        return statement, parameters
+    remaining = deadline.remaining_ms()
+    if remaining <= 0:
+        deadline.expired = True
+        raise DeadlineExceeded(f"Statement deadline of {deadline.budget_ms} ms exceeded")
+    slot = conn.info.get("deadline_slot")
+    if slot is not None:
+        slot.expires_at = deadline.expires_at
+    elif conn.dialect.name == "mysql" and _select.match(statement):
+        statement = _select.sub(f"SELECT /*+ MAX_EXECUTION_TIME({remaining}) */", statement, count=1)
+    return statement, parameters
+
+def _clear_slot(conn):
+    slot = conn.info.get("deadline_slot")
+    if slot is not None:
+        slot.expires_at = None
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _clear_slot(conn)
+
+def _handle_error(exception_context):
+    if exception_context.connection is not None:
+        _clear_slot(exception_context.connection)
+    deadline = _current_deadline.get()
+    if deadline is not None and is_deadline_error(exception_context.original_exception):
+        deadline.expired = True
+        logger.warning("Statement cancelled after %s ms deadline: %s",
+                       deadline.budget_ms, (exception_context.statement or "")[:300])
+
+def install_deadlines(engine):
+    """Attach the deadline hooks to a sync Engine (use async_engine.sync_engine for async)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        if engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", _on_connect)
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute, retval=True)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
@@ -2,6 +2,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from typing import List, Optional
+import hierarchy
 from . import models, schemas
 
 def get_division(db: Session, record_id: int) -> Optional[models.Division]:
@@ -85,4 +86,13 @@ def update_division_parent(db: Session, division_id: int, new_parent_id: Optiona
         db_division.parent_type = parent_type
         db.commit()
         db.refresh(db_division)
-    return db_division
\ No newline at end of file
+    return db_division
+
+def _division_parent(division: models.Division) -> Optional[int]:
+    # Divisions under a group are roots of the division forest
+    return division.parent_id if division.parent_type == "Division" else None
+
+def build_division_tree(db: Session) -> List[dict]:
+    """Nested division tree (sub-divisions under their parent division) from a single query"""
+    divisions = hierarchy.load(db, models.Division, parent=_division_parent)
+    return divisions.forest(lambda division: schemas.Division.from_orm(division).dict())
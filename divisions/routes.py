@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_read_db
 from . import crud, schemas
 
 router = APIRouter()
@@ -20,19 +20,27 @@ def create_division(division: schemas.DivisionCreate, db: Session = Depends(get_
         raise HTTPException(status_code=400, detail=f"Error creating division: {str(e)}")
 
 @router.get("/", response_model=List[schemas.Division])
-def read_divisions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_divisions(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get divisions with pagination"""
     divisions = crud.get_divisions(db, skip=skip, limit=limit)
     return divisions
 
 @router.get("/all", response_model=List[schemas.Division])
-def read_all_divisions(db: Session = Depends(get_db)):
+def read_all_divisions(db: Session = Depends(get_read_db)):
     """Get all divisions"""
     divisions = crud.get_all_divisions(db)
     return divisions
 
+@router.get("/tree", response_model=List[schemas.DivisionWithChildren])
+def get_division_tree(db: Session = Depends(get_read_db)):
+    """Get division hierarchy tree"""
+    try:
+        return crud.build_division_tree(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting division tree: {str(e)}")
+
 @router.get("/search", response_model=List[schemas.Division])
-def search_divisions(q: str = Query(..., description="Search term"), db: Session = Depends(get_db)):
+def search_divisions(q: str = Query(..., description="Search term"), db: Session = Depends(get_read_db)):
     """Search divisions by name"""
     if len(q.strip()) < 2:
         raise HTTPException(status_code=400, detail="Search term must be at least 2 characters")
@@ -41,7 +49,7 @@ def search_divisions(q: str = Query(..., description="Search term"), db: Session
     return divisions
 
 @router.get("/by-parent", response_model=List[schemas.Division])
-def get_divisions_by_parent(parent_id: int, parent_type: str, db: Session = Depends(get_db)):
+def get_divisions_by_parent(parent_id: int, parent_type: str, db: Session = Depends(get_read_db)):
     """Get divisions by parent (group or division)"""
     valid_types = ["Group", "Division"]
     if parent_type not in valid_types:
@@ -51,7 +59,7 @@ def get_divisions_by_parent(parent_id: int, parent_type: str, db: Session = Depe
     return divisions
 
 @router.get("/{division_id}", response_model=schemas.Division)
-def read_division(division_id: int, db: Session = Depends(get_db)):
+def read_division(division_id: int, db: Session = Depends(get_read_db)):
     """Get a specific division by ID"""
     db_division = crud.get_division(db, record_id=division_id)
     if db_division is None:
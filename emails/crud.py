@@ -1,17 +1,33 @@
 # emails/crud.py
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, select
 from typing import List, Optional
+import entity_cache
+import negative_cache
+import search_cache
 from . import models, schemas
 
 # Email Directory CRUD Operations
 def get_email(db: Session, email_id: int) -> Optional[models.EmailDirectory]:
     """Get a single email by ID"""
-    return db.query(models.EmailDirectory).filter(models.EmailDirectory.email_id == email_id).first()
+    return entity_cache.get_one(
+        db, models.EmailDirectory, email_id,
+        lambda: db.query(models.EmailDirectory).filter(models.EmailDirectory.email_id == email_id).first()
+    )
+
+# Answers "definitely not registered" for new addresses without a query
+email_address_index = negative_cache.register(models.EmailDirectory.email_address, normalize=str.lower)
 
 def get_email_by_address(db: Session, email_address: str) -> Optional[models.EmailDirectory]:
     """Get email by email address"""
-    return db.query(models.EmailDirectory).filter(models.EmailDirectory.email_address == email_address.lower()).first()
+    if not email_address_index.might_exist(email_address):
+        return None
+    generation = email_address_index.generation
+    email = db.query(models.EmailDirectory).filter(models.EmailDirectory.email_address == email_address.lower()).first()
+    if email is None:
+        email_address_index.record_miss(email_address, generation)
+    return email
 
 def get_emails(db: Session, skip: int = 0, limit: int = 100) -> List[models.EmailDirectory]:
     """Get emails with pagination"""
@@ -225,4 +241,90 @@ def search_emails_with_associations(db: Session, search_term: str = None,
     if conditions:
         query = query.filter(and_(*conditions))
     
-    return query.distinct().all()
\ No newline at end of file
+    return query.distinct().all()
+
+# Async read operations (used by the async GET routes)
+async def get_email_async(db: AsyncSession, email_id: int) -> Optional[models.EmailDirectory]:
+    """Get a single email by ID"""
+    async def load():
+        result = await db.execute(select(models.EmailDirectory).where(models.EmailDirectory.email_id == email_id))
+        return result.scalars().first()
+    return await entity_cache.get_one_async(db, models.EmailDirectory, email_id, load)
+
+async def get_emails_async(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.EmailDirectory]:
+    """Get emails with pagination"""
+    result = await db.execute(select(models.EmailDirectory).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def get_all_emails_async(db: AsyncSession) -> List[models.EmailDirectory]:
+    """Get all emails"""
+    result = await db.execute(select(models.EmailDirectory))
+    return list(result.scalars().all())
+
+EMAIL_SEARCH_FIELDS = ("email_address", "description")
+
+async def search_emails_async(db: AsyncSession, search_term: str) -> List[models.EmailDirectory]:
+    """Search emails by email address or description"""
+    async def load():
+        search_pattern = f"%{search_term}%"
+        result = await db.execute(
+            select(models.EmailDirectory).where(
+                or_(
+                    models.EmailDirectory.email_address.ilike(search_pattern),
+                    models.EmailDirectory.description.ilike(search_pattern)
+                )
+            )
+        )
+        return list(result.scalars().all())
+    return await search_cache.search_async(db, models.EmailDirectory, search_term, EMAIL_SEARCH_FIELDS, load)
+
+async def get_associations_by_email_async(db: AsyncSession, email_id: int) -> List[models.EmailAssociation]:
+    """Get all associations for a specific email"""
+    result = await db.execute(select(models.EmailAssociation).where(models.EmailAssociation.email_id == email_id))
+    return list(result.scalars().all())
+
+async def get_email_with_associations_async(db: AsyncSession, email_id: int) -> Optional[models.EmailDirectory]:
+    """Get email with all its associations"""
+    # Associations are loaded eagerly - lazy loading is not available on an AsyncSession
+    result = await db.execute(
+        select(models.EmailDirectory)
+        .options(selectinload(models.EmailDirectory.associations))
+        .where(models.EmailDirectory.email_id == email_id)
+    )
+    return result.scalars().first()
+
+async def search_emails_with_associations_async(db: AsyncSession, search_term: str = None,
+                                                company_id: int = None, person_id: int = None,
+                                                department: str = None) -> List[models.EmailDirectory]:
+    """Advanced search for emails with association filters"""
+    query = (
+        select(models.EmailDirectory)
+        .join(models.EmailAssociation, isouter=True)
+        .options(selectinload(models.EmailDirectory.associations))
+    )
+    
+    conditions = []
+    
+    if search_term:
+        search_pattern = f"%{search_term}%"
+        conditions.append(
+            or_(
+                models.EmailDirectory.email_address.ilike(search_pattern),
+                models.EmailDirectory.description.ilike(search_pattern)
+            )
+        )
+    
+    if company_id:
+        conditions.append(models.EmailAssociation.company_id == company_id)
+    
+    if person_id:
+        conditions.append(models.EmailAssociation.person_id == person_id)
+        
+    if department:
+        conditions.append(models.EmailAssociation.departments.contains([department]))
+    
+    if conditions:
+        query = query.where(and_(*conditions))
+    
+    result = await db.execute(query.distinct())
+    return list(result.scalars().all())
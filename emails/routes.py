@@ -1,8 +1,9 @@
 # emails/routes.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_async_read_db
 from . import crud, schemas
 from audit_logs.utils import create_audit_logs_for_create, create_audit_logs_for_update, create_audit_logs_for_delete, model_to_dict
 
@@ -82,36 +83,36 @@ def create_email_with_associations(request: schemas.EmailCreateRequest, db: Sess
         raise HTTPException(status_code=400, detail=f"Error creating email: {str(e)}")
 
 @router.get("/", response_model=List[schemas.EmailDirectory])
-def read_emails(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_emails(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_read_db)):
     """Get emails with pagination"""
-    emails = crud.get_emails(db, skip=skip, limit=limit)
+    emails = await crud.get_emails_async(db, skip=skip, limit=limit)
     return emails
 
 @router.get("/all", response_model=List[schemas.EmailDirectory])
-def read_all_emails(db: Session = Depends(get_db)):
+async def read_all_emails(db: AsyncSession = Depends(get_async_read_db)):
     """Get all emails"""
-    emails = crud.get_all_emails(db)
+    emails = await crud.get_all_emails_async(db)
     return emails
 
 @router.get("/search", response_model=List[schemas.EmailDirectory])
-def search_emails(q: str = Query(..., description="Search term"), db: Session = Depends(get_db)):
+async def search_emails(q: str = Query(..., description="Search term"), db: AsyncSession = Depends(get_async_read_db)):
     """Search emails by address or description"""
     if len(q.strip()) < 2:
         raise HTTPException(status_code=400, detail="Search term must be at least 2 characters")
     
-    emails = crud.search_emails(db, q)
+    emails = await crud.search_emails_async(db, q)
     return emails
 
 @router.get("/advanced-search", response_model=List[schemas.EmailWithAssociations])
-def advanced_search_emails(
+async def advanced_search_emails(
     q: Optional[str] = Query(None, description="Search term"),
     company_id: Optional[int] = Query(None, description="Company ID"),
     person_id: Optional[int] = Query(None, description="Person ID"),
     department: Optional[str] = Query(None, description="Department"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Advanced search for emails with association filters"""
-    emails = crud.search_emails_with_associations(
+    emails = await crud.search_emails_with_associations_async(
         db=db, 
         search_term=q, 
         company_id=company_id, 
@@ -121,9 +122,9 @@ def advanced_search_emails(
     return emails
 
 @router.get("/{email_id}", response_model=schemas.EmailWithAssociations)
-def read_email(email_id: int, db: Session = Depends(get_db)):
+async def read_email(email_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific email with its associations"""
-    db_email = crud.get_email_with_associations(db, email_id=email_id)
+    db_email = await crud.get_email_with_associations_async(db, email_id=email_id)
     if db_email is None:
         raise HTTPException(status_code=404, detail="Email not found")
     return db_email
@@ -247,14 +248,14 @@ def create_email_association(
         raise HTTPException(status_code=400, detail=f"Error creating association: {str(e)}")
 
 @router.get("/{email_id}/associations", response_model=List[schemas.EmailAssociation])
-def get_email_associations(email_id: int, db: Session = Depends(get_db)):
+async def get_email_associations(email_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get all associations for a specific email"""
     # Check if email exists
-    email = crud.get_email(db, email_id)
+    email = await crud.get_email_async(db, email_id)
     if not email:
         raise HTTPException(status_code=404, detail="Email not found")
     
-    associations = crud.get_associations_by_email(db, email_id)
+    associations = await crud.get_associations_by_email_async(db, email_id)
     return associations
 
 @router.put("/associations/{association_id}", response_model=schemas.EmailAssociation)
@@ -0,0 +1,256 @@
+# entity_cache.py
+"""
+In-process entity cache for crud reads: per-table namespaces with a TTL and an LRU size
+bound. Session after_flush / after_commit events evict the written rows and the table's
+list entries, so any ORM insert, update or delete invalidates what it touched. Commits in
+other worker processes arrive through cache_versions and drop the whole namespace.
+
+Cached rows are kept as detached snapshots and handed back with Session.merge(load=False),
+so every caller gets its own session-bound instance without a round-trip.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+import cache_versions
+
+ENTITY_CACHE_ENABLED = os.getenv("ENTITY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", "60"))
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "1000"))
+
+# Key of the entry holding a whole-table list in a namespace
+ALL = "__all__"
+
+class Namespace:
+    """LRU + TTL cache for one table, keyed by (bind, key)"""
+
+    def __init__(self, name: str, ttl: float = None, max_entries: int = None, table: str = None, per_key: bool = True):
+        self.name = name
+        self.table = table or name
+        # False: any write to the table clears the whole namespace (e.g. search results)
+        self.per_key = per_key
+        self.ttl = ENTITY_CACHE_TTL if ttl is None else ttl
+        self.max_entries = ENTITY_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # (bind, key) -> (stored_at, value)
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.created_at = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, bind: str, key: Hashable):
+        with self.lock:
+            entry = self.entries.get((bind, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.entries[(bind, key)]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end((bind, key))
+            self.hits += 1
+            return value
+
+    def put(self, bind: str, key: Hashable, value, generation: int):
+        with self.lock:
+            if generation != self.generation:
+                # A write landed while this value was being loaded - it may already be stale
+                return
+            self.entries[(bind, key)] = (time.monotonic(), value)
+            self.entries.move_to_end((bind, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys=None):
+        """Drop the given keys (every bind) plus the list entries, or everything if keys is None"""
+        with self.lock:
+            self.generation += 1
+            self.invalidations += 1
+            if keys is None:
+                self.entries.clear()
+                return
+            keys = set(keys) | {ALL}
+            for entry_key in [k for k in self.entries if k[1] in keys]:
+                del self.entries[entry_key]
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "age_seconds": round(time.time() - self.created_at, 1),
+        }
+
+_namespaces: Dict[str, Namespace] = {}
+_namespaces_lock = threading.Lock()
+
+def namespace(name: str, **options) -> Namespace:
+    """Get or create a namespace (options as for Namespace, used on creation only)"""
+    ns = _namespaces.get(name)
+    if ns is None:
+        with _namespaces_lock:
+            ns = _namespaces.get(name)
+            if ns is None:
+                ns = _namespaces[name] = Namespace(name, **options)
+    return ns
+
+def namespaces() -> Dict[str, Namespace]:
+    return dict(_namespaces)
+
+def stats() -> Dict[str, Any]:
+    vf = cache_versions.versions()
+    return {
+        "enabled": ENTITY_CACHE_ENABLED,
+        "namespaces": {name: ns.stats() for name, ns in sorted(_namespaces.items())},
+        "coherence": vf.status() if vf is not None else None,
+    }
+
+def clear():
+    for ns in namespaces().values():
+        ns.clear()
+
+def bind_key(db: Session) -> str:
+    # Primary and replica can disagree (replica lag), so they never share entries
+    return str(db.get_bind().url)
+
+def snapshot(instance):
+    """Detached copy of an instance's column values"""
+    mapper = inspect(instance).mapper
+    copy = mapper.class_(**{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+def has_pending_writes(db: Session, table: str) -> bool:
+    # Rows this session flushed but has not committed must not leak into the shared cache
+    return table in db.info.get("entity_cache_pending", {})
+
+def get_one(db: Session, model, key: Hashable, loader: Callable[[], Optional[Any]]):
+    """Cached loader() for a single row of model (None results are not cached)"""
+    if not ENTITY_CACHE_ENABLED:
+        return loader()
+    cache_versions.check()
+    table = model.__table__.name
+    ns = namespace(table)
+    bind = bind_key(db)
+    cached = ns.get(bind, key)
+    if cached is not None:
+        return db.merge(cached, load=False)
+    generation = ns.generation
+    instance = loader()
+    if instance is not None and not has_pending_writes(db, table):
+        ns.put(bind, key, snapshot(instance), generation)
+    return instance
+
+async def get_one_async(db, model, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]):
+    """get_one for an AsyncSession with an async loader"""
+    if not ENTITY_CACHE_ENABLED:
+        return await loader()
+    cache_versions.check()
+    table = model.__table__.name
+    ns = namespace(table)
+    bind = bind_key(db)
+    cached = ns.get(bind, key)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    generation = ns.generation
+    instance = await loader()
+    if instance is not None and not has_pending_writes(db, table):
+        ns.put(bind, key, snapshot(instance), generation)
+    return instance
+
+def get_all(db: Session, model, loader: Callable[[], List[Any]]) -> List[Any]:
+    """Cached loader() for a whole-table list of model"""
+    if not ENTITY_CACHE_ENABLED:
+        return loader()
+    cache_versions.check()
+    table = model.__table__.name
+    ns = namespace(table)
+    bind = bind_key(db)
+    cached = ns.get(bind, ALL)
+    if cached is not None:
+        return [db.merge(row, load=False) for row in cached]
+    generation = ns.generation
+    rows = loader()
+    if not has_pending_writes(db, table):
+        ns.put(bind, ALL, [snapshot(row) for row in rows], generation)
+    return rows
+
+def invalidate_table(table: str, keys=None):
+    for ns in namespaces().values():
+        if ns.table == table:
+            ns.invalidate(keys if ns.per_key else None)
+
+# --- invalidation hooks -------------------------------------------------------------------
+
+def _record(session: Session, table: str, key):
+    pending = session.info.setdefault("entity_cache_pending", {})
+    keys = pending.setdefault(table, set())
+    if keys is not None:
+        if key is None:
+            pending[table] = None  # whole table
+        else:
+            keys.add(key)
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        state = inspect(instance)
+        table = getattr(state.mapper.local_table, "name", None)
+        if table is None:
+            continue
+        pk = state.mapper.primary_key_from_instance(instance)
+        _record(session, table, pk[0] if len(pk) == 1 else tuple(pk))
+    # Evict now as well, so reads elsewhere stop serving the old rows as soon as possible
+    for table, keys in session.info.get("entity_cache_pending", {}).items():
+        invalidate_table(table, keys)
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_write(orm_execute_state):
+    # query.update() / query.delete() and update()/delete() statements bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _record(orm_execute_state.session, mapper.local_table.name, None)
+            invalidate_table(mapper.local_table.name)
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    pending = session.info.pop("entity_cache_pending", None)
+    if pending:
+        for table, keys in pending.items():
+            invalidate_table(table, keys)
+        # Tell the other workers
+        cache_versions.bump(pending)
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("entity_cache_pending", None)
+
+def _drop_stale(slots):
+    # Another worker committed to these tables - their rows and lists may all be stale here
+    slots = set(slots)
+    for ns in namespaces().values():
+        if cache_versions.slot_of(ns.table) in slots:
+            ns.invalidate()
+
+cache_versions.on_stale(_drop_stale)
@@ -0,0 +1,63 @@
+# etags.py
+"""
+Strong ETags for the tree and full-list endpoints, derived from the shared table versions
+in cache_versions - so an unchanged poll is answered with a 304 before any ORM or pydantic work
+"""
+import hashlib
+import os
+import time
+from typing import Dict, Optional, Tuple
+import cache_versions
+
+# Tables each endpoint's response is built from
+ETAG_TABLES: Dict[str, Tuple[str, ...]] = {
+    "/industries/tree": ("industries",),
+    "/companies/tree": ("companies",),
+    "/groups/tree": ("groups",),
+    "/divisions/tree": ("divisions",),
+    "/companies/all": ("companies",),
+    "/persons/all": ("persons",),
+    "/emails/all": ("email_directory",),
+}
+
+# Writes that bypass the ORM (manual SQL, other applications) never bump a version, so tags
+# also roll over every ETAG_REFRESH_SECONDS
+ETAG_REFRESH_SECONDS = int(os.getenv("ETAG_REFRESH_SECONDS", "300"))
+
+def _replica_may_lag(versions) -> bool:
+    """With a replica, data read right after a write may predate the version - don't tag it"""
+    from database import engine, read_engine, READ_YOUR_WRITES_SECONDS
+    if read_engine is engine:
+        return False
+    newest = max(versions)
+    return time.time_ns() - newest < READ_YOUR_WRITES_SECONDS * 1_000_000_000
+
+def data_version(path: str) -> Optional[str]:
+    """Version of the data behind an endpoint, or None if it is not versioned (or cannot be right now)"""
+    tables = ETAG_TABLES.get(path.rstrip("/"))
+    vf = cache_versions.versions()
+    if tables is None or vf is None:
+        return None
+    # Versions this worker has applied, not the live file: another worker's write must first
+    # drop our caches, or the old body would be tagged (and stored) under the new version
+    vf.check(force=True)
+    versions = [vf.seen_version(table) for table in tables]
+    if _replica_may_lag(versions):
+        return None
+    return f"{vf.seen_version(cache_versions.EPOCH)}:{':'.join(map(str, versions))}:{int(time.time() // ETAG_REFRESH_SECONDS)}"
+
+def etag_for(path: str) -> Optional[str]:
+    """Current ETag of an endpoint, or None if it is not versioned (or cannot be right now)"""
+    version = data_version(path)
+    if version is None:
+        return None
+    return '"' + hashlib.blake2b(f"{path}:{version}".encode(), digest_size=12).hexdigest() + '"'
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
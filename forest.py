@@ -0,0 +1,244 @@
+# forest.py
+"""
+In-memory parent -> children forests for the self-referencing tables (companies, groups, industries),
+kept current with small deltas instead of being rebuilt for every /tree or /tree/nodes request.
+
+- The first read loads the table once (from the primary) into a hierarchy.Hierarchy of
+  detached row snapshots.
+- Session after_flush records the ids every ORM insert / update / delete touched; on commit
+  deletes are applied right away and inserted / updated ids are queued. The next read
+  refreshes just those rows in one query and moves each node between its old and new
+  parent's child list - nothing else is touched.
+- Bulk statements (once their transaction commits) and commits in other workers
+  (cache_versions) mark the forest stale: the next read reloads it.
+- Reads walk the hierarchy under the forest lock, so they never see a delta half applied.
+- Every FOREST_VERIFY_SECONDS a read compares a (count, id sum, parent checksum) aggregate
+  with the database and reloads on drift (writes that bypass the ORM).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+import cache_versions
+import entity_cache
+from hierarchy import Hierarchy
+
+logger = logging.getLogger(__name__)
+
+FOREST_VERIFY_SECONDS = float(os.getenv("FOREST_VERIFY_SECONDS", "60"))
+
+class Forest:
+    """Parent -> children forest of one self-referencing model"""
+
+    def __init__(self, model, key: str = "record_id", parent: str = "parent_id"):
+        self.model = model
+        self.table = model.__table__.name
+        self.key = key
+        self.parent = parent
+        self.lock = threading.Lock()
+        self.hierarchy = Hierarchy(key=key, parent=parent)  # of detached row snapshots
+        self.serialized: Dict[int, Dict] = {}  # id -> serializer output, dropped when the row changes
+        self.dirty: Set[int] = set()
+        self.loaded = False
+        self.stale = False
+        self.verified_at = 0.0
+        self.loads = 0
+        self.deltas = 0
+        self.drift_detected = 0
+
+    @property
+    def nodes(self) -> Dict[int, Any]:
+        return self.hierarchy.rows
+
+    def _upsert(self, row):
+        self.hierarchy.upsert(row)
+        self.serialized.pop(getattr(row, self.key), None)
+
+    def _remove(self, node_id: int):
+        self.hierarchy.remove(node_id)
+        self.serialized.pop(node_id, None)
+
+    # --- loading and deltas --------------------------------------------------------------
+
+    def load(self, db: Session):
+        """Rebuild the whole forest from one query"""
+        with self.lock:
+            self.dirty.clear()
+            self.stale = False
+        rows = [entity_cache.snapshot(row) for row in db.execute(select(self.model)).scalars()]
+        with self.lock:
+            self.hierarchy = Hierarchy(rows, self.key, self.parent)
+            self.serialized = {}
+            self.loaded = True
+            self.verified_at = time.monotonic()
+            self.loads += 1
+
+    def deleted(self, ids):
+        with self.lock:
+            for node_id in ids:
+                self._remove(node_id)
+                self.dirty.discard(node_id)
+            self.deltas += len(ids)
+
+    def changed(self, ids):
+        with self.lock:
+            self.dirty.update(ids)
+
+    def invalidate(self):
+        with self.lock:
+            self.stale = True
+
+    def _apply_dirty(self, db: Session):
+        with self.lock:
+            ids, self.dirty = self.dirty, set()
+        if not ids:
+            return
+        key = getattr(self.model, self.key)
+        rows = {getattr(row, self.key): entity_cache.snapshot(row)
+                for row in db.execute(select(self.model).where(key.in_(ids))).scalars()}
+        with self.lock:
+            for node_id in ids:
+                if node_id in rows:
+                    self._upsert(rows[node_id])
+                else:
+                    self._remove(node_id)
+            self.deltas += len(ids)
+
+    def checksum(self) -> Tuple[int, int, int]:
+        with self.lock:
+            parents = self.hierarchy.parents
+            return (
+                len(parents),
+                sum(parents),
+                sum(node_id * ((parent_id or 0) + 1) for node_id, parent_id in parents.items()),
+            )
+
+    def db_checksum(self, db: Session) -> Tuple[int, int, int]:
+        key, parent = getattr(self.model, self.key), getattr(self.model, self.parent)
+        count, id_sum, parent_sum = db.execute(
+            select(func.count(key), func.sum(key), func.sum(key * (func.coalesce(parent, 0) + 1)))
+        ).one()
+        return (int(count), int(id_sum or 0), int(parent_sum or 0))
+
+    def verify(self, db: Session) -> bool:
+        """Compare with the database; reload (and return False) on drift"""
+        self._apply_dirty(db)
+        expected = self.db_checksum(db)
+        if self.checksum() == expected and not self.dirty:
+            self.verified_at = time.monotonic()
+            return True
+        logger.warning("%s forest drifted from the database - reloading", self.table)
+        self.drift_detected += 1
+        self.load(db)
+        return False
+
+    def refresh(self, db: Session = None):
+        """Bring the forest up to date (from the primary: a lagging replica would undo deltas)"""
+        cache_versions.check()
+        if self.loaded and not self.stale and not self.dirty and time.monotonic() - self.verified_at < FOREST_VERIFY_SECONDS:
+            return
+        own_session = db is None
+        if own_session:
+            from database import SessionLocal
+            db = SessionLocal()
+        try:
+            if not self.loaded or self.stale:
+                self.load(db)
+            elif time.monotonic() - self.verified_at >= FOREST_VERIFY_SECONDS:
+                self.verify(db)
+            else:
+                self._apply_dirty(db)
+        finally:
+            if own_session:
+                db.close()
+
+    # --- reads ---------------------------------------------------------------------------
+
+    def tree(self, serialize: Callable[[Any], Dict], db: Session = None) -> List[Dict]:
+        """Nested {**serialize(row), "children": [...]} dicts, roots first, children by id"""
+        self.refresh(db)
+        with self.lock:
+            return self.hierarchy.forest(serialize, memo=self.serialized)
+
+    def read(self, fn: Callable[[Hierarchy], Any], db: Session = None) -> Any:
+        """fn(hierarchy) on the up-to-date hierarchy, under the lock - fn must not modify it or keep it"""
+        self.refresh(db)
+        with self.lock:
+            return fn(self.hierarchy)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "stale": self.stale,
+            "nodes": len(self.nodes),
+            "roots": len(self.hierarchy.children.get(None, ())),
+            "pending_deltas": len(self.dirty),
+            "loads": self.loads,
+            "deltas_applied": self.deltas,
+            "drift_detected": self.drift_detected,
+            "verified_seconds_ago": round(time.monotonic() - self.verified_at, 1) if self.loaded else None,
+        }
+
+_forests: Dict[str, Forest] = {}
+
+def register(model, key: str = "record_id", parent: str = "parent_id") -> Forest:
+    forest = Forest(model, key, parent)
+    return _forests.setdefault(forest.table, forest)
+
+def forests() -> Dict[str, Forest]:
+    return dict(_forests)
+
+def stats() -> Dict[str, Any]:
+    return {table: forest.stats() for table, forest in sorted(_forests.items())}
+
+# --- delta hooks ------------------------------------------------------------------------
+
+def _forest_for(instance) -> Optional[Forest]:
+    return _forests.get(getattr(inspect(instance).mapper.local_table, "name", None))
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    pending = session.info.setdefault("forest_pending", [])
+    for instance in list(session.new) + list(session.dirty):
+        forest = _forest_for(instance)
+        if forest is not None:
+            pending.append((forest.table, "changed", getattr(instance, forest.key)))
+    for instance in session.deleted:
+        forest = _forest_for(instance)
+        if forest is not None:
+            pending.append((forest.table, "deleted", getattr(instance, forest.key)))
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_write(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        forest = _forests.get(getattr(mapper.local_table, "name", None)) if mapper is not None else None
+        if forest is not None:
+            # Applied on commit: a reload before then would read the rows as they were
+            orm_execute_state.session.info.setdefault("forest_pending", []).append((forest.table, "invalidate", None))
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for table, op, node_id in session.info.pop("forest_pending", []):
+        forest = _forests[table]
+        if op == "invalidate":
+            forest.invalidate()
+        elif op == "deleted":
+            forest.deleted([node_id])
+        else:
+            forest.changed([node_id])
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("forest_pending", None)
+
+def _drop_stale(slots):
+    slots = set(slots)
+    for forest in forests().values():
+        if cache_versions.slot_of(forest.table) in slots:
+            forest.invalidate()
+
+cache_versions.on_stale(_drop_stale)
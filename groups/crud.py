@@ -2,6 +2,11 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from typing import List, Optional
+import forest
+import hierarchy
+import search_cache
+import tree_nodes
+from audit_logs.utils import add_audit_logs_for_subtree_delete
 from . import models, schemas
 
 def get_group(db: Session, record_id: int) -> Optional[models.Group]:
@@ -50,31 +55,28 @@ def update_group(db: Session, record_id: int, group: schemas.GroupUpdate) -> Opt
         db.refresh(db_group)
     return db_group
 
-def delete_group(db: Session, record_id: int) -> bool:
-    """Delete a group and all its children"""
-    db_group = get_group(db, record_id)
-    if db_group:
-        # First delete all children recursively
-        children = db.query(models.Group).filter(models.Group.parent_id == record_id).all()
-        for child in children:
-            delete_group(db, child.record_id)
-
-        # Then delete the group itself
-        db.delete(db_group)
+def delete_group(db: Session, record_id: int, user_id: Optional[str] = None, user_name: Optional[str] = None) -> int:
+    """Delete a group and all its children in one transaction, auditing every deleted row; returns the number deleted"""
+    deleted = hierarchy.delete_subtree(db, models.Group, record_id)
+    if deleted:
+        add_audit_logs_for_subtree_delete(db, "groups", deleted, user_id=user_id, user_name=user_name)
         db.commit()
-        return True
-    return False
+    return len(deleted)
+
+GROUP_SEARCH_FIELDS = ("group_print_name", "legal_name", "other_names")
 
 def search_groups(db: Session, search_term: str) -> List[models.Group]:
     """Search groups by name or legal name"""
-    search_pattern = f"%{search_term}%"
-    return db.query(models.Group).filter(
-        or_(
-            models.Group.group_print_name.ilike(search_pattern),
-            models.Group.legal_name.ilike(search_pattern),
-            models.Group.other_names.ilike(search_pattern)
-        )
-    ).all()
+    def load():
+        search_pattern = f"%{search_term}%"
+        return db.query(models.Group).filter(
+            or_(
+                models.Group.group_print_name.ilike(search_pattern),
+                models.Group.legal_name.ilike(search_pattern),
+                models.Group.other_names.ilike(search_pattern)
+            )
+        ).all()
+    return search_cache.search(db, models.Group, search_term, GROUP_SEARCH_FIELDS, load)
 
 def get_group_hierarchy(db: Session) -> List[models.Group]:
     """Get all groups in a hierarchical structure (top-level parents first)"""
@@ -84,6 +86,20 @@ def get_group_children(db: Session, parent_id: int) -> List[models.Group]:
     """Get direct children of a group"""
     return db.query(models.Group).filter(models.Group.parent_id == parent_id).all()
 
+group_forest = forest.register(models.Group)
+
+def build_group_tree() -> List[dict]:
+    """Nested group tree, walked from the in-memory forest"""
+    return group_forest.tree(lambda group: schemas.Group.from_orm(group).dict())
+
+def get_group_tree_nodes(parent_id: Optional[int] = None, depth: int = 1, cursor: Optional[int] = None, limit: int = 100) -> Optional[dict]:
+    """A page of lightweight group nodes under parent_id (None if the parent does not exist)"""
+    def page(view):
+        if parent_id is not None and parent_id not in view:
+            return None
+        return tree_nodes.expand(view, lambda group: {"name": group.group_print_name, "type": "Group"}, parent_id, depth, cursor, limit)
+    return group_forest.read(page)
+
 def update_group_parent(db: Session, group_id: int, new_parent_id: Optional[int]) -> Optional[models.Group]:
     """Update a group's parent relationship"""
     db_group = get_group(db, group_id)
@@ -2,7 +2,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_read_db
+import tree_nodes
 from . import crud, schemas
 
 router = APIRouter()
@@ -20,37 +21,41 @@ def create_group(group: schemas.GroupCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=f"Error creating group: {str(e)}")
 
 @router.get("/", response_model=List[schemas.Group])
-def read_groups(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_groups(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get groups with pagination"""
     groups = crud.get_groups(db, skip=skip, limit=limit)
     return groups
 
 @router.get("/all", response_model=List[schemas.Group])
-def read_all_groups(db: Session = Depends(get_db)):
+def read_all_groups(db: Session = Depends(get_read_db)):
     """Get all groups"""
     groups = crud.get_all_groups(db)
     return groups
 
 @router.get("/tree", response_model=List[schemas.GroupWithChildren])
-def get_group_tree(db: Session = Depends(get_db)):
+def get_group_tree():
     """Get group hierarchy tree"""
     try:
-        top_level_groups = crud.get_group_hierarchy(db)
-
-        def build_tree(group):
-            children = crud.get_group_children(db, group.record_id)
-            return {
-                **schemas.Group.from_orm(group).dict(),
-                "children": [build_tree(child) for child in children]
-            }
-
-        return [build_tree(group) for group in top_level_groups]
+        return crud.build_group_tree()
     except Exception as e:
         print(f"Error getting group tree: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting group tree: {str(e)}")
 
+@router.get("/tree/nodes", response_model=tree_nodes.TreeNodePage)
+def get_group_tree_nodes(
+    parent_id: Optional[int] = Query(None, description="Expand this group's children (roots when omitted)"),
+    depth: int = Query(1, ge=1, le=tree_nodes.TREE_NODES_MAX_DEPTH, description="Levels to expand"),
+    cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=tree_nodes.TREE_NODES_MAX_LIMIT, description="Nodes per sibling list"),
+):
+    """Get one level (or a few) of the group tree as lightweight, paginated nodes"""
+    page = crud.get_group_tree_nodes(parent_id, depth, cursor, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return page
+
 @router.get("/search", response_model=List[schemas.Group])
-def search_groups(q: str = Query(..., description="Search term"), db: Session = Depends(get_db)):
+def search_groups(q: str = Query(..., description="Search term"), db: Session = Depends(get_read_db)):
     """Search groups by name"""
     if len(q.strip()) < 2:
         raise HTTPException(status_code=400, detail="Search term must be at least 2 characters")
@@ -59,7 +64,7 @@ def search_groups(q: str = Query(..., description="Search term"), db: Session =
     return groups
 
 @router.get("/{group_id}", response_model=schemas.Group)
-def read_group(group_id: int, db: Session = Depends(get_db)):
+def read_group(group_id: int, db: Session = Depends(get_read_db)):
     """Get a specific group by ID"""
     db_group = crud.get_group(db, record_id=group_id)
     if db_group is None:
@@ -81,10 +86,14 @@ def update_group(group_id: int, group: schemas.GroupUpdate, db: Session = Depend
 @router.delete("/{group_id}")
 def delete_group(group_id: int, db: Session = Depends(get_db)):
     """Delete a group and all its children"""
-    success = crud.delete_group(db, group_id)
-    if not success:
+    deleted_count = crud.delete_group(
+        db, group_id,
+        user_id="system",  # TODO: Replace with actual user ID from authentication
+        user_name="System User"  # TODO: Replace with actual user name from authentication
+    )
+    if not deleted_count:
         raise HTTPException(status_code=404, detail="Group not found")
-    return {"message": "Group and its children deleted successfully"}
+    return {"message": "Group and its children deleted successfully", "deleted_count": deleted_count}
 
 @router.post("/update-parent", response_model=schemas.Group)
 def update_group_parent(
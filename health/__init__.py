@@ -0,0 +1 @@
+# health module
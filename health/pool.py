@@ -0,0 +1,167 @@
+# health/pool.py
+import threading
+import time
+from typing import Dict, Any, Optional
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """Thread-safe counters for connection checkout wait times"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.last_wait = wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "last_wait_ms": round(self.last_wait * 1000, 3),
+            }
+
+
+class TimedPoolMixin:
+    """Measure how long each checkout waits for a pooled connection"""
+
+    @property
+    def wait_stats(self) -> PoolStats:
+        # Created lazily because Pool.recreate() builds new instances without extra kwargs
+        stats = self.__dict__.get("_wait_stats")
+        if stats is None:
+            stats = self.__dict__.setdefault("_wait_stats", PoolStats())
+        return stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Describe the current state of an engine's connection pool"""
+    if engine is None:
+        return {"enabled": False}
+
+    pool = engine.pool
+    status = {"enabled": True, "pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, TimedPoolMixin):
+        status["wait"] = pool.wait_stats.snapshot()
+    return status
+
+
+class PoolPinger:
+    """Background thread that pings idle pooled connections out of band.
+
+    Requests no longer pay for a liveness check: every interval the pinger
+    cycles through the connections currently checked in, runs ``SELECT 1`` on
+    each and invalidates the ones that fail so the pool replaces them.
+    """
+
+    def __init__(self, engine, interval: float = 60.0):
+        self.engine = engine
+        self.interval = interval
+        self.runs = 0
+        self.pinged = 0
+        self.failures = 0
+        self.last_run: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-pool-pinger", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.ping_idle()
+
+    def ping_idle(self) -> int:
+        """Ping every idle connection once, returns the number pinged"""
+        pool = self.engine.pool
+        idle = pool.checkedin() if isinstance(pool, QueuePool) else 1
+        pinged = 0
+        # QueuePool is FIFO, so checking out and returning idle times visits each connection once
+        for _ in range(idle):
+            if self._stop.is_set():
+                break
+            try:
+                with self.engine.connect() as conn:
+                    try:
+                        conn.execute(text("SELECT 1"))
+                    except Exception as e:
+                        self.failures += 1
+                        self.last_error = str(e)
+                        conn.invalidate()
+                pinged += 1
+            except Exception as e:
+                # Could not even get a connection - the next run will retry
+                self.failures += 1
+                self.last_error = str(e)
+                break
+        self.runs += 1
+        self.pinged += pinged
+        self.last_run = time.time()
+        return pinged
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "pinged": self.pinged,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,64 @@
+# health/routes.py
+from fastapi import APIRouter
+import startup
+import admission
+import singleflight
+import entity_cache
+import negative_cache
+import search_cache
+from database import engine, async_engine, read_engine, async_read_engine, pool_pinger, read_pool_pinger
+from .pool import pool_status
+
+router = APIRouter()
+
+@router.get("/db")
+def database_health():
+    """Report connection pool usage, checkout wait times and background pinger state"""
+    return {
+        "status": "healthy",
+        "sync_pool": pool_status(engine),
+        "async_pool": pool_status(async_engine),
+        "read_replica": {
+            "enabled": read_engine is not engine,
+            "sync_pool": pool_status(read_engine) if read_engine is not engine else None,
+            "async_pool": pool_status(async_read_engine) if read_engine is not engine else None,
+            "pinger": read_pool_pinger.status() if read_pool_pinger else None
+        },
+        "pinger": pool_pinger.status()
+    }
+
+
+@router.get("/startup")
+def startup_report():
+    """Per-module import cost and startup phases for this worker"""
+    return {"ready": startup.report_at_ready, "current": startup.report()}
+
+
+@router.get("/admission")
+def admission_report():
+    """In-flight requests per route class (current queue depth), limits and shed counts"""
+    return admission.status()
+
+
+@router.get("/singleflight")
+def singleflight_report():
+    """Requests that were served by joining an identical in-flight GET"""
+    return singleflight.requests.status()
+
+
+@router.get("/cache")
+def entity_cache_report():
+    """Entity cache hit / miss / eviction counters per table"""
+    return entity_cache.stats()
+
+
+@router.get("/negative-cache")
+def negative_cache_report():
+    """Bloom filter / miss-list state and queries saved per unique column"""
+    return negative_cache.stats()
+
+
+@router.get("/search-cache")
+def search_cache_report():
+    """Search result cache counters and searches answered without a query, per table"""
+    return search_cache.stats()
@@ -0,0 +1,172 @@
+# hierarchy.py
+"""
+Hierarchy engine for the self-referencing tables (companies, groups, industries, divisions):
+rows from a single query are indexed by parent once, then forests, subtrees, descendant
+lists, ancestor chains and depths are all answered in memory in O(n) - no query per node.
+"""
+import bisect
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Union
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+ParentOf = Union[str, Callable[[Any], Optional[int]]]
+
+class Hierarchy:
+    """Parent -> sorted child ids index over a set of rows"""
+
+    def __init__(self, rows: Iterable = (), key: str = "record_id", parent: ParentOf = "parent_id"):
+        self.key = key
+        # Attribute name, or a function for rows whose parent may live in another table
+        self.parent_of = (lambda row: getattr(row, parent)) if isinstance(parent, str) else parent
+        self.rows: Dict[int, Any] = {}
+        self.parents: Dict[int, Optional[int]] = {}
+        self.children: Dict[Optional[int], List[int]] = {}  # parent id (None = roots) -> sorted ids
+        for row in sorted(rows, key=lambda r: getattr(r, key)):
+            self.upsert(row)
+
+    # --- maintenance -------------------------------------------------------------------
+
+    def _unlink(self, node_id: int):
+        siblings = self.children.get(self.parents.pop(node_id, None))
+        if siblings is not None:
+            index = bisect.bisect_left(siblings, node_id)
+            if index < len(siblings) and siblings[index] == node_id:
+                siblings.pop(index)
+
+    def upsert(self, row):
+        """Add a row or replace it, moving it to its (possibly new) parent's child list"""
+        node_id = getattr(row, self.key)
+        parent_id = self.parent_of(row)
+        if node_id in self.parents and self.parents[node_id] != parent_id:
+            self._unlink(node_id)
+        if node_id not in self.parents:
+            bisect.insort(self.children.setdefault(parent_id, []), node_id)
+            self.parents[node_id] = parent_id
+        self.rows[node_id] = row
+
+    def remove(self, node_id: int) -> bool:
+        if node_id not in self.rows:
+            return False
+        self._unlink(node_id)
+        del self.rows[node_id]
+        return True
+
+    # --- queries -----------------------------------------------------------------------
+
+    def __contains__(self, node_id) -> bool:
+        return node_id in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def roots(self) -> List[int]:
+        return list(self.children.get(None, ()))
+
+    def children_of(self, node_id: int) -> List[int]:
+        return list(self.children.get(node_id, ()))
+
+    def descendants(self, node_id: int) -> List[int]:
+        """Every id below node_id, breadth first (cycle-safe)"""
+        found, seen = [], {node_id}
+        queue = deque(self.children.get(node_id, ()))
+        while queue:
+            child = queue.popleft()
+            if child in seen:
+                continue
+            seen.add(child)
+            found.append(child)
+            queue.extend(self.children.get(child, ()))
+        return found
+
+    def ancestors(self, node_id: int) -> List[int]:
+        """Parent, grandparent, ... up to the root (stops at a missing parent or a cycle)"""
+        chain, seen = [], {node_id}
+        parent_id = self.parents.get(node_id)
+        while parent_id is not None and parent_id not in seen and parent_id in self.rows:
+            chain.append(parent_id)
+            seen.add(parent_id)
+            parent_id = self.parents.get(parent_id)
+        return chain
+
+    def depth(self, node_id: int) -> int:
+        return len(self.ancestors(node_id))
+
+    def depths(self) -> Dict[int, int]:
+        """Depth of every node reachable from a root, in one pass"""
+        result: Dict[int, int] = {}
+        queue = deque((root, 0) for root in self.children.get(None, ()))
+        while queue:
+            node_id, depth = queue.popleft()
+            if node_id in result:
+                continue
+            result[node_id] = depth
+            queue.extend((child, depth + 1) for child in self.children.get(node_id, ()))
+        return result
+
+    def is_descendant(self, node_id: int, ancestor_id: int) -> bool:
+        """True if node_id is ancestor_id or lies below it"""
+        return node_id == ancestor_id or ancestor_id in self.ancestors(node_id)
+
+    def subtree(self, node_id: int, serialize: Callable[[Any], Dict], memo: Dict[int, Dict] = None) -> Optional[Dict]:
+        """Nested {**serialize(row), "children": [...]} for one node"""
+        if node_id not in self.rows:
+            return None
+        return self._build(node_id, serialize, memo, set())
+
+    def forest(self, serialize: Callable[[Any], Dict], memo: Dict[int, Dict] = None) -> List[Dict]:
+        """Nested dicts for every root, children by id (rows under a missing parent are left out)"""
+        seen: Set[int] = set()
+        return [self._build(root, serialize, memo, seen) for root in self.children.get(None, ())]
+
+    def _build(self, node_id: int, serialize, memo, seen: Set[int]) -> Dict:
+        # Iterative: deep chains must not hit the recursion limit
+        root: Dict = {}
+        stack = [(node_id, root)]
+        seen.add(node_id)
+        while stack:
+            current, target = stack.pop()
+            node = memo.get(current) if memo is not None else None
+            if node is None:
+                node = serialize(self.rows[current])
+                if memo is not None:
+                    memo[current] = node
+            target.update(node)
+            target["children"] = []
+            for child in self.children.get(current, ()):
+                if child in seen:
+                    continue
+                seen.add(child)
+                child_target: Dict = {}
+                target["children"].append(child_target)
+                stack.append((child, child_target))
+        return root
+
+def load(db: Session, model, key: str = "record_id", parent: ParentOf = "parent_id") -> Hierarchy:
+    """Hierarchy over every row of model, from one query"""
+    return Hierarchy(db.execute(select(model)).scalars().all(), key, parent)
+
+def subtree_ids(model, root_id: int, key: str = "record_id", parent: str = "parent_id"):
+    """Recursive CTE selecting root_id and every id below it (UNION, so a cycle terminates)"""
+    key_column, parent_column = getattr(model, key), getattr(model, parent)
+    tree = select(key_column.label("node_id")).where(key_column == root_id).cte("subtree", recursive=True)
+    tree = tree.union(select(key_column).join(tree, parent_column == tree.c.node_id))
+    return select(tree.c.node_id)
+
+def delete_subtree(db: Session, model, root_id: int, key: str = "record_id", parent: str = "parent_id") -> List[Dict[str, Any]]:
+    """
+    Delete root_id and all its descendants without committing, returns a column snapshot of
+    every deleted row (root first). One query gathers and snapshots the subtree, one
+    statement detaches it from its parents and one deletes it.
+    """
+    key_column = getattr(model, key)
+    columns = [getattr(model, attr.key) for attr in model.__mapper__.column_attrs]
+    rows = db.execute(select(*columns).where(key_column.in_(subtree_ids(model, root_id, key, parent))).order_by(key_column))
+    snapshots = sorted((row._asdict() for row in rows), key=lambda snapshot: snapshot[key] != root_id)
+    if not snapshots:
+        return []
+    ids = [snapshot[key] for snapshot in snapshots]
+    # Detach first: MySQL checks (and cascades) the self-referencing foreign key row by row
+    db.execute(update(model).where(key_column.in_(ids)).values({parent: None}).execution_options(synchronize_session=False))
+    db.execute(delete(model).where(key_column.in_(ids)).execution_options(synchronize_session=False))
+    return snapshots
@@ -1,7 +1,12 @@
 # industries/crud.py
 from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, select, update
 from typing import List, Optional
-from . import models, schemas
+import entity_cache
+import forest
+import hierarchy
+import tree_nodes
+from . import models, paths, schemas
 
 def get_category_by_level(level: int) -> str:
     """Get category based on hierarchy level"""
@@ -19,49 +24,58 @@ def get_category_by_level(level: int) -> str:
             category += "-sub"
         return category
 
+# "sub-sub-...-sub" for the deepest level the category column can hold; level n is its first 4n - 1 characters
+_SUB_LABELS = get_category_by_level((models.Industry.category.type.length + 1) // 4)
+
+def category_expression(depth):
+    """SQL equivalent of get_category_by_level for a depth expression"""
+    return case((depth == 0, "Main Industry"), else_=func.substr(_SUB_LABELS, 1, depth * 4 - 1))
+
+def load_industry_hierarchy(db: Session) -> hierarchy.Hierarchy:
+    """All industries (session-bound, pending changes flushed) indexed by parent, from one query"""
+    return hierarchy.load(db, models.Industry, key="id")
+
 def get_industry_level(db: Session, industry_id: int) -> int:
     """Get the level of an industry in hierarchy"""
-    industry = db.query(models.Industry).filter(models.Industry.id == industry_id).first()
-    if not industry or industry.parent_id is None:
-        return 0
-    return get_industry_level(db, industry.parent_id) + 1
+    level = db.execute(select(models.Industry.depth).where(models.Industry.id == industry_id)).scalar()
+    return level or 0
 
 def update_industry_and_children_categories(db: Session, industry_id: int, new_level: int):
-    """Update category of an industry and all its descendants"""
-    industry = db.query(models.Industry).filter(models.Industry.id == industry_id).first()
-    if industry:
-        industry.category = get_category_by_level(new_level)
-        children = db.query(models.Industry).filter(models.Industry.parent_id == industry_id).all()
-        for child in children:
-            update_industry_and_children_categories(db, child.id, new_level + 1)
-
-def is_descendant(db: Session, child_id: int, parent_id: int, visited=None) -> bool:
+    """Update depth and category of an industry and all its descendants in one statement"""
+    below = (
+        select(models.IndustryPath.depth)
+        .where(models.IndustryPath.ancestor_id == industry_id, models.IndustryPath.descendant_id == models.Industry.id)
+        .scalar_subquery()
+    )
+    subtree = select(models.IndustryPath.descendant_id).where(models.IndustryPath.ancestor_id == industry_id)
+    # Both values come from the closure table (not from industries itself, which MySQL cannot read in its own UPDATE)
+    db.execute(
+        update(models.Industry)
+        .where(models.Industry.id.in_(subtree))
+        .values(depth=new_level + below, category=category_expression(new_level + below))
+        .execution_options(synchronize_session=False)
+    )
+
+def is_descendant(db: Session, child_id: int, parent_id: int) -> bool:
     """Check if parent_id is a descendant of child_id"""
-    if visited is None:
-        visited = set()
-    
     if child_id == parent_id:
         return True
-    
-    if child_id in visited:
-        return False
-    
-    visited.add(child_id)
-    
-    children = db.query(models.Industry).filter(models.Industry.parent_id == child_id).all()
-    for child in children:
-        if is_descendant(db, child.id, parent_id, visited):
-            return True
-    
-    return False
+    return db.execute(
+        select(models.IndustryPath.depth).where(
+            models.IndustryPath.ancestor_id == child_id,
+            models.IndustryPath.descendant_id == parent_id,
+        )
+    ).first() is not None
 
 def get_all_children(parent_id: int, db: Session) -> List[models.Industry]:
     """Get all children recursively for an industry"""
-    children = db.query(models.Industry).filter(models.Industry.parent_id == parent_id).all()
-    all_children = list(children)
-    for child in children:
-        all_children.extend(get_all_children(child.id, db))
-    return all_children
+    return (
+        db.query(models.Industry)
+        .join(models.IndustryPath, models.IndustryPath.descendant_id == models.Industry.id)
+        .filter(models.IndustryPath.ancestor_id == parent_id, models.IndustryPath.depth > 0)
+        .order_by(models.IndustryPath.depth, models.Industry.id)
+        .all()
+    )
 
 def get_industry(db: Session, industry_id: int) -> Optional[models.Industry]:
     """Get a single industry by ID"""
@@ -73,20 +87,22 @@ def get_industries(db: Session, skip: int = 0, limit: int = 100) -> List[models.
 
 def get_all_industries(db: Session) -> List[models.Industry]:
     """Get all industries"""
-    return db.query(models.Industry).all()
+    return entity_cache.get_all(db, models.Industry, lambda: db.query(models.Industry).all())
 
 def create_industry(db: Session, industry: schemas.IndustryCreate) -> models.Industry:
     """Create a new industry"""
     industry_data = industry.dict()
     
     if industry_data.get('parent_id'):
-        parent_level = get_industry_level(db, industry_data['parent_id'])
-        industry_data['category'] = get_category_by_level(parent_level + 1)
+        industry_data['depth'] = get_industry_level(db, industry_data['parent_id']) + 1
     else:
-        industry_data['category'] = "Main Industry"
+        industry_data['depth'] = 0
+    industry_data['category'] = get_category_by_level(industry_data['depth'])
     
     db_industry = models.Industry(**industry_data)
     db.add(db_industry)
+    db.flush()
+    paths.add(db, db_industry.id, db_industry.parent_id)
     db.commit()
     db.refresh(db_industry)
     return db_industry
@@ -116,6 +132,8 @@ def update_industry_parent(db: Session, update: schemas.IndustryUpdateParent) ->
             return None
 
     industry.parent_id = update.new_parent_id
+    db.flush()
+    paths.move(db, update.id, update.new_parent_id)
     
     if update.new_parent_id is None:
         new_level = 0
@@ -129,34 +147,65 @@ def update_industry_parent(db: Session, update: schemas.IndustryUpdateParent) ->
     db.refresh(industry)
     return industry
 
-def delete_industry(db: Session, industry_id: int) -> bool:
-    """Delete industry and all its children"""
-    industry = get_industry(db, industry_id)
-    if not industry:
-        return False
-    
-    children_to_delete = get_all_children(industry_id, db)
-    
-    for child in children_to_delete:
-        db.delete(child)
-    
-    db.delete(industry)
+def delete_industry(db: Session, industry_id: int) -> int:
+    """Delete industry and all its children, returns the number of industries deleted (0 if not found)"""
+    ids = [node_id for node_id, _ in paths.subtree(db, industry_id)]
+    if not ids:
+        return 0
+
+    paths.remove(db, ids)
+    # Detach first: the self-referencing foreign key is checked row by row within one DELETE
+    db.execute(
+        update(models.Industry).where(models.Industry.id.in_(ids)).values(parent_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        delete(models.Industry).where(models.Industry.id.in_(ids)).execution_options(synchronize_session=False)
+    )
     db.commit()
-    return True
+    return len(ids)
 
 def get_industry_children(db: Session, industry_id: int) -> List[models.Industry]:
     """Get direct children of an industry"""
     return db.query(models.Industry).filter(models.Industry.parent_id == industry_id).all()
 
+def build_industry_tree(db: Session) -> List[dict]:
+    """Build the nested industry tree from a single query"""
+    industries = hierarchy.Hierarchy(get_all_industries(db), key="id")
+    return industries.forest(lambda ind: {
+        "id": ind.id,
+        "industry_name": ind.industry_name,
+        "category": ind.category,
+        "parent_id": ind.parent_id,
+    })
+
+industry_forest = forest.register(models.Industry, key="id")
+
+def get_industry_tree_nodes(parent_id: Optional[int] = None, depth: int = 1, cursor: Optional[int] = None, limit: int = 100) -> Optional[dict]:
+    """A page of lightweight industry nodes under parent_id (None if the parent does not exist)"""
+    def page(view):
+        if parent_id is not None and parent_id not in view:
+            return None
+        return tree_nodes.expand(view, lambda industry: {"name": industry.industry_name, "type": industry.category}, parent_id, depth, cursor, limit)
+    return industry_forest.read(page)
+
 def get_industry_hierarchy(db: Session) -> List[models.Industry]:
     """Get all industries in a hierarchical structure (top-level parents first)"""
     return db.query(models.Industry).filter(models.Industry.parent_id.is_(None)).all()
 
+def recompute_depths(bind):
+    """Set depth and category of every industry from the industry_paths closure table (two statements)"""
+    # A node's deepest path is the one to its root
+    level = (
+        select(func.max(models.IndustryPath.depth))
+        .where(models.IndustryPath.descendant_id == models.Industry.id)
+        .scalar_subquery()
+    )
+    for values in ({"depth": func.coalesce(level, 0)}, {"category": category_expression(models.Industry.depth)}):
+        bind.execute(update(models.Industry).values(values).execution_options(synchronize_session=False))
+
 def fix_existing_categories(db: Session):
-    """Fix categories for all existing industries"""
-    root_industries = db.query(models.Industry).filter(models.Industry.parent_id == None).all()
-    
-    for root in root_industries:
-        update_industry_and_children_categories(db, root.id, 0)
-    
+    """Fix categories (and the industry_paths closure table) for all existing industries"""
+    paths.rebuild(db.connection())
+    recompute_depths(db)
     db.commit()
\ No newline at end of file
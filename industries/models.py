@@ -1,5 +1,5 @@
 # industries/models.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from database import Base  # Import Base from database.py
 
 class Industry(Base):
@@ -8,4 +8,18 @@ class Industry(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     industry_name = Column(String(255), nullable=False)  # Specify length for MySQL
     category = Column(String(100), nullable=False)       # Specify length for MySQL
-    parent_id = Column(Integer, ForeignKey("industries.id"))
\ No newline at end of file
+    parent_id = Column(Integer, ForeignKey("industries.id"))
+    depth = Column(Integer, nullable=False, default=0, server_default="0")  # 0 for main industries; category is derived from it
+
+class IndustryPath(Base):
+    """Closure table: one row per (ancestor, descendant) pair, including each industry with itself at depth 0"""
+    __tablename__ = "industry_paths"
+
+    ancestor_id = Column(Integer, ForeignKey("industries.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("industries.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Ancestor chains and levels look paths up by descendant
+        Index("ix_industry_paths_descendant", "descendant_id", "depth"),
+    )
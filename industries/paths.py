@@ -0,0 +1,71 @@
+# industries/paths.py
+"""
+Maintenance of the industry_paths closure table. Every industry has a row per ancestor
+(and one for itself at depth 0), so subtree, ancestor, level and descendant questions are
+a single indexed lookup. Statements take their id lists from a prior SELECT instead of a
+subquery on industry_paths itself, which MySQL does not allow in UPDATE / DELETE.
+"""
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from hierarchy import Hierarchy
+from .models import Industry, IndustryPath
+
+def add(db: Session, industry_id: int, parent_id: Optional[int]):
+    """Paths for a new leaf: the parent's ancestors plus itself"""
+    own = select(literal(industry_id), literal(industry_id), literal(0))
+    if parent_id is not None:
+        inherited = select(IndustryPath.ancestor_id, literal(industry_id), IndustryPath.depth + 1).where(
+            IndustryPath.descendant_id == parent_id
+        )
+        own = union_all(inherited, own)
+    db.execute(insert(IndustryPath).from_select(["ancestor_id", "descendant_id", "depth"], own))
+
+def subtree(db: Session, industry_id: int) -> List[Tuple[int, int]]:
+    """(descendant id, depth below industry_id) for the industry and everything under it"""
+    return [tuple(row) for row in db.execute(
+        select(IndustryPath.descendant_id, IndustryPath.depth)
+        .where(IndustryPath.ancestor_id == industry_id)
+        .order_by(IndustryPath.depth, IndustryPath.descendant_id)
+    )]
+
+def move(db: Session, industry_id: int, new_parent_id: Optional[int]) -> List[Tuple[int, int]]:
+    """Re-hang a subtree: drop its links to the old ancestors, link it to the new ones"""
+    nodes = subtree(db, industry_id)
+    ids = [node_id for node_id, _ in nodes]
+    db.execute(
+        delete(IndustryPath)
+        .where(IndustryPath.descendant_id.in_(ids), IndustryPath.ancestor_id.notin_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    if new_parent_id is not None:
+        ancestors = db.execute(
+            select(IndustryPath.ancestor_id, IndustryPath.depth).where(IndustryPath.descendant_id == new_parent_id)
+        ).all()
+        rows = [
+            {"ancestor_id": ancestor_id, "descendant_id": node_id, "depth": ancestor_depth + node_depth + 1}
+            for ancestor_id, ancestor_depth in ancestors
+            for node_id, node_depth in nodes
+        ]
+        if rows:
+            db.execute(insert(IndustryPath), rows)
+    return nodes
+
+def remove(db: Session, ids: List[int]):
+    """Drop every path touching the given (about to be deleted) industries"""
+    db.execute(
+        delete(IndustryPath).where(IndustryPath.descendant_id.in_(ids)).execution_options(synchronize_session=False)
+    )
+
+def rebuild(connection) -> int:
+    """Recompute the whole table from industries.parent_id (migration / repair), returns the row count"""
+    industries = Hierarchy(connection.execute(select(Industry.id, Industry.parent_id)).all(), key="id")
+    rows = []
+    for industry_id in industries.rows:
+        rows.append({"ancestor_id": industry_id, "descendant_id": industry_id, "depth": 0})
+        for depth, ancestor_id in enumerate(industries.ancestors(industry_id), start=1):
+            rows.append({"ancestor_id": ancestor_id, "descendant_id": industry_id, "depth": depth})
+    connection.execute(delete(IndustryPath.__table__))
+    if rows:
+        connection.execute(insert(IndustryPath.__table__), rows)
+    return len(rows)
@@ -1,8 +1,9 @@
 # industries/routes.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Optional
+from database import get_db, get_read_db
+import tree_nodes
 from . import crud, schemas
 
 router = APIRouter()
@@ -16,7 +17,7 @@ def create_industry(industry: schemas.IndustryCreate, db: Session = Depends(get_
         raise HTTPException(status_code=400, detail=f"Error creating industry: {str(e)}")
 
 @router.get("/", response_model=List[schemas.Industry])
-def read_industries(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_industries(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get industries with pagination"""
     try:
         industries = crud.get_industries(db, skip=skip, limit=limit)
@@ -25,7 +26,7 @@ def read_industries(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
         raise HTTPException(status_code=500, detail=f"Error fetching industries: {str(e)}")
 
 @router.get("/all", response_model=List[schemas.Industry])
-def read_all_industries(db: Session = Depends(get_db)):
+def read_all_industries(db: Session = Depends(get_read_db)):
     """Get all industries"""
     try:
         return crud.get_all_industries(db)
@@ -33,33 +34,28 @@ def read_all_industries(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error fetching industries: {str(e)}")
 
 @router.get("/tree")
-def get_industry_tree(db: Session = Depends(get_db)):
+def get_industry_tree(db: Session = Depends(get_read_db)):
     """Get industry hierarchy tree"""
     try:
-        all_industries = crud.get_all_industries(db)
-        
-        industry_map = {ind.id: {
-            "id": ind.id,
-            "industry_name": ind.industry_name,
-            "category": ind.category,
-            "parent_id": ind.parent_id,
-            "children": []
-        } for ind in all_industries}
-        
-        tree = []
-        for industry in all_industries:
-            if industry.parent_id is None:
-                tree.append(industry_map[industry.id])
-            else:
-                if industry.parent_id in industry_map:
-                    industry_map[industry.parent_id]["children"].append(industry_map[industry.id])
-        
-        return tree
+        return crud.build_industry_tree(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error building tree: {str(e)}")
 
+@router.get("/tree/nodes", response_model=tree_nodes.TreeNodePage)
+def get_industry_tree_nodes(
+    parent_id: Optional[int] = Query(None, description="Expand this industry's children (roots when omitted)"),
+    depth: int = Query(1, ge=1, le=tree_nodes.TREE_NODES_MAX_DEPTH, description="Levels to expand"),
+    cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=tree_nodes.TREE_NODES_MAX_LIMIT, description="Nodes per sibling list"),
+):
+    """Get one level (or a few) of the industry tree as lightweight, paginated nodes"""
+    page = crud.get_industry_tree_nodes(parent_id, depth, cursor, limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Industry not found")
+    return page
+
 @router.get("/{industry_id}", response_model=schemas.Industry)
-def read_industry(industry_id: int, db: Session = Depends(get_db)):
+def read_industry(industry_id: int, db: Session = Depends(get_read_db)):
     """Get a specific industry by ID"""
     try:
         db_industry = crud.get_industry(db, industry_id=industry_id)
@@ -72,7 +68,7 @@ def read_industry(industry_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error fetching industry: {str(e)}")
 
 @router.get("/{industry_id}/children", response_model=List[schemas.Industry])
-def read_industry_children(industry_id: int, db: Session = Depends(get_db)):
+def read_industry_children(industry_id: int, db: Session = Depends(get_read_db)):
     """Get direct children of an industry"""
     try:
         children = crud.get_industry_children(db, industry_id)
@@ -110,13 +106,10 @@ def update_industry_parent(update: schemas.IndustryUpdateParent, db: Session = D
 def delete_industry(industry_id: int, db: Session = Depends(get_db)):
     """Delete industry and all its children"""
     try:
-        # Get count of children before deletion
-        children_to_delete = crud.get_all_children(industry_id, db)
-        children_count = len(children_to_delete)
-        
-        success = crud.delete_industry(db, industry_id)
-        if not success:
+        deleted_count = crud.delete_industry(db, industry_id)
+        if not deleted_count:
             raise HTTPException(status_code=404, detail="Industry not found")
+        children_count = deleted_count - 1
         
         return {
             "message": f"Industry and {children_count} children deleted successfully",
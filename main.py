@@ -1,99 +1,287 @@
-from fastapi import FastAPI
-from database import engine, Base
-from fastapi.middleware.cors import CORSMiddleware
-
-# Import company modules
-from companies import models as company_models
-from companies.routes import router as company_router
-
-# Import industry modules
-from industries import models as industry_models
-from industries.routes import router as industry_router
-
-# Import group modules
-from groups import models as group_models
-from groups.routes import router as group_router
-
-# Import division modules
-from divisions import models as division_models
-from divisions.routes import router as division_router
-
-# Import person modules
-from persons import models as person_models
-from persons.routes import router as person_router
-
-# Import audit log modules
-from audit_logs import models as audit_log_models
-from audit_logs.routes import router as audit_log_router
-
-# Import email modules
-from emails import models as email_models
-from emails.routes import router as email_router
-
-# Import cell phone modules
-from cell_phones import models as cell_phone_models
-from cell_phones.routes import router as cell_phone_router
-
-# Create all tables (both industries and companies will use the same Base)
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="Business Management API",
-    description="API for managing industries and companies",
-    version="1.0.0"
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins temporarily to fix CORS
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include company routes
-app.include_router(company_router, prefix="/companies", tags=["companies"])
-
-# Include industry routes
-app.include_router(industry_router, prefix="/industries", tags=["industries"])
-
-# Include group routes
-app.include_router(group_router, prefix="/groups", tags=["groups"])
-
-# Include division routes
-app.include_router(division_router, prefix="/divisions", tags=["divisions"])
-
-# Include person routes
-app.include_router(person_router, prefix="/persons", tags=["persons"])
-
-# Include audit log routes
-app.include_router(audit_log_router)
-
-# Include email routes
-app.include_router(email_router, prefix="/emails", tags=["emails"])
-
-# Include cell phone routes
-app.include_router(cell_phone_router, prefix="/cell-phones", tags=["cell-phones"])
-
-@app.get("/health")
-def health_check():
-    return {"status": "healthy", "message": "Business Management API is running"}
-
-@app.get("/")
-def read_root():
-    return {"message": "Business Management API is running"}
-
-@app.get("/routes")
-def get_routes():
-    routes = []
-    for route in app.routes:
-        if hasattr(route, 'methods') and hasattr(route, 'path'):
-            routes.append({
-                "path": route.path,
-                "methods": list(route.methods)
-            })
-    return {"routes": routes}
-
-if __name__ == "__main__":
-    import uvicorn
+import startup  # first import so the startup report covers everything below
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+with startup.phase("import fastapi"):
+    from fastapi import FastAPI, Request, Response, Depends
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRouter
+    from starlette.routing import BaseRoute, Match
+
+with startup.phase("import database"):
+    import query_stats
+    import deadlines
+    import admission
+    import singleflight
+    import etags
+    import response_cache
+    from database import engine, pool_pinger, read_pool_pinger, pin_to_primary, is_pinned_to_primary
+    from schema_version import check_schema
+    import warmup
+
+logger = logging.getLogger(__name__)
+
+# (module, prefix, tags, statement deadline ms) for every router - imported through
+# startup.import_module so each module's import cost shows up in the startup report.
+# Deadlines are overridable per router with DB_DEADLINE_MS_<NAME> (0 disables).
+# None of them is imported before the worker starts serving: see load_routers.
+ROUTERS = [
+    ("companies.routes", "/companies", ["companies"], deadlines.budget_ms("companies", 10000)),
+    ("industries.routes", "/industries", ["industries"], deadlines.budget_ms("industries", 5000)),
+    ("groups.routes", "/groups", ["groups"], deadlines.budget_ms("groups", 5000)),
+    ("divisions.routes", "/divisions", ["divisions"], deadlines.budget_ms("divisions", 5000)),
+    ("persons.routes", "/persons", ["persons"], deadlines.budget_ms("persons", 10000)),
+    ("audit_logs.routes", None, None, deadlines.budget_ms("audit_logs", 5000)),  # router declares its own prefix and tags
+    ("emails.routes", "/emails", ["emails"], deadlines.budget_ms("emails", 10000)),
+    ("cell_phones.routes", "/cell-phones", ["cell-phones"], deadlines.budget_ms("cell_phones", 10000)),
+    ("reference.routes", "/reference", ["reference"], deadlines.budget_ms("reference", 5000)),
+    ("admin.routes", "/admin", ["admin"], deadlines.budget_ms("admin", 30000)),
+    ("health.routes", "/health", ["health"], 0),
+]
+
+# Tables are no longer created at import time (one round-trip per table to the remote
+# MySQL); run `python migrate.py` after deploying a schema change instead.
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A single cheap query instead of create_all: warn if migrations are pending
+    with startup.phase("schema version check"):
+        try:
+            current, expected = check_schema(engine)
+            if current < expected:
+                logger.error("Database schema is at version %s but the code expects %s - run `python migrate.py`", current, expected)
+        except Exception as e:
+            logger.error("Schema version check failed: %s", e)
+    # Keep idle pool connections alive out of band instead of pinging on every request
+    pool_pinger.start()
+    if read_pool_pinger:
+        read_pool_pinger.start()
+    startup.mark_ready()
+    # Load the routers, warm pools, reference data and response models in the background; /ready flips when done
+    warmup_task = asyncio.create_task(warmup.run(load_routers))
+    yield
+    if not warmup_task.done():
+        warmup_task.cancel()
+    pool_pinger.stop()
+    if read_pool_pinger:
+        read_pool_pinger.stop()
+
+app = FastAPI(
+    title="Business Management API",
+    description="API for managing industries and companies",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # Allow all origins temporarily to fix CORS
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# The middleware registered last runs outermost, so a request passes through them bottom-up:
+# conditional_get -> encoded_responses -> coalesce_requests -> admission_control
+# -> statement_deadlines -> sql_instrumentation -> read_your_writes -> route
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    # Successful writes pin the client to the primary so it sees its own changes despite replica lag
+    response = await call_next(request)
+    if request.method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400:
+        pin_to_primary(response)
+    return response
+
+@app.middleware("http")
+async def sql_instrumentation(request: Request, call_next):
+    # Count the statements each request issues and flag repeated shapes (N+1 patterns)
+    token, stats = query_stats.start_request()
+    try:
+        response = await call_next(request)
+    finally:
+        query_stats.finish_request(token, label=f"{request.method} {request.url.path}")
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time"] = f"{stats.total_time * 1000:.3f}"
+    return response
+
+@app.middleware("http")
+async def statement_deadlines(request: Request, call_next):
+    # The router dependency arms the budget; a cancelled statement turns the response into a 503
+    token, deadline = deadlines.start_request()
+    try:
+        response = await call_next(request)
+    except Exception:
+        if not deadline.expired:
+            raise
+        response = None
+    finally:
+        deadlines.finish_request(token)
+    if deadline.expired:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Database deadline of {deadline.budget_ms} ms exceeded for {request.method} {request.url.path}"},
+            headers={"Retry-After": "1"},
+        )
+    return response
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    # Shed requests the pool cannot serve before any database work is done for them; 304s, stored
+    # responses and coalesced followers are answered by the layers outside this one and never take a slot
+    route_class = admission.classify(request.method, request.url.path)
+    if route_class is None:
+        return await call_next(request)
+    counter = admission.route_classes[route_class]
+    if not counter.try_acquire():
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Server is at capacity for {route_class} ({counter.limit} in flight), retry shortly"},
+            headers={"Retry-After": str(admission.ADMISSION_RETRY_AFTER)},
+        )
+    try:
+        return await call_next(request)
+    finally:
+        counter.release()
+
+@app.middleware("http")
+async def coalesce_requests(request: Request, call_next):
+    # Identical concurrent GETs share one computation; followers never reach admission control
+    if admission.classify(request.method, request.url.path) is None:
+        return await call_next(request)
+    if request.method != "GET":
+        # Before and after: nothing started around the commit is shared with later readers
+        scope = singleflight.scope_of(request.url.path)
+        singleflight.requests.invalidate(scope)
+        try:
+            return await call_next(request)
+        finally:
+            singleflight.requests.invalidate(scope)
+
+    key = singleflight.requests.key(request.url.path, request.url.query, variant=(is_pinned_to_primary(request),), headers=request.headers)
+
+    async def compute():
+        return await singleflight.SharedResponse.read(await call_next(request))
+
+    shared, coalesced = await singleflight.requests.do(key, compute)
+    if shared is None or (coalesced and not shared.shareable()):
+        # The request we joined failed, or its response depends on headers we may not share - run our own
+        return await call_next(request)
+    return shared.to_response(coalesced=coalesced)
+
+@app.middleware("http")
+async def encoded_responses(request: Request, call_next):
+    # Repeat reads of trees / full lists are written out as stored bytes, skipping ORM, pydantic and JSON
+    if request.method != "GET":
+        return await call_next(request)
+    key = response_cache.key_for(request.url.path, request.url.query, variant=(is_pinned_to_primary(request),))
+    if key is None:
+        return await call_next(request)
+    cached = response_cache.get(request.url.path, key)
+    if cached is not None:
+        return cached.to_response(request.headers.get("accept-encoding", ""))
+    generation = response_cache.generation(request.url.path)
+    shared = await singleflight.SharedResponse.read(await call_next(request))
+    if shared.status_code == 200 and b"content-encoding" not in dict(shared.raw_headers):
+        media_type = dict(shared.raw_headers).get(b"content-type", b"application/json").decode("latin-1")
+        response_cache.put(request.url.path, key, shared.body, media_type, generation)
+    return shared.to_response()
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    # Unchanged trees / full lists: answer If-None-Match from the table versions alone
+    if request.method != "GET":
+        return await call_next(request)
+    etag = etags.etag_for(request.url.path)
+    if etag is None:
+        return await call_next(request)
+    if etags.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+class DeferredRouters(BaseRoute):
+    """
+    Stands in for the ROUTERS until they are loaded. A partial match for every path, so the
+    app's own routes (/health, /ready, ...) still win; any other request loads the routers off
+    the event loop and is then dispatched again.
+    """
+
+    def matches(self, scope):
+        return (Match.PARTIAL, {}) if scope["type"] == "http" else (Match.NONE, {})
+
+    async def handle(self, scope, receive, send):
+        await asyncio.to_thread(load_routers)
+        await app.router(scope, receive, send)
+
+_deferred_routers = DeferredRouters()
+_routers_lock = threading.Lock()
+
+def load_routers() -> int:
+    """
+    Import and include every router (once; by the warm-up, or by the first request that needs
+    one). Importing them all takes a third of a cold start, which no longer delays the
+    first /health or /ready answer. Returns the number of routes added.
+    """
+    with _routers_lock:
+        if _deferred_routers not in app.router.routes:
+            return 0
+        staging = APIRouter()
+        with startup.phase("include routers"):
+            for module_name, prefix, tags, deadline_ms in ROUTERS:
+                router = startup.import_module(module_name).router
+                dependencies = [Depends(deadlines.statement_deadline(deadline_ms))] if deadline_ms else []
+                if prefix is None:
+                    staging.include_router(router, dependencies=dependencies)
+                else:
+                    staging.include_router(router, prefix=prefix, tags=tags, dependencies=dependencies)
+        # One assignment: requests being routed right now see either the old or the new list
+        app.router.routes = [route for route in app.router.routes if route is not _deferred_routers] + staging.routes
+        return len(staging.routes)
+
+app.router.routes.append(_deferred_routers)
+
+_build_openapi = app.openapi
+
+def openapi():
+    load_routers()
+    return _build_openapi()
+
+app.openapi = openapi
+
+@app.get("/health")
+def health_check():
+    return {"status": "healthy", "message": "Business Management API is running"}
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 503 until the startup warm-up has finished"""
+    if not warmup.state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming up", "steps": warmup.state["steps"]})
+    return {"status": "ready", "steps": warmup.state["steps"], "errors": warmup.state["errors"]}
+
+@app.get("/")
+def read_root():
+    return {"message": "Business Management API is running"}
+
+@app.get("/routes")
+def get_routes():
+    load_routers()
+    routes = []
+    for route in app.routes:
+        if hasattr(route, 'methods') and hasattr(route, 'path'):
+            routes.append({
+                "path": route.path,
+                "methods": list(route.methods)
+            })
+    return {"routes": routes}
+
+if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Apply pending schema migrations (replaces create_all at application import time)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import engine
+from schema_version import migrate, check_schema, SCHEMA_VERSION
+
+def run_migrations():
+    """Bring the database up to the schema version this code expects"""
+    current, expected = check_schema(engine)
+    print(f"Database schema version: {current}, expected: {expected}")
+    if current >= expected:
+        print("Schema is up to date.")
+        return
+
+    applied = migrate(engine)
+    for version in applied:
+        print(f"✓ Applied migration {version}")
+    print(f"\nMigration completed! Schema is now at version {SCHEMA_VERSION}")
+
+if __name__ == "__main__":
+    try:
+        run_migrations()
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,260 @@
+# negative_cache.py
+"""
+Negative-result cache for uniqueness checks (email address, phone number, NIC): answers
+"definitely not present" without a database round-trip.
+
+Each registered unique column has
+- a Bloom filter loaded from the column at startup (no false negatives, ~1% false positives)
+- a bounded LRU of values the database recently reported missing (used only while the filter
+  is not loaded or stale)
+
+Session hooks keep both correct: flushed inserts / updates add their value to the filter and
+drop it from the miss list. Like entity_cache namespaces, each index has a generation that
+every insert bumps; a miss found by a query that started before is not recorded. Deletes cannot be removed from a Bloom filter - they only cost an
+extra query - so the filter is rebuilt once enough of them pile up. Commits in other workers
+(seen through cache_versions) clear the miss list and schedule a rebuild; until it finishes the
+column falls back to the database. The unique constraints remain the final guard.
+"""
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+import cache_versions
+
+logger = logging.getLogger(__name__)
+
+NEGATIVE_CACHE_ENABLED = os.getenv("NEGATIVE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "10000"))
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "300"))
+BLOOM_FALSE_POSITIVE_RATE = float(os.getenv("BLOOM_FALSE_POSITIVE_RATE", "0.01"))
+# Minimum seconds between two rebuilds of one filter (writes in other workers trigger them)
+BLOOM_MIN_RELOAD_SECONDS = float(os.getenv("BLOOM_MIN_RELOAD_SECONDS", "30"))
+# Rebuild a filter once deletes exceed this fraction of the values it was loaded with
+BLOOM_REBUILD_DELETE_RATIO = float(os.getenv("BLOOM_REBUILD_DELETE_RATIO", "0.2"))
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)"""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1000)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+class UniqueIndex:
+    """Negative cache for one unique column"""
+
+    def __init__(self, column, normalize: Callable[[str], str] = None):
+        self.column = column
+        self.model = column.class_
+        self.table = self.model.__table__.name
+        self.key = f"{self.table}.{column.key}"
+        self.normalize = normalize or (lambda value: value)
+        self.lock = threading.Lock()
+        self.bloom: Optional[BloomFilter] = None
+        self.misses: "OrderedDict[str, float]" = OrderedDict()
+        self.stale = False
+        self.reloading = False
+        self.invalidated_while_loading = False
+        self.loaded_at: Optional[float] = None
+        self.pending_adds = []
+        self.deletes_since_load = 0
+        self.generation = 0
+        self.checks = 0
+        self.served_without_db = 0
+        self.false_positives = 0
+
+    def might_exist(self, value: str) -> bool:
+        """False means the value is definitely not in the column"""
+        value = self.normalize(value)
+        self.checks += 1
+        if not NEGATIVE_CACHE_ENABLED:
+            return True
+        cache_versions.check()
+        with self.lock:
+            if self.bloom is not None and not self.stale:
+                # A "maybe" from the filter goes to the database - the miss list may predate an insert
+                if value in self.bloom:
+                    return True
+                self.served_without_db += 1
+                return False
+            stored_at = self.misses.get(value)
+            if stored_at is not None and time.monotonic() - stored_at <= NEGATIVE_CACHE_TTL:
+                self.misses.move_to_end(value)
+                self.served_without_db += 1
+                return False
+        return True
+
+    def record_miss(self, value: str, generation: int):
+        """The database just reported value as absent (generation: read before the query)"""
+        value = self.normalize(value)
+        with self.lock:
+            if generation != self.generation:
+                return  # an insert (or another worker's write) landed meanwhile - the miss may be outdated
+            if self.bloom is not None and not self.stale and value in self.bloom:
+                self.false_positives += 1
+            self.misses[value] = time.monotonic()
+            self.misses.move_to_end(value)
+            while len(self.misses) > NEGATIVE_CACHE_MAX_ENTRIES:
+                self.misses.popitem(last=False)
+
+    def added(self, value: str):
+        value = self.normalize(value)
+        with self.lock:
+            self.generation += 1
+            self.misses.pop(value, None)
+            if self.bloom is not None:
+                self.bloom.add(value)
+            if self.reloading:
+                self.pending_adds.append(value)
+
+    def deleted(self):
+        with self.lock:
+            self.deletes_since_load += 1
+            loaded = self.bloom.count if self.bloom is not None else 0
+            rebuild = self.bloom is not None and self.deletes_since_load > max(100, loaded * BLOOM_REBUILD_DELETE_RATIO)
+        if rebuild:
+            self.reload_in_background()
+
+    def invalidate(self):
+        """Another worker wrote to the table: forget misses and stop trusting the filter"""
+        with self.lock:
+            self.generation += 1
+            self.misses.clear()
+            if self.reloading:
+                self.invalidated_while_loading = True
+            if self.bloom is not None:
+                self.stale = True
+        if self.bloom is not None:
+            self.reload_in_background()
+
+    def load(self, db: Session, claimed: bool = False):
+        """(Re)build the Bloom filter from the column (read from the primary - a lagging replica would miss values)"""
+        if not claimed:
+            with self.lock:
+                self.reloading = True
+                self.pending_adds = []
+                self.invalidated_while_loading = False
+        retry = False
+        try:
+            values = [self.normalize(v) for v in db.execute(select(self.column).where(self.column.isnot(None))).scalars()]
+            bloom = BloomFilter(len(values) * 2)
+            for value in values:
+                bloom.add(value)
+            with self.lock:
+                for value in self.pending_adds:
+                    bloom.add(value)
+                self.bloom = bloom
+                # Another worker's write may have landed after the SELECT - stay stale and go again
+                self.stale = retry = self.invalidated_while_loading
+                self.deletes_since_load = 0
+                self.loaded_at = time.time()
+        finally:
+            with self.lock:
+                self.reloading = False
+                self.pending_adds = []
+                self.invalidated_while_loading = False
+        if retry:
+            self.reload_in_background()
+
+    def reload_in_background(self):
+        with self.lock:
+            if self.reloading:
+                return
+            self.reloading = True
+            self.pending_adds = []
+            self.invalidated_while_loading = False
+
+        def run():
+            from database import SessionLocal
+            if self.loaded_at is not None:
+                # Stale filters fall back to the database meanwhile, so waiting is always safe
+                time.sleep(max(0.0, self.loaded_at + BLOOM_MIN_RELOAD_SECONDS - time.time()))
+            db = SessionLocal()
+            try:
+                self.load(db, claimed=True)
+            except Exception as e:
+                logger.warning("Reloading the %s filter failed: %s", self.key, e)
+            finally:
+                db.close()
+
+        threading.Thread(target=run, name=f"bloom-{self.key}", daemon=True).start()
+
+    def stats(self) -> Dict:
+        return {
+            "bloom_loaded": self.bloom is not None,
+            "bloom_values": self.bloom.count if self.bloom is not None else 0,
+            "bloom_bytes": len(self.bloom.bits) if self.bloom is not None else 0,
+            "stale": self.stale,
+            "misses_cached": len(self.misses),
+            "checks": self.checks,
+            "served_without_db": self.served_without_db,
+            "false_positives": self.false_positives,
+            "deletes_since_load": self.deletes_since_load,
+            "loaded_at": self.loaded_at,
+        }
+
+_indexes: Dict[str, UniqueIndex] = {}
+
+def register(column, normalize: Callable[[str], str] = None) -> UniqueIndex:
+    """Track a unique column, e.g. register(models.EmailDirectory.email_address, str.lower)"""
+    index = UniqueIndex(column, normalize)
+    return _indexes.setdefault(index.key, index)
+
+def indexes() -> Dict[str, UniqueIndex]:
+    return dict(_indexes)
+
+def load_all(db: Session) -> Dict[str, int]:
+    """Load every registered filter (startup warm-up)"""
+    loaded = {}
+    for key, index in indexes().items():
+        index.load(db)
+        loaded[key] = index.bloom.count
+    return loaded
+
+def stats() -> Dict:
+    return {"enabled": NEGATIVE_CACHE_ENABLED, "columns": {key: index.stats() for key, index in sorted(_indexes.items())}}
+
+def _indexes_for(instance):
+    table = getattr(inspect(instance).mapper.local_table, "name", None)
+    return [index for index in _indexes.values() if index.table == table]
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    for instance in list(session.new) + list(session.dirty):
+        for index in _indexes_for(instance):
+            value = getattr(instance, index.column.key, None)
+            if value is not None:
+                index.added(value)
+    for instance in session.deleted:
+        for index in _indexes_for(instance):
+            index.deleted()
+
+def _drop_stale(slots):
+    slots = set(slots)
+    for index in indexes().values():
+        if cache_versions.slot_of(index.table) in slots:
+            index.invalidate()
+
+cache_versions.on_stale(_drop_stale)
@@ -1,19 +1,17 @@
-import sys
-import os
-
-sys.path.insert(0, os.path.dirname(__file__))
-
-from main import app
-
-# ASGI to WSGI adapter for FastAPI
-try:
-    from asgiref.wsgi import WsgiToAsgi
-    application = WsgiToAsgi(app)
-except ImportError:
-    # If asgiref not available, try a2wsgi
-    try:
-        from a2wsgi import ASGIMiddleware
-        application = ASGIMiddleware(app)
-    except ImportError:
-        # Fallback - this might not work perfectly with FastAPI
-        application = app
\ No newline at end of file
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from main import app
+
+# Passenger speaks WSGI, so the ASGI app has to be adapted ASGI -> WSGI (a2wsgi).
+# This runs one request at a time per Passenger process; for real concurrency serve
+# the app with the multi-worker launcher instead: python serve.py --port 8000
+try:
+    from a2wsgi import ASGIMiddleware
+except ImportError as e:
+    # Passenger cannot call the raw ASGI app - refuse to load rather than fail on every request
+    raise RuntimeError(f"a2wsgi is not installed ({e}) - run `pip install -r requirements.txt`") from e
+
+application = ASGIMiddleware(app)
@@ -1,8 +1,12 @@
 # persons/crud.py
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from typing import List, Optional
 from datetime import date, datetime
+import entity_cache
+import negative_cache
+import search_cache
 from . import models, schemas
 
 def calculate_age_bracket(birth_date: date) -> str:
@@ -34,7 +38,26 @@ def calculate_age_bracket(birth_date: date) -> str:
 
 def get_person(db: Session, record_id: int) -> Optional[models.Person]:
     """Get a single person by ID"""
-    return db.query(models.Person).filter(models.Person.record_id == record_id).first()
+    return entity_cache.get_one(
+        db, models.Person, record_id,
+        lambda: db.query(models.Person).filter(models.Person.record_id == record_id).first()
+    )
+
+# Answers "definitely not registered" for new NICs without a query
+nic_index = negative_cache.register(models.Person.nic)
+
+def get_person_by_nic(db: Session, nic: str, exclude_id: Optional[int] = None) -> Optional[models.Person]:
+    """Get the person holding a NIC (other than exclude_id)"""
+    if not nic_index.might_exist(nic):
+        return None
+    generation = nic_index.generation
+    query = db.query(models.Person).filter(models.Person.nic == nic)
+    if exclude_id is not None:
+        query = query.filter(models.Person.record_id != exclude_id)
+    person = query.first()
+    if person is None and exclude_id is None:
+        nic_index.record_miss(nic, generation)
+    return person
 
 def get_persons(db: Session, skip: int = 0, limit: int = 100) -> List[models.Person]:
     """Get persons with pagination"""
@@ -114,13 +137,55 @@ def search_persons(db: Session, search_term: str) -> List[models.Person]:
 
 def get_persons_by_city(db: Session, city: str) -> List[models.Person]:
     """Get persons by base city"""
-    return db.query(models.Person).filter(
-        or_(
-            models.Person.base_city == city,
-            models.Person.birth_city == city
-        )
-    ).all()
+    return db.query(models.Person).filter(models.Person.base_city == city).all()
 
 def get_persons_by_community(db: Session, community: str) -> List[models.Person]:
     """Get persons by community"""
-    return db.query(models.Person).filter(models.Person.community == community).all()
\ No newline at end of file
+    return db.query(models.Person).filter(models.Person.community == community).all()
+
+
+# Async read operations (used by the async GET routes)
+async def get_person_async(db: AsyncSession, record_id: int) -> Optional[models.Person]:
+    """Get a single person by ID"""
+    async def load():
+        result = await db.execute(select(models.Person).where(models.Person.record_id == record_id))
+        return result.scalars().first()
+    return await entity_cache.get_one_async(db, models.Person, record_id, load)
+
+async def get_persons_async(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Person]:
+    """Get persons with pagination"""
+    result = await db.execute(select(models.Person).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def get_all_persons_async(db: AsyncSession) -> List[models.Person]:
+    """Get all persons"""
+    result = await db.execute(select(models.Person))
+    return list(result.scalars().all())
+
+PERSON_SEARCH_FIELDS = ("person_print_name", "full_name", "nic")
+
+async def search_persons_async(db: AsyncSession, search_term: str) -> List[models.Person]:
+    """Search persons by name or NIC"""
+    async def load():
+        search_pattern = f"%{search_term}%"
+        result = await db.execute(
+            select(models.Person).where(
+                or_(
+                    models.Person.person_print_name.ilike(search_pattern),
+                    models.Person.full_name.ilike(search_pattern),
+                    models.Person.nic.ilike(search_pattern)
+                )
+            )
+        )
+        return list(result.scalars().all())
+    return await search_cache.search_async(db, models.Person, search_term, PERSON_SEARCH_FIELDS, load)
+
+async def get_persons_by_city_async(db: AsyncSession, city: str) -> List[models.Person]:
+    """Get persons by base city"""
+    result = await db.execute(select(models.Person).where(models.Person.base_city == city))
+    return list(result.scalars().all())
+
+async def get_persons_by_community_async(db: AsyncSession, community: str) -> List[models.Person]:
+    """Get persons by community"""
+    result = await db.execute(select(models.Person).where(models.Person.community == community))
+    return list(result.scalars().all())
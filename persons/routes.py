@@ -1,8 +1,9 @@
 # persons/routes.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_async_read_db
 from . import crud, schemas
 from audit_logs.utils import create_audit_logs_for_create, create_audit_logs_for_update, create_audit_logs_for_delete, model_to_dict
 
@@ -16,7 +17,7 @@ def create_person(person: schemas.PersonCreate, db: Session = Depends(get_db)):
         
         # Check if NIC already exists (if provided)
         if person.nic:
-            existing_person = db.query(crud.models.Person).filter(crud.models.Person.nic == person.nic).first()
+            existing_person = crud.get_person_by_nic(db, person.nic)
             if existing_person:
                 raise HTTPException(status_code=400, detail=f"Person with NIC {person.nic} already exists")
         
@@ -44,10 +45,10 @@ def create_person(person: schemas.PersonCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=f"Error creating person: {str(e)}")
 
 @router.get("/", response_model=List[schemas.Person])
-def read_persons(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_persons(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_read_db)):
     """Get persons with pagination"""
     try:
-        persons = crud.get_persons(db, skip=skip, limit=limit)
+        persons = await crud.get_persons_async(db, skip=skip, limit=limit)
         # Fix age_bracket validation issues
         for person in persons:
             if hasattr(person, 'age_bracket') and person.age_bracket == "":
@@ -58,7 +59,7 @@ def read_persons(skip: int = 0, limit: int = 100, db: Session = Depends(get_db))
         # If enum validation fails, try to get data without age_bracket filter
         try:
             from sqlalchemy import text
-            result = db.execute(text("""
+            result = await db.execute(text("""
                 SELECT person_id, person_print_name, full_name, gender, living_status,
                        professional_status, religion, community, base_city, attached_companies,
                        department, designation, date_of_birth, 
@@ -83,9 +84,9 @@ def read_persons(skip: int = 0, limit: int = 100, db: Session = Depends(get_db))
             raise HTTPException(status_code=500, detail="Error retrieving persons")
 
 @router.get("/all", response_model=List[schemas.Person])
-def read_all_persons(db: Session = Depends(get_db)):
+async def read_all_persons(db: AsyncSession = Depends(get_async_read_db)):
     """Get all persons"""
-    persons = crud.get_all_persons(db)
+    persons = await crud.get_all_persons_async(db)
     # Fix age_bracket validation issues
     for person in persons:
         if hasattr(person, 'age_bracket') and person.age_bracket == "":
@@ -93,11 +94,11 @@ def read_all_persons(db: Session = Depends(get_db)):
     return persons
 
 @router.get("/search", response_model=List[schemas.Person])
-def search_persons(q: str = Query(..., description="Search term"), db: Session = Depends(get_db)):
+async def search_persons(q: str = Query(..., description="Search term"), db: AsyncSession = Depends(get_async_read_db)):
     """Search persons by name or NIC"""
     # If empty search, return all persons (limited)
     if len(q.strip()) == 0:
-        persons = crud.get_persons(db, skip=0, limit=50)  # Return first 50 persons
+        persons = await crud.get_persons_async(db, skip=0, limit=50)  # Return first 50 persons
         # Fix age_bracket validation issues
         for person in persons:
             if hasattr(person, 'age_bracket') and person.age_bracket == "":
@@ -108,7 +109,7 @@ def search_persons(q: str = Query(..., description="Search term"), db: Session =
     if len(q.strip()) < 2:
         raise HTTPException(status_code=400, detail="Search term must be at least 2 characters")
     
-    persons = crud.search_persons(db, q)
+    persons = await crud.search_persons_async(db, q)
     # Fix age_bracket validation issues
     for person in persons:
         if hasattr(person, 'age_bracket') and person.age_bracket == "":
@@ -116,15 +117,15 @@ def search_persons(q: str = Query(..., description="Search term"), db: Session =
     return persons
 
 @router.get("/by-city/{city}", response_model=List[schemas.Person])
-def get_persons_by_city(city: str, db: Session = Depends(get_db)):
+async def get_persons_by_city(city: str, db: AsyncSession = Depends(get_async_read_db)):
     """Get persons by city"""
-    persons = crud.get_persons_by_city(db, city)
+    persons = await crud.get_persons_by_city_async(db, city)
     return persons
 
 @router.get("/by-community/{community}", response_model=List[schemas.Person])
-def get_persons_by_community(community: str, db: Session = Depends(get_db)):
+async def get_persons_by_community(community: str, db: AsyncSession = Depends(get_async_read_db)):
     """Get persons by community"""
-    persons = crud.get_persons_by_community(db, community)
+    persons = await crud.get_persons_by_community_async(db, community)
     return persons
 
 @router.get("/cities")
@@ -133,10 +134,10 @@ def get_available_cities():
     return {"cities": schemas.PAKISTANI_CITIES}
 
 @router.get("/{person_id}", response_model=schemas.Person)
-def read_person(person_id: int, db: Session = Depends(get_db)):
+async def read_person(person_id: int, db: AsyncSession = Depends(get_async_read_db)):
     """Get a specific person by ID"""
     try:
-        db_person = crud.get_person(db, record_id=person_id)
+        db_person = await crud.get_person_async(db, record_id=person_id)
         if db_person is None:
             raise HTTPException(status_code=404, detail="Person not found")
         
@@ -163,10 +164,7 @@ def update_person(person_id: int, person: schemas.PersonUpdate, db: Session = De
         # Check if NIC is being changed and if it already exists
         update_data = person.model_dump(exclude_unset=True)
         if "nic" in update_data and update_data["nic"]:
-            existing_with_nic = db.query(crud.models.Person).filter(
-                crud.models.Person.nic == update_data["nic"],
-                crud.models.Person.record_id != person_id
-            ).first()
+            existing_with_nic = crud.get_person_by_nic(db, update_data["nic"], exclude_id=person_id)
             if existing_with_nic:
                 raise HTTPException(status_code=400, detail=f"Another person with NIC {update_data['nic']} already exists")
         
@@ -0,0 +1,86 @@
+# query_stats.py
+"""
+Per-request SQL instrumentation: statement count, DB time and repeated statement shapes
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Warn when a single statement shape runs more than this many times in one request (likely N+1)
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "10"))
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number_literal = re.compile(r"\b\d+(?:\.\d+)?\b")
+_in_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_whitespace = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """Reduce a SQL statement to its shape (literals and IN-lists collapsed)"""
+    shape = _string_literal.sub("?", statement)
+    shape = _number_literal.sub("?", shape)
+    shape = shape.replace("%s", "?")
+    shape = _in_list.sub("(?)", shape)
+    return _whitespace.sub(" ", shape).strip()
+
+class QueryStats:
+    """Statements issued while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = None):
+        """Statement shapes that ran more than threshold times"""
+        threshold = SQL_REPEAT_THRESHOLD if threshold is None else threshold
+        return [(shape, n) for shape, n in self.fingerprints.most_common() if n > threshold]
+
+def start_request():
+    """Begin collecting statements for the current request, returns (token, stats)"""
+    stats = QueryStats()
+    return _current_stats.set(stats), stats
+
+def finish_request(token, label: str = ""):
+    """Stop collecting and warn about repeated statement shapes"""
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+    if stats is not None:
+        for shape, n in stats.repeated():
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", label, n, shape[:300])
+    return stats
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+def instrument_engine(engine):
+    """Attach the cursor execute hooks to a sync Engine (use async_engine.sync_engine for async)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
@@ -0,0 +1 @@
+# reference/__init__.py
@@ -0,0 +1,150 @@
+# reference/bundle.py
+"""
+All dropdown / reference data in one pre-serialized, pre-compressed, content-hashed bundle.
+Rebuilt only when the industries table version changes (the rest is static per deploy), and
+shared with other workers and later restarts through a memory-mapped snapshot file - which is
+only trusted while its static part matches this deploy's (fingerprinted) one.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from enum import Enum
+from typing import Dict, List, Optional, Tuple, Union
+from sqlalchemy.orm import Session
+import cache_versions
+from . import snapshot
+from .schemas import Department
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_SNAPSHOT_ENABLED = os.getenv("REFERENCE_SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+class ReferenceBundle:
+    """Serialized bundle: identical data gives an identical version in every worker"""
+
+    def __init__(self, body: Union[bytes, memoryview], gzip_body: Union[bytes, memoryview], version: str,
+                 source_version: Tuple[int, int], source: str = "database"):
+        self.body = body
+        self.gzip_body = gzip_body
+        self.version = version
+        self.source_version = source_version
+        self.source = source
+        self.built_at = time.time()
+
+    @classmethod
+    def from_payload(cls, payload: Dict, source_version: Tuple[int, int]) -> "ReferenceBundle":
+        body = _serialize(payload)
+        gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        return cls(body, gzip_body, hashlib.sha256(body).hexdigest()[:16], source_version)
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "url": f"/reference/{self.version}",
+            "bytes": len(self.body),
+            "gzip_bytes": len(self.gzip_body),
+            "source": self.source,
+            "built_at": self.built_at,
+        }
+
+_bundle: Optional[ReferenceBundle] = None
+_lock = threading.Lock()
+_static: Optional[Tuple[Dict, str]] = None
+
+def _serialize(payload: Dict) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _enum_values(module) -> Dict[str, List[str]]:
+    return {
+        name: [member.value for member in value]
+        for name, value in sorted(vars(module).items())
+        if isinstance(value, type) and issubclass(value, Enum) and value not in (Enum, Department)
+        and value.__module__ == module.__name__
+    }
+
+def static_payload() -> Tuple[Dict, str]:
+    """(departments / cities / enums, their fingerprint) - fixed for the life of the process"""
+    global _static
+    if _static is None:
+        payload = _static_payload()
+        _static = (payload, hashlib.sha256(_serialize(payload)).hexdigest()[:16])
+    return _static
+
+def _static_payload() -> Dict:
+    from companies import schemas as company_schemas
+    from groups import schemas as group_schemas
+    from divisions import schemas as division_schemas
+    from persons import schemas as person_schemas
+    from emails import schemas as email_schemas
+    from cell_phones import schemas as phone_schemas
+
+    return {
+        "departments": [d.value for d in Department],
+        "cities": person_schemas.PAKISTANI_CITIES,
+        "enums": {
+            "companies": _enum_values(company_schemas),
+            "groups": _enum_values(group_schemas),
+            "divisions": _enum_values(division_schemas),
+            "persons": _enum_values(person_schemas),
+            "emails": _enum_values(email_schemas),
+            "cell_phones": _enum_values(phone_schemas),
+        },
+    }
+
+def build_payload(db: Session) -> Dict:
+    from industries import crud as industry_crud
+    return {**static_payload()[0], "industries": industry_crud.build_industry_tree(db)}
+
+def source_version() -> Tuple[int, int]:
+    """(epoch, industries) versions this worker has applied - the forced coherence check first
+    drops cached industries another worker changed, so a rebuild never reads older rows"""
+    vf = cache_versions.versions()
+    if vf is None:
+        return (0, 0)
+    vf.check(force=True)
+    return (vf.seen_version(cache_versions.EPOCH), vf.seen_version("industries"))
+
+def _from_snapshot(version: Tuple[int, int]) -> Optional[ReferenceBundle]:
+    """The bundle another worker (or an earlier run) wrote for this version, mapped zero-copy"""
+    if not REFERENCE_SNAPSHOT_ENABLED:
+        return None
+    mapped = snapshot.read(snapshot.default_path())
+    # A snapshot from a deploy with other cities / enums / departments is not this bundle
+    if mapped is None or mapped.source_version != version or mapped.static_version != static_payload()[1]:
+        return None
+    return ReferenceBundle(mapped.body, mapped.gzip_body, mapped.version, version, source="snapshot")
+
+def _build(db: Session, version: Tuple[int, int]) -> ReferenceBundle:
+    bundle = ReferenceBundle.from_payload(build_payload(db), version)
+    if REFERENCE_SNAPSHOT_ENABLED:
+        try:
+            snapshot.write(snapshot.default_path(), bundle.body, bundle.gzip_body, bundle.version, version, static_payload()[1])
+        except OSError as e:
+            logger.warning("Could not write the reference snapshot: %s", e)
+    return bundle
+
+def current(db: Session) -> ReferenceBundle:
+    """The bundle for the current industries version - from the snapshot, or rebuilt with db"""
+    global _bundle
+    version = source_version()
+    bundle = _bundle
+    if bundle is not None and bundle.source_version == version:
+        return bundle
+    with _lock:
+        if _bundle is None or _bundle.source_version != version:
+            _bundle = _from_snapshot(version) or _build(db, version)
+        return _bundle
+
+def clear():
+    """Forget the bundle and its snapshot - the next request rebuilds it from the database"""
+    global _bundle
+    with _lock:
+        _bundle = None
+        try:
+            os.unlink(snapshot.default_path())
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,39 @@
+# reference/routes.py
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from database import get_db
+from . import bundle
+
+router = APIRouter()
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Bundles are built from the primary: they are keyed on the primary's industries version and
+# cached for good, so a lagging replica would pin stale industries under the new version.
+
+@router.get("/")
+def get_reference_version(db: Session = Depends(get_db)):
+    """Current reference bundle version and its immutable URL"""
+    try:
+        info = bundle.current(db).info()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building reference data: {str(e)}")
+    return JSONResponse(content={"version": info["version"], "url": info["url"]}, headers={"Cache-Control": "no-cache"})
+
+@router.get("/{version}")
+def get_reference_bundle(version: str, request: Request, db: Session = Depends(get_db)):
+    """Departments, cities, industries tree and every dropdown enum in one cacheable response"""
+    try:
+        current = bundle.current(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building reference data: {str(e)}")
+    if version != current.version:
+        # Superseded (or unknown) version - point at the current one without caching the redirect
+        return RedirectResponse(url=f"/reference/{current.version}", status_code=307, headers={"Cache-Control": "no-cache"})
+
+    headers = {"Cache-Control": IMMUTABLE, "ETag": f'"{current.version}"', "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=current.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=current.body, media_type="application/json", headers=headers)
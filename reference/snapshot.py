@@ -0,0 +1,76 @@
+# reference/snapshot.py
+"""
+Memory-mapped snapshot of the serialized reference bundle, shared by every worker on the host
+and surviving restarts. A worker that rebuilds the bundle from the database writes it here
+(atomically, via rename); a starting worker maps the file and serves the bytes straight from
+the page cache - one copy for all workers, no MySQL round-trip while the industries version
+it was built from is still current and the deployed code gives the same static part
+(departments, cities, enums).
+
+Layout: header (magic, epoch version, industries version, bundle version, static part
+fingerprint, body length, gzip length), then the JSON body and its gzip encoding.
+"""
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DMREFSN2"
+HEADER = struct.Struct("<8sQQ16s16sII")
+
+def default_path() -> str:
+    """One snapshot per database, next to the cache version file"""
+    from database import SQLALCHEMY_DATABASE_URL
+    return os.getenv("REFERENCE_SNAPSHOT_FILE") or os.path.join(
+        tempfile.gettempdir(), f"dm_reference_{zlib.crc32(SQLALCHEMY_DATABASE_URL.encode()):08x}.snap"
+    )
+
+def write(path: str, body: bytes, gzip_body: bytes, version: str, source_version: Tuple[int, int], static_version: str):
+    """Replace the snapshot; readers keep their mapping of the previous file until they reload"""
+    header = HEADER.pack(MAGIC, source_version[0], source_version[1], version.encode("ascii"),
+                         static_version.encode("ascii"), len(body), len(gzip_body))
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(prefix=".dm_reference_", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(header)
+            handle.write(body)
+            handle.write(gzip_body)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+class Snapshot:
+    """Read-only mapping of a snapshot file; body / gzip_body are memoryviews into it"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as handle:
+            self.map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError("truncated reference snapshot")
+        magic, epoch, industries, version, static_version, body_size, gzip_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or len(self.map) != HEADER.size + body_size + gzip_size:
+            raise ValueError("invalid reference snapshot")
+        self.source_version = (epoch, industries)
+        self.version = version.decode("ascii")
+        self.static_version = static_version.decode("ascii")
+        view = memoryview(self.map)
+        self.body = view[HEADER.size:HEADER.size + body_size]
+        self.gzip_body = view[HEADER.size + body_size:]
+
+def read(path: str) -> Optional[Snapshot]:
+    """The mapped snapshot, or None if there is none (or it cannot be used)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return Snapshot(path)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring reference snapshot %s: %s", path, e)
+        return None
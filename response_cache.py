@@ -0,0 +1,72 @@
+# response_cache.py
+"""
+Pre-encoded responses for the versioned tree and full-list endpoints (etags.ETAG_TABLES).
+The first request for an (endpoint, query, data version) runs the route - ORM, pydantic,
+JSON - and its body is kept together with a gzip encoding; repeat reads are written out as
+raw bytes without touching the route. Keys carry the table versions, so a write makes the
+old entries unreachable; they also sit in per-table entity_cache namespaces that the write
+clears, which frees the memory right away.
+"""
+import gzip
+import os
+from typing import Dict, Optional, Tuple
+from starlette.responses import Response
+import entity_cache
+import etags
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "50"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+# Bodies smaller than this are not worth compressing
+RESPONSE_CACHE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_CACHE_GZIP_MIN_BYTES", "1024"))
+# Bodies larger than this are not kept
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+class EncodedResponse:
+    """A 200 response body in identity and (if worthwhile) gzip encoding"""
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= RESPONSE_CACHE_GZIP_MIN_BYTES else None
+
+    def to_response(self, accept_encoding: str) -> Response:
+        headers = {"Vary": "Accept-Encoding", "X-Response-Cache": "hit"}
+        if self.gzip_body is not None and "gzip" in accept_encoding:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+def _namespace(path: str) -> entity_cache.Namespace:
+    table = etags.ETAG_TABLES[path.rstrip("/")][0]
+    return entity_cache.namespace(
+        f"responses:{table}", table=table, per_key=False,
+        ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    )
+
+def key_for(path: str, query: str, variant: Tuple = ()) -> Optional[Tuple]:
+    """Cache key for a GET at the current data version, or None if the endpoint is not cacheable now"""
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    # The version this worker has applied (data_version forces the coherence check first), so
+    # a body built from caches that predate another worker's write never lands under its key
+    version = etags.data_version(path)
+    if version is None:
+        return None
+    return ("&".join(sorted(query.split("&"))) if query else "", version, *variant)
+
+def get(path: str, key: Tuple) -> Optional[EncodedResponse]:
+    return _namespace(path).get(path.rstrip("/"), key)
+
+def generation(path: str) -> int:
+    return _namespace(path).generation
+
+def put(path: str, key: Tuple, body: bytes, media_type: str, generation: int):
+    if len(body) <= RESPONSE_CACHE_MAX_BYTES:
+        _namespace(path).put(path.rstrip("/"), key, EncodedResponse(body, media_type), generation)
+
+def stats() -> Dict[str, Dict]:
+    return {
+        name: ns.stats()
+        for name, ns in sorted(entity_cache.namespaces().items()) if name.startswith("responses:")
+    }
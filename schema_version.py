@@ -0,0 +1,95 @@
+# schema_version.py
+"""
+Schema versioning: a one-row-per-migration metadata table replaces create_all at import time
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+from sqlalchemy import Table, Column, Integer, String, DateTime, select, func, inspect, text
+from database import Base
+
+schema_version_table = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+MODEL_MODULES = [
+    "companies.models",
+    "industries.models",
+    "groups.models",
+    "divisions.models",
+    "persons.models",
+    "audit_logs.models",
+    "emails.models",
+    "cell_phones.models",
+]
+
+def import_models():
+    """Register every model on Base.metadata"""
+    import importlib
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
+
+def _create_tables(connection):
+    import_models()
+    Base.metadata.create_all(bind=connection)
+
+def _create_industry_paths(connection):
+    # Idempotent: create the closure table if missing, then (re)fill it from industries.parent_id
+    import_models()
+    from industries import paths
+    from industries.models import IndustryPath
+    if not inspect(connection).has_table(IndustryPath.__tablename__):
+        IndustryPath.__table__.create(bind=connection)
+    paths.rebuild(connection)
+
+def _add_industry_depth(connection):
+    # Idempotent: add the column if missing, then (re)derive depth and category from industry_paths
+    import_models()
+    from industries import crud
+    if "depth" not in {column["name"] for column in inspect(connection).get_columns("industries")}:
+        connection.execute(text("ALTER TABLE industries ADD COLUMN depth INTEGER NOT NULL DEFAULT 0"))
+    crud.recompute_depths(connection)
+
+# Ordered (version, description, migration) entries - append, never edit applied ones
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "Create base tables", _create_tables),
+    (2, "Create industry_paths closure table", _create_industry_paths),
+    (3, "Add industries.depth", _add_industry_depth),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def current_version(connection) -> int:
+    """Highest applied migration, 0 when the metadata table does not exist yet"""
+    try:
+        return connection.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+    except Exception:
+        connection.rollback()
+        return 0
+
+def check_schema(engine) -> Tuple[int, int]:
+    """One cheap query: (database version, version this code expects)"""
+    with engine.connect() as connection:
+        return current_version(connection), SCHEMA_VERSION
+
+def migrate(engine) -> List[int]:
+    """Apply pending migrations in order, returns the versions applied"""
+    applied = []
+    with engine.begin() as connection:
+        if not inspect(connection).has_table(schema_version_table.name):
+            schema_version_table.create(bind=connection)
+        version = current_version(connection)
+        for migration_version, description, migration in MIGRATIONS:
+            if migration_version <= version:
+                continue
+            migration(connection)
+            connection.execute(schema_version_table.insert().values(
+                version=migration_version,
+                description=description,
+                applied_at=datetime.utcnow()
+            ))
+            applied.append(migration_version)
+    return applied
@@ -0,0 +1,100 @@
+# search_cache.py
+"""
+Result cache for the %term% search endpoints. Every row matching "abcd" also matches "abc",
+so a search is answered from the cached results of any shorter term it contains, filtered in
+memory - typing "ab", "abc", "abcd" costs one query. Entries live in entity_cache namespaces
+("search:<table>") that any write to the table clears, locally and in other workers.
+"""
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+import entity_cache
+
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "200"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "60"))
+# Larger result sets are not cached (a one-letter search on a big table)
+SEARCH_CACHE_MAX_ROWS = int(os.getenv("SEARCH_CACHE_MAX_ROWS", "500"))
+
+# Searches answered without a query, per table
+served_without_db: Dict[str, int] = {}
+
+def _namespace(model) -> entity_cache.Namespace:
+    table = model.__table__.name
+    return entity_cache.namespace(
+        f"search:{table}", table=table, per_key=False,
+        ttl=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX_ENTRIES,
+    )
+
+def _matches(row, needle: str, fields: Sequence[str]) -> bool:
+    return any(needle in (getattr(row, field) or "").lower() for field in fields)
+
+def _lookup(ns: entity_cache.Namespace, bind: str, term: str, fields: Sequence[str]) -> Optional[List]:
+    """Rows for term from the cache: an exact entry, or the longest cached term it contains"""
+    if "%" in term or "_" in term:
+        return None  # LIKE wildcards - the database decides
+    exact = ns.get(bind, term)
+    if exact is not None:
+        return exact
+    now = time.monotonic()
+    with ns.lock:
+        candidates = [
+            (key[1], value) for key, (stored_at, value) in ns.entries.items()
+            if key[0] == bind and key[1] in term and now - stored_at <= ns.ttl
+        ]
+    if not candidates:
+        return None
+    shorter, rows = max(candidates, key=lambda candidate: len(candidate[0]))
+    with ns.lock:
+        if (bind, shorter) in ns.entries:
+            ns.entries.move_to_end((bind, shorter))
+        ns.hits += 1
+        ns.misses -= 1  # the exact lookup above counted one
+    return [row for row in rows if _matches(row, term, fields)]
+
+def _store(db: Session, ns: entity_cache.Namespace, bind: str, term: str, rows: List, generation: int):
+    if len(rows) <= SEARCH_CACHE_MAX_ROWS and not entity_cache.has_pending_writes(db, ns.table):
+        ns.put(bind, term, [entity_cache.snapshot(row) for row in rows], generation)
+
+def _served(ns: entity_cache.Namespace):
+    served_without_db[ns.table] = served_without_db.get(ns.table, 0) + 1
+
+def search(db: Session, model, search_term: str, fields: Sequence[str], loader: Callable[[], List]) -> List:
+    """Cached loader() for a case-insensitive substring search over fields"""
+    if not entity_cache.ENTITY_CACHE_ENABLED:
+        return loader()
+    entity_cache.cache_versions.check()
+    ns = _namespace(model)
+    bind = entity_cache.bind_key(db)
+    term = search_term.lower()
+    rows = _lookup(ns, bind, term, fields)
+    if rows is not None:
+        _served(ns)
+        return [db.merge(row, load=False) for row in rows]
+    generation = ns.generation
+    rows = loader()
+    _store(db, ns, bind, term, rows, generation)
+    return rows
+
+async def search_async(db, model, search_term: str, fields: Sequence[str], loader: Callable[[], Awaitable[List]]) -> List:
+    """search() for an AsyncSession with an async loader"""
+    if not entity_cache.ENTITY_CACHE_ENABLED:
+        return await loader()
+    entity_cache.cache_versions.check()
+    ns = _namespace(model)
+    bind = entity_cache.bind_key(db)
+    term = search_term.lower()
+    rows = _lookup(ns, bind, term, fields)
+    if rows is not None:
+        _served(ns)
+        return [await db.merge(row, load=False) for row in rows]
+    generation = ns.generation
+    rows = await loader()
+    _store(db, ns, bind, term, rows, generation)
+    return rows
+
+def stats() -> Dict[str, Dict]:
+    return {
+        name: {**ns.stats(), "served_without_db": served_without_db.get(ns.table, 0)}
+        for name, ns in sorted(entity_cache.namespaces().items()) if name.startswith("search:")
+    }
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Production launcher: a pre-forking supervisor running N uvicorn worker processes
+
+    python serve.py --port 8000 --workers 4
+
+- workers default to WEB_CONCURRENCY or the CPU count
+- uvloop / httptools are used when installed, asyncio / h11 otherwise
+- the app is imported once in the supervisor (--preload) and forked into workers
+- each worker exits after --max-requests (+ jitter) requests and is replaced
+- SIGHUP performs a rolling restart with fresh code, SIGTERM / SIGINT drain and stop
+"""
+import argparse
+import importlib.util
+import os
+import random
+import signal
+import socket
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+APP_PATH = "main:app"
+
+def default_workers() -> int:
+    """Worker count sized to the machine (WEB_CONCURRENCY overrides)"""
+    return int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+def best_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+def best_http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+def load_app(fresh: bool = False):
+    """Import the ASGI app; fresh=True drops this project's modules first so new code is picked up"""
+    if fresh:
+        for name, module in list(sys.modules.items()):
+            module_file = getattr(module, "__file__", None) or ""
+            if module_file.startswith(BASE_DIR) and name not in (__name__, "__main__"):
+                del sys.modules[name]
+    module_name, attr = APP_PATH.split(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+def reset_pools_after_fork():
+    """Connections must never be shared between processes - drop any inherited from the supervisor"""
+    database = sys.modules.get("database")
+    if database is None:
+        return
+    for engine in {database.engine, database.read_engine}:
+        engine.dispose(close=False)
+    for async_engine in {database.async_engine, database.async_read_engine}:
+        async_engine.sync_engine.dispose(close=False)
+
+class Launcher:
+    """Fork, supervise and recycle uvicorn workers sharing one listening socket"""
+
+    def __init__(self, host: str, port: int, workers: int, preload: bool = True,
+                 max_requests: int = 10000, max_requests_jitter: int = 1000,
+                 graceful_timeout: int = 30, log_level: str = "info"):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.preload = preload
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.loop = best_loop()
+        self.http = best_http()
+        self.children = {}       # pid -> generation
+        self.generation = 0
+        self.app = None
+        self.sock = None
+        self._reload_requested = False
+        self._stop_requested = False
+
+    def log(self, message: str):
+        print(f"[launcher {os.getpid()}] {message}", flush=True)
+
+    def bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def spawn(self) -> int:
+        generation = self.generation
+        pid = os.fork()
+        if pid:
+            self.children[pid] = generation
+            return pid
+        # Worker process
+        exit_code = 0
+        try:
+            for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                signal.signal(sig, signal.SIG_DFL)
+            self.serve_worker(fresh=generation > 0 or not self.preload)
+        except Exception as e:
+            print(f"[worker {os.getpid()}] crashed: {e}", flush=True)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def serve_worker(self, fresh: bool):
+        import uvicorn
+        if fresh:
+            app = load_app(fresh=self.generation > 0)
+        else:
+            app = self.app
+            reset_pools_after_fork()
+        limit = None
+        if self.max_requests:
+            limit = self.max_requests + random.randint(0, max(self.max_requests_jitter, 0))
+        config = uvicorn.Config(
+            app,
+            loop=self.loop,
+            http=self.http,
+            lifespan="on",
+            log_level=self.log_level,
+            limit_max_requests=limit,
+            timeout_graceful_shutdown=self.graceful_timeout,
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def reap(self):
+        """Collect exited workers and replace them unless we are shutting down"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generation = self.children.pop(pid, None)
+            if generation is None:
+                continue
+            if not self._stop_requested and generation == self.generation:
+                self.log(f"worker {pid} exited ({os.waitstatus_to_exitcode(status)}), starting a replacement")
+                self.spawn()
+
+    def rolling_restart(self):
+        """Start a fresh worker for each old one, then retire the old one gracefully"""
+        self.generation += 1
+        old_pids = list(self.children)
+        self.log(f"reloading {len(old_pids)} workers (generation {self.generation})")
+        for pid in old_pids:
+            self.spawn()
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def stop(self):
+        self.log("shutting down workers")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + self.graceful_timeout + 5
+        while self.children and time.time() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, 0)
+                self.children.pop(pid, None)
+            except ChildProcessError:
+                break
+        for pid in list(self.children):
+            os.kill(pid, signal.SIGKILL)
+
+    def run(self):
+        self.sock = self.bind()
+        if self.preload:
+            started = time.perf_counter()
+            self.app = load_app()
+            self.log(f"preloaded {APP_PATH} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        self.log(f"listening on {self.host}:{self.port} with {self.workers} workers (loop={self.loop}, http={self.http})")
+
+        signal.signal(signal.SIGHUP, lambda *args: setattr(self, "_reload_requested", True))
+        signal.signal(signal.SIGTERM, lambda *args: setattr(self, "_stop_requested", True))
+        signal.signal(signal.SIGINT, lambda *args: setattr(self, "_stop_requested", True))
+
+        for _ in range(self.workers):
+            self.spawn()
+        try:
+            while not self._stop_requested:
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self.rolling_restart()
+                self.reap()
+                time.sleep(0.2)
+        finally:
+            self.stop()
+            self.sock.close()
+
+def run_single(host: str, port: int, workers: int, log_level: str):
+    """Platforms without fork (Windows): fall back to uvicorn's own multi-process mode"""
+    import uvicorn
+    uvicorn.run(APP_PATH, host=host, port=port, workers=workers, loop=best_loop(), http=best_http(), log_level=log_level)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Business Management API with multiple uvicorn workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "10000")),
+                        help="recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("MAX_REQUESTS_JITTER", "1000")))
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")))
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="import the app in each worker instead of once in the supervisor")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not hasattr(os, "fork"):
+        run_single(args.host, args.port, args.workers, args.log_level)
+    else:
+        Launcher(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            preload=args.preload,
+            max_requests=args.max_requests,
+            max_requests_jitter=args.max_requests_jitter,
+            graceful_timeout=args.graceful_timeout,
+            log_level=args.log_level,
+        ).run()
@@ -0,0 +1,110 @@
+# singleflight.py
+"""
+Request coalescing: concurrent identical GETs (same path and query) share one in-flight
+computation. Keys carry a per-scope generation that every write bumps, so a request that
+arrives after a write never joins a computation that started before it. The negotiation
+headers are part of the key, and a response that varies on any other header is not shared.
+"""
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from starlette.responses import Response
+
+# A write to the key scope also invalidates these (their responses embed its rows)
+RELATED_SCOPES: Dict[str, Tuple[str, ...]] = {
+    "companies": ("groups", "divisions", "emails", "cell-phones"),
+    "groups": ("companies",),
+    "divisions": ("companies",),
+    "persons": ("emails", "cell-phones"),
+}
+
+# Request headers responses may be negotiated on - requests that differ in these never share
+VARY_HEADERS: Tuple[str, ...] = ("accept", "accept-encoding", "accept-language")
+
+def scope_of(path: str) -> str:
+    """First path segment: /companies/tree -> companies"""
+    return path.strip("/").split("/", 1)[0]
+
+class SharedResponse:
+    """Fully buffered response that can be handed to every waiting request"""
+
+    def __init__(self, status_code: int, raw_headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status_code = status_code
+        self.raw_headers = raw_headers
+        self.body = body
+
+    @classmethod
+    async def read(cls, response) -> "SharedResponse":
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        return cls(response.status_code, list(response.headers.raw), body)
+
+    def shareable(self) -> bool:
+        """False if the response varies on a request header the key does not carry"""
+        for name, value in self.raw_headers:
+            if name.lower() == b"vary":
+                for header in value.decode("latin-1").split(","):
+                    if header.strip().lower() not in VARY_HEADERS:
+                        return False
+        return True
+
+    def to_response(self, coalesced: bool = False) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = list(self.raw_headers)
+        if coalesced:
+            response.raw_headers.append((b"x-coalesced", b"1"))
+        return response
+
+class SingleFlight:
+    """In-flight computations by key plus coalescing counters"""
+
+    def __init__(self):
+        self.generations: Counter = Counter()
+        self.in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.coalesced_by_path: Counter = Counter()
+
+    def key(self, path: str, query: str, variant: Iterable = (), headers=None) -> Tuple:
+        """headers: the request headers (a mapping), only VARY_HEADERS are used"""
+        scope = scope_of(path)
+        negotiated = tuple((headers or {}).get(name, "") for name in VARY_HEADERS)
+        return (scope, self.generations[scope], path, "&".join(sorted(query.split("&"))) if query else "", negotiated, *variant)
+
+    def invalidate(self, scope: str):
+        """Called after a write: later requests start a fresh computation"""
+        for name in (scope, *RELATED_SCOPES.get(scope, ())):
+            self.generations[name] += 1
+
+    async def do(self, key: Tuple, compute: Callable[[], Awaitable[SharedResponse]]) -> Tuple[Optional[SharedResponse], bool]:
+        """Run compute once per key; returns (result, coalesced). result is None if the leader failed."""
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            self.coalesced_by_path[key[2]] += 1
+            return await asyncio.shield(future), True
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        self.leaders += 1
+        try:
+            result = await compute()
+        except BaseException:
+            # Waiting requests retry on their own rather than inheriting this failure
+            future.set_result(None)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+        return result, False
+
+    def status(self) -> Dict:
+        return {
+            "in_flight": len(self.in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_by_path": dict(self.coalesced_by_path.most_common(20)),
+            "generations": dict(self.generations),
+        }
+
+requests = SingleFlight()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget report: how long each import and startup phase takes in a new worker
+
+Run `python startup.py` to print the report for a cold import of main.py, followed by the
+deferred router imports.
+"""
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Tuple
+
+# A freshly spawned worker should be able to serve within this many milliseconds
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+_started_at = time.perf_counter()
+_phases: List[Tuple[str, float]] = []
+
+@contextmanager
+def phase(name: str):
+    """Time a startup phase"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, time.perf_counter() - start))
+
+def import_module(name: str):
+    """Import a module and record what it cost (only the first import is expensive)"""
+    already_loaded = name in sys.modules
+    with phase(f"import {name}" + (" (cached)" if already_loaded else "")):
+        return importlib.import_module(name)
+
+def report() -> Dict[str, Any]:
+    """Phases sorted by cost, plus the total against the budget"""
+    total_ms = (time.perf_counter() - _started_at) * 1000
+    phases = sorted(_phases, key=lambda p: p[1], reverse=True)
+    return {
+        "total_ms": round(total_ms, 3),
+        "budget_ms": STARTUP_BUDGET_MS,
+        "within_budget": total_ms <= STARTUP_BUDGET_MS,
+        "phases": [{"name": name, "ms": round(seconds * 1000, 3)} for name, seconds in phases],
+    }
+
+def mark_ready():
+    """Freeze the total at the moment the app is ready to serve"""
+    global report_at_ready
+    report_at_ready = report()
+    return report_at_ready
+
+report_at_ready = None
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    # This file runs as __main__; main.py records its phases into the importable module
+    import startup as recorder
+    main = recorder.import_module("main")
+    ready = recorder.report()
+    # Not part of the time to serve - the warm-up loads the routers in the background
+    main.load_routers()
+    result = recorder.report()
+    print(f"Serving after: {ready['total_ms']:.1f} ms (budget {ready['budget_ms']:.0f} ms)")
+    print(f"With routers loaded: {result['total_ms']:.1f} ms")
+    for entry in result["phases"]:
+        print(f"  {entry['ms']:9.1f} ms  {entry['name']}")
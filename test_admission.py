@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test admission control / load shedding per route class
+"""
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from main import app
+import admission
+from industries import crud as industry_crud
+
+client = TestClient(app)
+
+def test_classify():
+    assert admission.classify("GET", "/companies/5") == admission.READS
+    assert admission.classify("GET", "/companies/search") == admission.READS
+    assert admission.classify("GET", "/companies/all") == admission.HEAVY
+    assert admission.classify("GET", "/industries/tree") == admission.HEAVY
+    assert admission.classify("GET", "/companies/tree") == admission.READS  # in-memory forest
+    assert admission.classify("GET", "/groups/tree/nodes") == admission.READS
+    assert admission.classify("GET", "/audit-logs/") == admission.HEAVY
+    assert admission.classify("POST", "/companies/") == admission.WRITES
+    assert admission.classify("DELETE", "/groups/3") == admission.WRITES
+    for path in ("/", "/health", "/health/db", "/ready", "/docs", "/openapi.json"):
+        assert admission.classify("GET", path) is None
+    assert admission.classify("OPTIONS", "/companies/") is None
+
+def test_limits_follow_pool_size():
+    limits = admission.default_limits()
+    assert limits[admission.READS] == admission.DB_POOL_SIZE + admission.DB_MAX_OVERFLOW
+    assert limits[admission.WRITES] == admission.DB_POOL_SIZE
+    assert limits[admission.HEAVY] >= admission.ADMISSION_HEAVY_FLOOR
+
+def test_excess_requests_are_shed_immediately(monkeypatch):
+    heavy = admission.route_classes[admission.HEAVY]
+    shed_before = heavy.shed
+    entered, release = threading.Event(), threading.Event()
+    original = industry_crud.get_all_industries
+
+    def blocking_get_all_industries(db, *args, **kwargs):
+        entered.set()
+        release.wait(5)
+        return original(db, *args, **kwargs)
+
+    monkeypatch.setattr(industry_crud, "get_all_industries", blocking_get_all_industries)
+    monkeypatch.setattr(heavy, "limit", 1)
+
+    results = {}
+    worker = threading.Thread(target=lambda: results.update(first=client.get("/industries/all")))
+    worker.start()
+    try:
+        assert entered.wait(5)
+        assert heavy.in_flight == 1
+        response = client.get("/companies/all")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(admission.ADMISSION_RETRY_AFTER)
+        # Other classes are unaffected
+        assert client.get("/industries/").status_code == 200
+    finally:
+        release.set()
+        worker.join(5)
+    assert results["first"].status_code == 200
+    assert heavy.in_flight == 0
+    assert heavy.shed == shed_before + 1
+
+def test_admission_metrics_endpoint():
+    response = client.get("/health/admission")
+    assert response.status_code == 200
+    classes = response.json()["classes"]
+    assert set(classes) == {admission.READS, admission.WRITES, admission.HEAVY}
+    for stats in classes.values():
+        assert {"limit", "in_flight", "peak", "admitted", "shed"} <= set(stats)
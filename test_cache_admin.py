@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the /admin/cache introspection and flush / warm endpoints
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from admin import routes as admin_routes
+import entity_cache
+
+client = TestClient(app, headers={"X-Admin-Token": "test-admin-token"})
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "test-admin-token")
+
+def create_person(name: str) -> int:
+    response = client.post("/persons/", json={"person_print_name": name, "full_name": name, "gender": "Female"})
+    assert response.status_code == 200
+    return response.json()["record_id"]
+
+def test_lists_namespaces_with_stats():
+    person_id = create_person("Admin Listed")
+    client.get(f"/persons/{person_id}")
+    client.get(f"/persons/{person_id}")
+    client.get("/reference/")
+
+    response = client.get("/admin/cache")
+    assert response.status_code == 200
+    body = response.json()
+    persons = body["namespaces"]["persons"]
+    assert persons["kind"] == "entity"
+    assert persons["entries"] >= 1 and persons["approx_bytes"] > 0
+    assert persons["hit_ratio"] is not None
+    assert {"evictions", "age_seconds"} <= set(persons)
+    assert body["namespaces"]["reference"]["entries"] == 1
+    assert body["total_approx_bytes"] >= persons["approx_bytes"]
+
+def test_flush_one_key_and_namespace():
+    kept = create_person("Admin Kept")
+    flushed = create_person("Admin Flushed")
+    client.get(f"/persons/{kept}")
+    client.get(f"/persons/{flushed}")
+
+    assert client.delete("/admin/cache/persons", params={"key": str(flushed)}).status_code == 200
+    assert client.get(f"/persons/{kept}").headers["X-DB-Queries"] == "0"
+    assert client.get(f"/persons/{flushed}").headers["X-DB-Queries"] != "0"
+
+    assert client.delete("/admin/cache/persons").status_code == 200
+    assert client.get("/admin/cache/persons").json()["entries"] == 0
+    assert client.delete("/admin/cache/no-such-cache").status_code == 404
+
+def test_keys_a_namespace_cannot_flush_are_rejected():
+    kept = create_person("Admin Key Check")
+    client.get("/persons/all")
+    client.get("/persons/all")
+    assert client.delete("/admin/cache/responses:persons", params={"key": "x"}).status_code == 400
+    assert client.get("/persons/all").headers["X-Response-Cache"] == "hit"  # nothing was flushed
+    assert client.delete("/admin/cache/forest:groups", params={"key": "abc"}).status_code == 400
+    assert client.delete("/admin/cache/reference", params={"key": "x"}).status_code == 400
+
+    client.get(f"/persons/{kept}")
+    response = client.delete("/admin/cache/persons", params={"key": "999999999"})
+    assert response.status_code == 404 and "not cached" in response.json()["detail"]
+    assert client.get(f"/persons/{kept}").headers["X-DB-Queries"] == "0"
+
+def test_warm_hook():
+    entity_cache.namespace("industries").clear()
+    response = client.post("/admin/cache/industries/warm")
+    assert response.status_code == 200
+    assert response.json()["stats"]["entries"] == 1
+    assert client.get("/industries/all").headers["X-DB-Queries"] == "0"
+    assert client.post("/admin/cache/persons/warm").status_code == 404
+
+def test_requires_a_configured_token(monkeypatch):
+    assert client.get("/admin/cache", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert TestClient(app).get("/admin/cache").status_code == 403
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", None)
+    response = client.get("/admin/cache")
+    assert response.status_code == 403  # fails closed rather than open
+    assert "ADMIN_TOKEN" in response.json()["detail"]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test cross-worker cache coherence through the shared version file, with real processes
+"""
+import sys
+import os
+import subprocess
+import tempfile
+import textwrap
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from database import SessionLocal
+from main import app
+import cache_versions
+import entity_cache
+from companies import crud as company_crud, schemas as company_schemas
+
+client = TestClient(app)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def run_worker(code: str):
+    """Run code in a separate Python process sharing this process's database and version file"""
+    env = dict(os.environ, CACHE_VERSION_FILE=cache_versions.versions().path)
+    subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=BASE_DIR, env=env, check=True, timeout=60)
+
+def test_slots_are_stable_across_processes():
+    output = subprocess.run([sys.executable, "-c", "import cache_versions; print(cache_versions.slot_of('companies'))"],
+                            cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+    assert int(output) == cache_versions.slot_of("companies")
+
+def test_bump_in_one_file_is_seen_by_another():
+    path = os.path.join(tempfile.mkdtemp(), "versions.bin")
+    writer = cache_versions.VersionFile(path, interval_ms=0)
+    reader = cache_versions.VersionFile(path, interval_ms=1000)
+    before = reader.version("persons")
+    writer.bump(["persons"])
+    assert reader.version("persons") != before
+    assert reader.check() == []  # within the interval nothing is read
+    assert reader.check(force=True) == [cache_versions.slot_of("persons")]
+    assert reader.check(force=True) == []
+
+def test_commit_in_another_process_drops_stale_namespace():
+    db = SessionLocal()
+    try:
+        company_id = company_crud.create_company(db, company_schemas.CompanyCreate(
+            company_group_print_name="Coherent Company", legal_name="Original Name"
+        )).record_id
+    finally:
+        db.close()
+
+    assert client.get(f"/companies/{company_id}").json()["legal_name"] == "Original Name"
+    assert client.get(f"/companies/{company_id}").headers["X-DB-Queries"] == "0"  # cached in this worker
+
+    run_worker(f"""
+        from database import SessionLocal
+        from companies import models
+        db = SessionLocal()
+        db.get(models.Company, {company_id}).legal_name = "Renamed Elsewhere"
+        db.commit()
+        db.close()
+    """)
+
+    cache_versions.versions().check(force=True)
+    response = client.get(f"/companies/{company_id}")
+    assert response.json()["legal_name"] == "Renamed Elsewhere"
+    assert entity_cache.stats()["coherence"]["stale_slots_dropped"] >= 1
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test per-router statement deadlines (SQLite progress handler locally)
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from database import SessionLocal
+from main import app
+import deadlines
+from audit_logs import crud as audit_crud
+from companies import crud as company_crud
+
+client = TestClient(app)
+
+# Counts to 50 million - takes several seconds unless the progress handler cancels it
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 50000000) "
+    "SELECT count(*) FROM n"
+)
+
+def test_sqlite_statement_is_cancelled_at_deadline():
+    token, deadline = deadlines.start_request()
+    db = SessionLocal()
+    try:
+        deadline.arm(50)
+        start = time.monotonic()
+        with pytest.raises(OperationalError):
+            db.execute(SLOW_QUERY)
+        assert time.monotonic() - start < 2
+        assert deadline.expired
+        # The connection stays usable and the handler is disarmed once the budget is gone
+        deadlines.finish_request(token)
+        token, deadline = deadlines.start_request()
+        db.rollback()
+        assert db.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        db.close()
+        deadlines.finish_request(token)
+
+def test_spent_budget_fails_before_sending():
+    token, deadline = deadlines.start_request()
+    db = SessionLocal()
+    try:
+        deadline.arm(0)
+        with pytest.raises(deadlines.DeadlineExceeded):
+            db.execute(text("SELECT 1"))
+        assert deadline.expired
+    finally:
+        db.close()
+        deadlines.finish_request(token)
+
+def test_mysql_select_gets_execution_time_hint():
+    class FakeConn:
+        info = {}
+        class dialect:
+            name = "mysql"
+
+    token, deadline = deadlines.start_request()
+    try:
+        deadline.arm(2000)
+        statement, _ = deadlines._before_cursor_execute(FakeConn, None, "SELECT id FROM companies LIMIT %s", (10,), None, False)
+        assert statement.startswith("SELECT /*+ MAX_EXECUTION_TIME(")
+        assert statement.endswith("*/ id FROM companies LIMIT %s")
+        statement, _ = deadlines._before_cursor_execute(FakeConn, None, "UPDATE companies SET x = 1", (), None, False)
+        assert statement == "UPDATE companies SET x = 1"
+    finally:
+        deadlines.finish_request(token)
+
+def test_sync_route_returns_503_when_deadline_hit(monkeypatch):
+    def slow_audit_logs(db, **kwargs):
+        deadlines.current_deadline().arm(50)  # shrink the router's budget for the test
+        return db.execute(SLOW_QUERY).all()
+
+    monkeypatch.setattr(audit_crud, "get_audit_logs", slow_audit_logs)
+    response = client.get("/audit-logs/", params={"skip": 1000000})
+    assert response.status_code == 503
+    assert "deadline" in response.json()["detail"]
+    assert response.headers["Retry-After"] == "1"
+
+def test_async_route_returns_503_when_deadline_hit(monkeypatch):
+    async def slow_all_companies(db):
+        deadlines.current_deadline().arm(50)
+        return (await db.execute(SLOW_QUERY)).all()
+
+    monkeypatch.setattr(company_crud, "get_all_companies_async", slow_all_companies)
+    response = client.get("/companies/all")
+    assert response.status_code == 503
+    assert "/companies/all" in response.json()["detail"]
+
+def test_routes_within_budget_are_unaffected():
+    assert client.get("/companies/all").status_code == 200
+    assert client.get("/audit-logs/").status_code == 200
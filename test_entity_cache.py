@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the in-process entity cache and its commit-driven invalidation
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from database import SessionLocal
+from main import app
+import entity_cache
+from companies import crud as company_crud, models as company_models, schemas as company_schemas
+from industries import crud as industry_crud, models as industry_models
+
+client = TestClient(app)
+
+def create_company(name: str) -> int:
+    db = SessionLocal()
+    try:
+        return company_crud.create_company(db, company_schemas.CompanyCreate(
+            company_group_print_name=name, legal_name=name, operations={"exports": True}
+        )).record_id
+    finally:
+        db.close()
+
+def test_second_read_is_served_from_cache():
+    company_id = create_company("Cached Company")
+    stats = entity_cache.namespace("companies")
+    client.get(f"/companies/{company_id}")
+    hits = stats.hits
+
+    response = client.get(f"/companies/{company_id}")
+    assert response.status_code == 200
+    assert response.json()["operations"]["exports"] is True
+    assert response.headers["X-DB-Queries"] == "0"
+    assert stats.hits == hits + 1
+
+    db = SessionLocal()
+    try:
+        # Sync callers get their own session-bound instance
+        company = company_crud.get_company(db, company_id)
+        assert company in db
+        assert company.legal_name == "Cached Company"
+    finally:
+        db.close()
+
+def test_commit_evicts_updated_row():
+    company_id = create_company("Before Update")
+    client.get(f"/companies/{company_id}")
+
+    db = SessionLocal()
+    try:
+        db.get(company_models.Company, company_id).legal_name = "After Update"
+        db.commit()
+    finally:
+        db.close()
+    assert client.get(f"/companies/{company_id}").json()["legal_name"] == "After Update"
+
+def test_list_entry_is_evicted_by_insert_and_not_polluted_by_rollback():
+    db = SessionLocal()
+    try:
+        industry_crud.get_all_industries(db)
+        db.add(industry_models.Industry(industry_name="Uncommitted Industry", category="Main Industry"))
+        db.flush()
+        names = [i.industry_name for i in industry_crud.get_all_industries(db)]
+        assert "Uncommitted Industry" in names
+        db.rollback()
+        names = [i.industry_name for i in industry_crud.get_all_industries(db)]
+        assert "Uncommitted Industry" not in names
+    finally:
+        db.close()
+
+    response = client.post("/industries/", json={"industry_name": "Committed Industry", "category": "Main Industry"})
+    assert response.status_code == 200
+    assert "Committed Industry" in [i["industry_name"] for i in client.get("/industries/all").json()]
+
+def test_lru_bound_and_ttl():
+    ns = entity_cache.Namespace("test", ttl=60, max_entries=2)
+    for key in (1, 2, 3):
+        ns.put("db", key, key, ns.generation)
+    assert ns.get("db", 1) is None
+    assert ns.get("db", 3) == 3
+    assert ns.evictions == 1
+
+    ns = entity_cache.Namespace("test", ttl=0.01, max_entries=2)
+    ns.put("db", 1, 1, ns.generation)
+    time.sleep(0.02)
+    assert ns.get("db", 1) is None
+    assert ns.expirations == 1
+
+def test_stale_load_is_not_stored():
+    ns = entity_cache.Namespace("test")
+    generation = ns.generation
+    ns.invalidate([1])
+    ns.put("db", 1, "stale", generation)
+    assert ns.get("db", 1) is None
+
+def test_cache_stats_endpoint():
+    response = client.get("/health/cache")
+    assert response.status_code == 200
+    companies = response.json()["namespaces"]["companies"]
+    assert {"entries", "hits", "misses", "hit_ratio", "evictions"} <= set(companies)
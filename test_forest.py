@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test the incrementally maintained company / group forests
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from database import SessionLocal, engine
+from main import app
+import forest
+import query_stats
+from groups import crud as group_crud, models as group_models, schemas as group_schemas
+
+client = TestClient(app)
+tree_of_groups = group_crud.group_forest
+
+def create_group(name: str, parent_id: int = None) -> int:
+    db = SessionLocal()
+    try:
+        return group_crud.create_group(db, group_schemas.GroupCreate(group_print_name=name, legal_name=name, parent_id=parent_id)).record_id
+    finally:
+        db.close()
+
+def find(nodes, group_id):
+    for node in nodes:
+        if node["record_id"] == group_id:
+            return node
+        found = find(node["children"], group_id)
+        if found is not None:
+            return found
+    return None
+
+def tree_with_query_count():
+    token, stats = query_stats.start_request()
+    try:
+        tree = group_crud.build_group_tree()
+    finally:
+        query_stats.finish_request(token)
+    return tree, stats.count
+
+def test_creates_are_applied_as_deltas():
+    root = create_group("Forest Root")
+    group_crud.build_group_tree()
+    loads = tree_of_groups.loads
+
+    child = create_group("Forest Child", root)
+    tree, queries = tree_with_query_count()
+    assert queries == 1  # only the new row is fetched
+    assert [c["record_id"] for c in find(tree, root)["children"]] == [child]
+    assert tree_with_query_count()[1] == 0
+    assert tree_of_groups.loads == loads
+
+def test_move_touches_only_the_moved_node():
+    old_parent = create_group("Old Parent")
+    new_parent = create_group("New Parent")
+    moved = create_group("Moved", old_parent)
+    create_group("Moved Grandchild", moved)
+    group_crud.build_group_tree()
+    loads = tree_of_groups.loads
+
+    db = SessionLocal()
+    try:
+        group_crud.update_group_parent(db, moved, new_parent)
+    finally:
+        db.close()
+    tree = group_crud.build_group_tree()
+    assert find(tree, old_parent)["children"] == []
+    moved_node = find(tree, new_parent)["children"][0]
+    assert moved_node["record_id"] == moved
+    assert [c["group_print_name"] for c in moved_node["children"]] == ["Moved Grandchild"]
+    assert tree_of_groups.loads == loads
+
+def test_delete_removes_the_subtree():
+    root = create_group("Doomed Root")
+    child = create_group("Doomed Child", root)
+    group_crud.build_group_tree()
+    db = SessionLocal()
+    try:
+        assert group_crud.delete_group(db, root)
+    finally:
+        db.close()
+    tree = group_crud.build_group_tree()
+    assert find(tree, root) is None and find(tree, child) is None
+    assert child not in tree_of_groups.nodes
+
+def test_checksum_detects_writes_that_bypass_the_orm(monkeypatch):
+    root = create_group("Drift Root")
+    group_crud.build_group_tree()
+    with engine.begin() as connection:
+        connection.execute(group_models.Group.__table__.insert().values(
+            Group_Print_Name="Raw Child", Legal_Name="Raw Child", Parent_ID=root, Living_Status="Active"
+        ))
+    drift = tree_of_groups.drift_detected
+
+    monkeypatch.setattr(forest, "FOREST_VERIFY_SECONDS", 0)
+    tree = group_crud.build_group_tree()
+    assert tree_of_groups.drift_detected == drift + 1
+    assert [c["group_print_name"] for c in find(tree, root)["children"]] == ["Raw Child"]
+
+def test_bulk_statement_marks_the_forest_stale_on_commit():
+    root = create_group("Bulk Root")
+    group_crud.build_group_tree()
+    Group = group_models.Group
+    db = SessionLocal()
+    try:
+        db.execute(update(Group).where(Group.record_id == root).values(group_print_name="Bulk Rolled Back"))
+        assert not tree_of_groups.stale  # a reload now would still read the old row
+        db.rollback()
+        assert not tree_of_groups.stale
+
+        db.execute(update(Group).where(Group.record_id == root).values(group_print_name="Bulk Renamed"))
+        assert not tree_of_groups.stale
+        db.commit()
+        assert tree_of_groups.stale
+    finally:
+        db.close()
+    assert find(group_crud.build_group_tree(), root)["group_print_name"] == "Bulk Renamed"
+
+def test_read_holds_the_lock():
+    root = create_group("Locked Root")
+    assert tree_of_groups.read(lambda view: (tree_of_groups.lock.locked(), root in view)) == (True, True)
+
+def test_tree_endpoint_and_admin_listing(monkeypatch):
+    from admin import routes as admin_routes
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "test-admin-token")
+    root = create_group("Endpoint Root")
+    create_group("Endpoint Child", root)
+    response = client.get("/groups/tree")
+    assert response.status_code == 200
+    assert find(response.json(), root)["children"][0]["group_print_name"] == "Endpoint Child"
+    assert client.get("/admin/cache/forest:groups", headers={"X-Admin-Token": "test-admin-token"}).json()["kind"] == "forest"
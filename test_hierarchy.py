@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test the single-query hierarchy engine and the /tree routes built on it
+"""
+import sys
+import os
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from database import SessionLocal
+from main import app
+import entity_cache
+import hierarchy
+import query_stats
+import response_cache
+from companies import crud as company_crud
+from groups import crud as group_crud, schemas as group_schemas
+from divisions import crud as division_crud, schemas as division_schemas
+from industries import crud as industry_crud, schemas as industry_schemas
+
+client = TestClient(app)
+
+def node(record_id, parent_id=None):
+    return SimpleNamespace(record_id=record_id, parent_id=parent_id, name=f"n{record_id}")
+
+def count_queries(func):
+    token, stats = query_stats.start_request()
+    try:
+        func()
+    finally:
+        query_stats.finish_request(token)
+    return stats.count
+
+def test_forest_subtree_ancestors_and_depths():
+    tree = hierarchy.Hierarchy([node(5, 1), node(1), node(2, 1), node(3, 2), node(4), node(9, 404)])
+    assert tree.roots() == [1, 4]
+    assert tree.children_of(1) == [2, 5]
+    assert tree.descendants(1) == [2, 5, 3]
+    assert tree.ancestors(3) == [2, 1]
+    assert tree.depths() == {1: 0, 4: 0, 2: 1, 5: 1, 3: 2}
+    assert tree.is_descendant(3, 1) and not tree.is_descendant(1, 3)
+    assert tree.subtree(2, lambda row: {"name": row.name}) == {"name": "n2", "children": [{"name": "n3", "children": []}]}
+    forest = tree.forest(lambda row: {"id": row.record_id})
+    assert [root["id"] for root in forest] == [1, 4]  # 9 hangs under a missing parent
+
+    tree.upsert(node(2, 4))  # move 2 (and 3 with it) under 4
+    assert tree.children_of(1) == [5] and tree.children_of(4) == [2]
+    assert tree.ancestors(3) == [2, 4]
+
+def test_cycles_and_deep_chains_are_safe():
+    tree = hierarchy.Hierarchy([node(1, 2), node(2, 1)])
+    assert tree.ancestors(1) == [2]
+    assert tree.descendants(1) == [2]
+    chain = hierarchy.Hierarchy([node(1)] + [node(i, i - 1) for i in range(2, 3001)])
+    assert chain.depth(3000) == 2999
+    deepest = chain.forest(lambda row: {})[0]
+    for _ in range(2999):
+        deepest = deepest["children"][0]
+    assert deepest["children"] == []
+
+def grow(n: int):
+    """Add n groups, n industries and n divisions, half of each nested under the previous one"""
+    db = SessionLocal()
+    try:
+        group_parent = industry_parent = division_parent = None
+        for i in range(n):
+            group = group_crud.create_group(db, group_schemas.GroupCreate(group_print_name=f"H Group {i}", legal_name="H", parent_id=group_parent))
+            industry = industry_crud.create_industry(db, industry_schemas.IndustryCreate(industry_name=f"H Industry {i}", category="x", parent_id=industry_parent))
+            division = division_crud.create_division(db, division_schemas.DivisionCreate(
+                division_print_name=f"H Division {i}", legal_name="H",
+                parent_id=division_parent or group.record_id, parent_type="Division" if division_parent else "Group",
+            ))
+            if i % 2 == 0:
+                group_parent, industry_parent, division_parent = group.record_id, industry.id, division.record_id
+    finally:
+        db.close()
+
+def tree_query_counts():
+    db = SessionLocal()
+    try:
+        entity_cache.clear()
+        for tree in (company_crud.company_forest, group_crud.group_forest):
+            tree.invalidate()
+        return {
+            "companies": count_queries(company_crud.build_company_tree),
+            "groups": count_queries(group_crud.build_group_tree),
+            "industries": count_queries(lambda: industry_crud.build_industry_tree(db)),
+            "divisions": count_queries(lambda: division_crud.build_division_tree(db)),
+            "industry level": count_queries(lambda: industry_crud.get_industry_level(db, 1)),
+        }
+    finally:
+        db.close()
+
+def test_query_count_does_not_grow_with_the_tree():
+    grow(2)
+    small = tree_query_counts()
+    grow(30)
+    assert tree_query_counts() == small
+    assert all(count == 1 for count in small.values())
+
+def test_division_tree_route(monkeypatch):
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", False)
+    grow(3)
+    response = client.get("/divisions/tree")
+    assert response.status_code == 200
+    names = {root["division_print_name"]: root for root in response.json()}
+    assert [c["division_print_name"] for c in names["H Division 0"]["children"]] == ["H Division 1", "H Division 2"]
+    assert response.headers["X-DB-Queries"] == "1"
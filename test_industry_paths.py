@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test the industry_paths closure table and industries.depth: maintenance on create / move / delete and one-query lookups
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import literal, select, text
+from fastapi.testclient import TestClient
+from main import app
+from database import SessionLocal, engine, make_engine
+import query_stats
+import schema_version
+from industries import crud as industry_crud, models as industry_models, paths, schemas as industry_schemas
+
+client = TestClient(app)
+
+def create(db, name, parent_id=None):
+    return industry_crud.create_industry(db, industry_schemas.IndustryCreate(industry_name=name, category="x", parent_id=parent_id))
+
+def stored_paths(db):
+    return set(db.execute(select(
+        industry_models.IndustryPath.ancestor_id, industry_models.IndustryPath.descendant_id, industry_models.IndustryPath.depth
+    )).all())
+
+def expected_paths(db):
+    industries = industry_crud.load_industry_hierarchy(db)
+    expected = set()
+    for industry_id in industries.rows:
+        expected.add((industry_id, industry_id, 0))
+        for depth, ancestor_id in enumerate(industries.ancestors(industry_id), start=1):
+            expected.add((ancestor_id, industry_id, depth))
+    return expected
+
+def count_queries(fn):
+    token, stats = query_stats.start_request()
+    try:
+        fn()
+    finally:
+        query_stats.finish_request(token, label="test")
+    return stats.count
+
+def test_paths_follow_create_move_and_delete():
+    db = SessionLocal()
+    try:
+        root = create(db, "Paths Root")
+        child = create(db, "Paths Child", root.id)
+        grandchild = create(db, "Paths Grandchild", child.id)
+        other = create(db, "Paths Other")
+        assert stored_paths(db) == expected_paths(db)
+        assert industry_crud.get_industry_level(db, grandchild.id) == 2
+        assert industry_crud.is_descendant(db, root.id, grandchild.id)
+        assert not industry_crud.is_descendant(db, grandchild.id, root.id)
+        assert [i.id for i in industry_crud.get_all_children(root.id, db)] == [child.id, grandchild.id]
+
+        industry_crud.update_industry_parent(db, industry_schemas.IndustryUpdateParent(id=child.id, new_parent_id=other.id))
+        assert stored_paths(db) == expected_paths(db)
+        assert industry_crud.get_all_children(root.id, db) == []
+        db.refresh(grandchild)
+        assert grandchild.category == "sub-sub"
+
+        other_id, grandchild_id = other.id, grandchild.id
+        assert industry_crud.delete_industry(db, other_id) == 3
+        assert stored_paths(db) == expected_paths(db)
+        assert industry_crud.get_industry(db, grandchild_id) is None
+        assert industry_crud.delete_industry(db, other_id) == 0
+    finally:
+        db.close()
+
+def test_lookups_are_one_query_at_any_depth():
+    db = SessionLocal()
+    try:
+        chain = []
+        for i in range(20):
+            chain.append(create(db, f"Paths Chain {i}", chain[-1] if chain else None).id)
+        top, deepest = chain[0], chain[-1]
+        assert count_queries(lambda: industry_crud.get_industry_level(db, deepest)) == 1
+        assert count_queries(lambda: industry_crud.is_descendant(db, top, deepest)) == 1
+        assert count_queries(lambda: industry_crud.get_all_children(top, db)) == 1
+        assert count_queries(lambda: paths.subtree(db, top)) == 1
+        assert industry_crud.is_descendant(db, top, deepest)
+        assert industry_crud.get_industry_level(db, deepest) == 19
+    finally:
+        db.close()
+
+def test_delete_route_reports_subtree_size():
+    db = SessionLocal()
+    try:
+        root_id = create(db, "Paths Route Root").id
+        create(db, "Paths Route Child", create(db, "Paths Route Mid", root_id).id)
+    finally:
+        db.close()
+    response = client.delete(f"/industries/{root_id}")
+    assert response.status_code == 200
+    assert response.json()["deleted_count"] == 3
+    assert client.delete(f"/industries/{root_id}").status_code == 404
+
+def test_migration_is_idempotent_and_backfills():
+    db = SessionLocal()
+    try:
+        create(db, "Paths Backfill Child", create(db, "Paths Backfill Root").id)
+        expected = expected_paths(db)
+    finally:
+        db.close()
+    with engine.begin() as connection:
+        connection.execute(industry_models.IndustryPath.__table__.delete())
+    for _ in range(2):
+        with engine.begin() as connection:
+            schema_version._create_industry_paths(connection)
+    db = SessionLocal()
+    try:
+        assert stored_paths(db) == expected
+    finally:
+        db.close()
+
+def test_category_expression_matches_python_labels():
+    db = SessionLocal()
+    try:
+        for level in range(26):
+            assert db.execute(select(industry_crud.category_expression(literal(level)))).scalar() == industry_crud.get_category_by_level(level)
+    finally:
+        db.close()
+
+def test_moving_a_branch_recategorizes_in_one_statement():
+    db = SessionLocal()
+    try:
+        target = create(db, "Depth Target")
+        branch = create(db, "Depth Branch")
+        parent = branch.id
+        for i in range(15):
+            parent = create(db, f"Depth Node {i}", parent if i % 2 else branch.id).id
+        branch_id, target_id = branch.id, target.id
+        token, stats = query_stats.start_request()
+        try:
+            industry_crud.update_industry_and_children_categories(db, branch_id, 1)
+        finally:
+            query_stats.finish_request(token, label="test")
+        assert stats.count == 1
+        db.rollback()
+
+        industry_crud.update_industry_parent(db, industry_schemas.IndustryUpdateParent(id=branch_id, new_parent_id=target_id))
+        subtree = dict(paths.subtree(db, branch_id))
+        for industry in industry_crud.get_all_children(target_id, db):
+            db.refresh(industry)
+            assert industry.depth == subtree[industry.id] + 1
+            assert industry.category == industry_crud.get_category_by_level(industry.depth)
+    finally:
+        db.close()
+
+def test_depth_migration_adds_the_column_and_backfills():
+    legacy = make_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'legacy.db')}")
+    with legacy.begin() as connection:
+        connection.execute(text("CREATE TABLE industries (id INTEGER PRIMARY KEY, industry_name VARCHAR(255) NOT NULL, category VARCHAR(100) NOT NULL, parent_id INTEGER)"))
+        connection.execute(text("INSERT INTO industries VALUES (1, 'A', 'wrong', NULL), (2, 'B', 'wrong', 1), (3, 'C', 'wrong', 2)"))
+        schema_version._create_industry_paths(connection)
+    for _ in range(2):
+        with legacy.begin() as connection:
+            schema_version._add_industry_depth(connection)
+    with legacy.connect() as connection:
+        rows = connection.execute(text("SELECT id, depth, category FROM industries ORDER BY id")).all()
+    assert [tuple(row) for row in rows] == [(1, 0, "Main Industry"), (2, 1, "sub"), (3, 2, "sub-sub")]
+    legacy.dispose()
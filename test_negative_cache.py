@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the negative-result cache behind the email / phone / NIC duplicate checks
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from database import SessionLocal
+from main import app
+import negative_cache
+import query_stats
+from emails import crud as email_crud, schemas as email_schemas
+from persons import crud as person_crud
+
+client = TestClient(app)
+
+def count_queries(func):
+    token, stats = query_stats.start_request()
+    try:
+        result = func()
+    finally:
+        query_stats.finish_request(token)
+    return result, stats.count
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = negative_cache.BloomFilter(2000)
+    values = [f"user{i}@example.com" for i in range(2000)]
+    for value in values:
+        bloom.add(value)
+    assert all(value in bloom for value in values)
+    false_positives = sum(f"other{i}@example.com" in bloom for i in range(2000))
+    assert false_positives < 100
+
+def test_loaded_filter_answers_misses_without_a_query():
+    db = SessionLocal()
+    try:
+        email_crud.create_email(db, email_schemas.EmailDirectoryCreate(email_address="Existing@Example.com"))
+        negative_cache.load_all(db)
+
+        result, queries = count_queries(lambda: email_crud.get_email_by_address(db, "brand-new@example.com"))
+        assert result is None and queries == 0
+
+        result, queries = count_queries(lambda: email_crud.get_email_by_address(db, "EXISTING@example.com"))
+        assert result is not None and queries == 1
+
+        # Inserted after the load: the flush hook adds it to the filter
+        email_crud.create_email(db, email_schemas.EmailDirectoryCreate(email_address="later@example.com"))
+        assert email_crud.get_email_by_address(db, "later@example.com") is not None
+    finally:
+        db.close()
+    assert email_crud.email_address_index.stats()["served_without_db"] >= 1
+
+def test_miss_list_is_cleared_by_insert():
+    index = negative_cache.UniqueIndex(person_crud.models.Person.nic)
+    index.record_miss("35202-0000000-1", index.generation)
+    assert not index.might_exist("35202-0000000-1")
+    index.added("35202-0000000-1")
+    assert index.might_exist("35202-0000000-1")
+
+def test_miss_from_a_query_older_than_an_insert_is_not_recorded():
+    index = negative_cache.UniqueIndex(person_crud.models.Person.nic)
+    generation = index.generation  # lookup query starts
+    index.added("35202-0000000-2")  # an insert commits in this worker meanwhile
+    index.record_miss("35202-0000000-2", generation)
+    assert index.might_exist("35202-0000000-2")
+
+def test_loaded_filter_ignores_the_miss_list():
+    index = negative_cache.UniqueIndex(person_crud.models.Person.nic)
+    index.record_miss("35202-0000000-3", index.generation)
+    db = SessionLocal()
+    try:
+        index.load(db)
+    finally:
+        db.close()
+    index.bloom.add("35202-0000000-3")  # e.g. inserted by a session whose flush the miss predates
+    assert index.might_exist("35202-0000000-3")
+
+def test_stale_filter_falls_back_to_the_database():
+    index = negative_cache.UniqueIndex(person_crud.models.Person.nic)
+    db = SessionLocal()
+    try:
+        index.load(db)
+    finally:
+        db.close()
+    assert not index.might_exist("99999-9999999-9")
+    index.stale = True  # as after a commit in another worker
+    assert index.might_exist("99999-9999999-9")
+
+def test_duplicate_nic_is_still_rejected():
+    person = {"person_print_name": "NIC Holder", "full_name": "NIC Holder", "gender": "Male", "nic": "42101-1234567-1"}
+    assert client.post("/persons/", json=person).status_code == 200
+    response = client.post("/persons/", json={**person, "person_print_name": "NIC Copy"})
+    assert response.status_code == 400
+    assert "already exists" in response.json()["detail"]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the pool health subsystem and the /health/db endpoint
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from database import engine, async_engine, async_read_engine, get_db, pool_pinger
+from main import app
+
+client = TestClient(app)
+
+def test_get_db_issues_no_statements():
+    """get_db must not spend a round-trip on SELECT 1"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        generator = get_db()
+        db = next(generator)
+        assert db is not None
+        generator.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements == []
+
+def test_health_db_reports_pool_stats():
+    """The endpoint exposes checked-out, overflow and wait-time stats"""
+    client.get("/companies/all")
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    body = response.json()
+    sync_pool = body["sync_pool"]
+    for key in ("pool_size", "checked_out", "overflow", "checked_in", "wait"):
+        assert key in sync_pool
+    assert sync_pool["wait"]["checkouts"] >= 1
+    assert "pinger" in body
+
+def test_pinger_pings_idle_connections():
+    """ping_idle visits every checked-in connection without errors"""
+    with engine.connect():
+        pass
+    idle = engine.pool.checkedin()
+    assert pool_pinger.ping_idle() == idle
+    assert pool_pinger.status()["failures"] == 0
+
+def test_startup_report_lists_router_imports():
+    """The startup budget report shows per-module import cost"""
+    report = client.get("/health/startup").json()["current"]
+    names = [phase["name"] for phase in report["phases"]]
+    assert any(name.startswith("import companies.routes") for name in names)
+    assert report["total_ms"] > 0
+
+def test_async_pools_keep_checkout_pings():
+    """The background pinger only covers the sync pools, so the async ones must ping on checkout"""
+    assert async_engine.pool._pre_ping
+    assert async_read_engine.pool._pre_ping
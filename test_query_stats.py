@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test per-request SQL instrumentation and N+1 detection
+"""
+import sys
+import os
+import logging
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from database import SessionLocal
+from main import app
+import query_stats
+from groups import crud as group_crud, schemas as group_schemas
+
+client = TestClient(app)
+
+def test_fingerprint_collapses_literals():
+    assert query_stats.fingerprint("SELECT * FROM t WHERE id = 5") == query_stats.fingerprint("SELECT *  FROM t\nWHERE id = 17")
+    assert query_stats.fingerprint("SELECT 1 FROM t WHERE name = 'a' AND id IN (1, 2, 3)") == "SELECT ? FROM t WHERE name = ? AND id IN (?)"
+
+def test_headers_on_sync_and_async_routes():
+    for path in ("/groups/all", "/companies/"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert int(response.headers["X-DB-Queries"]) >= 1
+        assert float(response.headers["X-DB-Time"]) >= 0
+
+    response = client.get("/health")
+    assert response.headers["X-DB-Queries"] == "0"
+
+def test_repeated_statements_are_flagged(caplog, monkeypatch):
+    db = SessionLocal()
+    try:
+        parent = group_crud.create_group(db, group_schemas.GroupCreate(group_print_name="Stats Root", legal_name="Stats Root"))
+        children = [
+            group_crud.create_group(db, group_schemas.GroupCreate(group_print_name=f"Stats Child {i}", legal_name="Child", parent_id=parent.record_id))
+            for i in range(4)
+        ]
+        db.expire_all()
+
+        monkeypatch.setattr(query_stats, "SQL_REPEAT_THRESHOLD", 3)
+        token, stats = query_stats.start_request()
+        with caplog.at_level(logging.WARNING, logger="query_stats"):
+            try:
+                # One children lookup per node - the shape the tree endpoints used to have
+                for child in [parent] + children:
+                    group_crud.get_group_children(db, child.record_id)
+            finally:
+                query_stats.finish_request(token, label="GET /groups/tree")
+    finally:
+        db.close()
+    assert stats.count >= 5
+    assert any("Possible N+1 in GET /groups/tree" in record.message for record in caplog.records)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test read-replica routing with two local SQLite files standing in for primary and replica
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+import database
+from database import Base, make_engine, make_async_engine, make_async_sessionmaker, to_async_url
+from main import app
+from industries import models as industry_models
+from companies import models as company_models
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Route reads to a separate SQLite file seeded with replica-only rows"""
+    replica_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'replica.db')}"
+    replica_engine = make_engine(replica_url)
+    Base.metadata.create_all(bind=replica_engine)
+    ReplicaSession = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    db = ReplicaSession()
+    db.add(industry_models.Industry(industry_name="Replica Only Industry", category="Main Industry"))
+    db.add(company_models.Company(company_group_print_name="Replica Only Company", legal_name="Replica",
+                                  company_group_data_type="Company", uid="RP-01"))
+    db.commit()
+    db.close()
+
+    async_replica_engine = make_async_engine(to_async_url(replica_url))
+    monkeypatch.setattr(database, "ReadSessionLocal", ReplicaSession)
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", make_async_sessionmaker(async_replica_engine))
+    yield
+    replica_engine.dispose()
+
+def industry_names(client):
+    return [i["industry_name"] for i in client.get("/industries/all").json()]
+
+def test_reads_go_to_replica(replica):
+    client = TestClient(app)
+    assert "Replica Only Industry" in industry_names(client)
+    companies = [c["company_group_print_name"] for c in client.get("/companies/all").json()]
+    assert "Replica Only Company" in companies
+
+def test_write_pins_client_to_primary(replica):
+    client = TestClient(app)
+    response = client.post("/industries/", json={"industry_name": "Primary Industry", "category": "Main Industry"})
+    assert response.status_code == 200
+    assert database.PRIMARY_PIN_HEADER in response.headers
+
+    # The pin cookie sends this client's reads to the primary, where its write is visible
+    names = industry_names(client)
+    assert "Primary Industry" in names
+    assert "Replica Only Industry" not in names
+
+    # A different client is not pinned and keeps reading from the replica
+    assert "Primary Industry" not in industry_names(TestClient(app))
+
+def test_pin_header_is_honoured(replica):
+    client = TestClient(app)
+    until = client.post("/industries/", json={"industry_name": "Header Pin", "category": "Main Industry"}).headers[database.PRIMARY_PIN_HEADER]
+    fresh_client = TestClient(app)
+    response = fresh_client.get("/industries/all", headers={database.PRIMARY_PIN_HEADER: until})
+    assert "Header Pin" in [i["industry_name"] for i in response.json()]
+    response = fresh_client.get("/industries/all", headers={database.PRIMARY_PIN_HEADER: "0"})
+    assert "Header Pin" not in [i["industry_name"] for i in response.json()]
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test the versioned /reference bundle
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from main import app
+from reference.schemas import Department
+from persons import schemas as person_schemas
+from emails import schemas as email_schemas
+from cell_phones import schemas as phone_schemas
+
+client = TestClient(app)
+
+def current_url() -> str:
+    response = client.get("/reference/")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+    return response.json()["url"]
+
+def test_department_enum_is_shared():
+    assert person_schemas.Department is Department
+    assert email_schemas.Department is Department
+    assert phone_schemas.Department is Department
+
+def test_bundle_contents_and_headers():
+    url = current_url()
+    response = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "immutable" in response.headers["Cache-Control"]
+    assert response.headers["ETag"] == f'"{url.rsplit("/", 1)[1]}"'
+    bundle = response.json()
+    assert bundle["departments"] == [d.value for d in Department]
+    assert bundle["cities"] == person_schemas.PAKISTANI_CITIES
+    assert isinstance(bundle["industries"], list)
+    assert "Male" in bundle["enums"]["persons"]["Gender"]
+    assert "Department" not in bundle["enums"]["emails"]
+
+def test_gzip_variant_is_precompressed():
+    url = current_url()
+    plain = client.get(url, headers={"Accept-Encoding": "identity"}).content
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == plain  # httpx decodes the gzip body
+    assert int(response.headers["Content-Length"]) < len(plain)
+
+def test_rebuilt_only_when_industries_change():
+    url = current_url()
+    response = client.post("/persons/", json={"person_print_name": "Reference Person", "full_name": "Reference Person", "gender": "Male"})
+    assert response.status_code == 200
+    assert current_url() == url
+
+    assert client.post("/industries/", json={"industry_name": "Reference Industry", "category": "Main Industry"}).status_code == 200
+    new_url = current_url()
+    assert new_url != url
+    names = [i["industry_name"] for i in client.get(new_url).json()["industries"]]
+    assert "Reference Industry" in names
+
+    # Superseded versions redirect to the current bundle instead of serving stale data
+    response = client.get(url, follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["Location"] == new_url
+
+def test_write_by_another_worker_is_not_bundled_from_stale_industries(monkeypatch):
+    import cache_versions
+    from sqlalchemy import text
+    from database import engine
+    from reference import snapshot
+
+    url = current_url()
+    vf = cache_versions.versions()
+    monkeypatch.setattr(vf, "interval", 3600)  # no throttled check would notice the write in time
+
+    # Another worker: commits outside this process's sessions and bumps the shared file
+    with engine.begin() as conn:
+        industry_id = conn.execute(text(
+            "INSERT INTO industries (industry_name, category, depth) VALUES ('Foreign Reference Industry', 'Main Industry', 0)"
+        )).lastrowid
+        conn.execute(text("INSERT INTO industry_paths (ancestor_id, descendant_id, depth) VALUES (:id, :id, 0)"), {"id": industry_id})
+    cache_versions.VersionFile(vf.path).bump(["industries"])
+
+    new_url = current_url()
+    assert new_url != url
+    names = [i["industry_name"] for i in client.get(new_url).json()["industries"]]
+    assert "Foreign Reference Industry" in names
+    assert snapshot.read(snapshot.default_path()).version == new_url.rsplit("/", 1)[1]
+
+def test_bundle_is_built_from_the_primary(monkeypatch):
+    import database
+    from reference import bundle
+
+    def replica_session():
+        raise AssertionError("the bundle must not be built from the replica")
+
+    monkeypatch.setattr(database, "ReadSessionLocal", replica_session)
+    monkeypatch.setattr(bundle, "REFERENCE_SNAPSHOT_ENABLED", False)
+    bundle._bundle = None
+    fresh_client = TestClient(app)  # not pinned to the primary by earlier writes
+    response = fresh_client.get("/reference/")
+    assert response.status_code == 200
+    assert fresh_client.get(response.json()["url"]).status_code == 200
+    bundle._bundle = None
+
+def test_new_worker_maps_the_snapshot_without_queries():
+    import query_stats
+    from database import SessionLocal
+    from reference import bundle, snapshot
+
+    url = current_url()
+    mapped = snapshot.read(snapshot.default_path())
+    assert mapped is not None and mapped.version == url.rsplit("/", 1)[1]
+
+    bundle._bundle = None  # as in a freshly started worker
+    db = SessionLocal()
+    token, stats = query_stats.start_request()
+    try:
+        fresh = bundle.current(db)
+    finally:
+        query_stats.finish_request(token)
+        db.close()
+    assert stats.count == 0
+    assert fresh.source == "snapshot"
+    assert isinstance(fresh.body, memoryview)
+    assert f"/reference/{fresh.version}" == url
+    assert client.get(url, headers={"Accept-Encoding": "identity"}).content == bytes(mapped.body)
+
+def test_snapshot_from_a_deploy_with_other_static_data_is_rebuilt(monkeypatch):
+    from database import SessionLocal
+    from reference import bundle, snapshot
+
+    url = current_url()
+    payload, _ = bundle.static_payload()
+    # The next deploy changed a static list: same industries version, different fingerprint
+    monkeypatch.setattr(bundle, "_static", ({**payload, "cities": payload["cities"] + ["New City"]}, "f" * 16))
+    bundle._bundle = None  # as in a freshly started worker
+    db = SessionLocal()
+    try:
+        fresh = bundle.current(db)
+    finally:
+        db.close()
+    assert fresh.source == "database"
+    assert f"/reference/{fresh.version}" != url
+    assert "New City" in client.get(f"/reference/{fresh.version}").json()["cities"]
+    assert snapshot.read(snapshot.default_path()).static_version == "f" * 16
+    bundle._bundle = None  # later tests run with this deploy's static data again
+
+def test_truncated_snapshot_is_ignored(tmp_path):
+    from reference import snapshot
+    path = str(tmp_path / "reference.snap")
+    snapshot.write(path, b"{}", b"", "0" * 16, (1, 2), "1" * 16)
+    assert snapshot.read(path).source_version == (1, 2)
+    assert snapshot.read(path).static_version == "1" * 16
+    with open(path, "r+b") as handle:
+        handle.truncate(10)
+    assert snapshot.read(path) is None
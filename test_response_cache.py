@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the pre-encoded response cache for tree and full-list endpoints
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from main import app
+from database import engine
+import cache_versions
+import response_cache
+
+client = TestClient(app)
+
+def create_group(name: str):
+    response = client.post("/groups/", json={"group_print_name": name, "legal_name": name})
+    assert response.status_code == 200
+
+def test_repeat_read_is_served_as_stored_bytes():
+    create_group("Encoded Group")
+    first = client.get("/groups/tree")
+    assert first.status_code == 200
+    assert "X-Response-Cache" not in first.headers
+
+    second = client.get("/groups/tree")
+    assert second.headers["X-Response-Cache"] == "hit"
+    assert "X-DB-Queries" not in second.headers  # the route did not run
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+def test_gzip_variant(monkeypatch):
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_GZIP_MIN_BYTES", 1)
+    # New version: the entry below is encoded with the patched threshold
+    person = {"person_print_name": "Gzip Person", "full_name": "Gzip Person", "gender": "Male"}
+    assert client.post("/persons/", json=person).status_code == 200
+    plain = client.get("/persons/all", headers={"Accept-Encoding": "identity"})
+    response = client.get("/persons/all", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["X-Response-Cache"] == "hit"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == plain.content  # httpx decodes the gzip body
+
+def test_write_changes_the_data_version():
+    client.get("/groups/tree")
+    assert client.get("/groups/tree").headers["X-Response-Cache"] == "hit"
+    create_group("Newer Group")
+    response = client.get("/groups/tree")
+    assert "X-Response-Cache" not in response.headers
+    assert "Newer Group" in [g["group_print_name"] for g in response.json()]
+
+def test_query_parameters_are_part_of_the_key():
+    client.get("/groups/tree")
+    assert "X-Response-Cache" not in client.get("/groups/tree?view=compact").headers
+    assert client.get("/groups/tree?view=compact").headers["X-Response-Cache"] == "hit"
+
+def test_write_by_another_worker_is_not_served_from_the_old_tree(monkeypatch):
+    create_group("Coherent Tree Group")
+    assert client.get("/groups/tree").status_code == 200
+    assert client.get("/groups/tree").headers["X-Response-Cache"] == "hit"
+    vf = cache_versions.versions()
+    monkeypatch.setattr(vf, "interval", 3600)  # no throttled check would notice the write in time
+
+    # Another worker: commits outside this process's sessions and bumps the shared file
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO `groups` (Group_Print_Name, Legal_Name, Living_Status) VALUES ('Foreign Group', 'F', 'Active')"))
+    cache_versions.VersionFile(vf.path).bump(["groups"])
+
+    response = client.get("/groups/tree")
+    assert "X-Response-Cache" not in response.headers
+    assert "Foreign Group" in response.text
+    assert client.get("/groups/tree").headers["X-Response-Cache"] == "hit"
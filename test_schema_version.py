@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Test schema versioning and the migrate command
+"""
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+from sqlalchemy import inspect
+from database import make_engine
+import schema_version
+
+def test_migrate_fresh_database():
+    engine = make_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'fresh.db')}")
+    assert schema_version.check_schema(engine) == (0, schema_version.SCHEMA_VERSION)
+
+    applied = schema_version.migrate(engine)
+    assert applied == [version for version, _, _ in schema_version.MIGRATIONS]
+    assert schema_version.check_schema(engine) == (schema_version.SCHEMA_VERSION, schema_version.SCHEMA_VERSION)
+    assert "companies" in inspect(engine).get_table_names()
+
+    # Running again is a no-op
+    assert schema_version.migrate(engine) == []
+    engine.dispose()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test the prefix-reusing search result cache
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from main import app
+import search_cache
+
+client = TestClient(app)
+
+def create_group(name: str) -> int:
+    response = client.post("/groups/", json={"group_print_name": name, "legal_name": f"{name} Holdings"})
+    assert response.status_code == 200
+    return response.json()["record_id"]
+
+def search(path: str, q: str):
+    response = client.get(path, params={"q": q})
+    assert response.status_code == 200
+    return response
+
+def test_longer_term_is_filtered_from_the_cached_prefix():
+    create_group("Zephyr Textiles")
+    create_group("Zephyr Foods")
+    create_group("Zenith Steel")
+
+    first = search("/groups/search", "zep")
+    assert first.headers["X-DB-Queries"] == "1"
+    assert {g["group_print_name"] for g in first.json()} == {"Zephyr Textiles", "Zephyr Foods"}
+
+    served = search_cache.served_without_db.get("groups", 0)
+    narrowed = search("/groups/search", "Zephyr T")
+    assert narrowed.headers["X-DB-Queries"] == "0"
+    assert [g["group_print_name"] for g in narrowed.json()] == ["Zephyr Textiles"]
+    assert search("/groups/search", "zep").headers["X-DB-Queries"] == "0"
+    assert search_cache.served_without_db["groups"] == served + 2
+
+def test_write_invalidates_cached_searches():
+    create_group("Quasar Mills")
+    assert len(search("/groups/search", "quasar").json()) == 1
+    create_group("Quasar Traders")
+    response = search("/groups/search", "quasar m")
+    assert response.headers["X-DB-Queries"] == "1"
+    assert len(search("/groups/search", "quasar").json()) == 2
+
+def test_wildcards_go_to_the_database():
+    person = {"person_print_name": "Wild_Card Person", "full_name": "Wild Card Person", "gender": "Male"}
+    assert client.post("/persons/", json=person).status_code == 200
+    search("/persons/search", "wild")
+    response = search("/persons/search", "wild_")
+    assert response.headers["X-DB-Queries"] == "1"
+
+def test_size_limits(monkeypatch):
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_MAX_ROWS", 1)
+    create_group("Large Result One")
+    create_group("Large Result Two")
+    search("/groups/search", "large result")
+    # Too many rows to keep - the longer term still needs the database
+    assert search("/groups/search", "large result o").headers["X-DB-Queries"] == "1"
+
+    ns = search_cache.entity_cache.namespace("search:groups")
+    assert ns.max_entries == search_cache.SEARCH_CACHE_MAX_ENTRIES
+    assert len(ns.entries) <= ns.max_entries
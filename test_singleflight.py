@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test request coalescing for identical concurrent GETs
+"""
+import sys
+import os
+import asyncio
+import threading
+sys.path.append(os.path.dirname(__file__))
+
+import httpx
+from fastapi.testclient import TestClient
+from main import app
+import singleflight
+import response_cache
+from industries import crud as industry_crud
+
+client = TestClient(app)
+
+def block_industry_tree(monkeypatch):
+    """Make build_industry_tree wait for release; returns (calls, entered, release)"""
+    calls, entered, release = [], threading.Event(), threading.Event()
+    original = industry_crud.build_industry_tree
+
+    def blocking_tree(db):
+        calls.append(1)
+        entered.set()
+        release.wait(5)
+        return original(db)
+
+    monkeypatch.setattr(industry_crud, "build_industry_tree", blocking_tree)
+    # Stored responses would answer repeats before they reach the coalescing layer
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", False)
+    return calls, entered, release
+
+async def wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+def test_key_ignores_query_order_and_tracks_writes():
+    flight = singleflight.SingleFlight()
+    assert flight.key("/companies/all", "a=1&b=2") == flight.key("/companies/all", "b=2&a=1")
+    before = flight.key("/emails/all", "")
+    flight.invalidate("companies")
+    assert flight.key("/emails/all", "") != before
+    assert flight.key("/industries/tree", "") == flight.key("/industries/tree", "")
+
+def test_negotiated_headers_split_the_key():
+    flight = singleflight.SingleFlight()
+    gzip = flight.key("/reference/abc", "", headers={"accept-encoding": "gzip"})
+    assert gzip == flight.key("/reference/abc", "", headers={"accept-encoding": "gzip", "user-agent": "x"})
+    assert gzip != flight.key("/reference/abc", "", headers={"accept-encoding": "identity"})
+    assert gzip != flight.key("/reference/abc", "")
+
+def test_responses_varying_on_other_headers_are_not_shared():
+    def shared(vary):
+        return singleflight.SharedResponse(200, [(b"content-type", b"application/json"), (b"vary", vary)], b"{}")
+    assert shared(b"Accept-Encoding").shareable()
+    assert not shared(b"Accept-Encoding, Cookie").shareable()
+    assert not shared(b"*").shareable()
+    assert singleflight.SharedResponse(200, [], b"{}").shareable()
+
+def test_concurrent_identical_gets_share_one_computation(monkeypatch):
+    calls, entered, release = block_industry_tree(monkeypatch)
+    coalesced_before = singleflight.requests.coalesced
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            leader = asyncio.create_task(http.get("/industries/tree"))
+            await wait_for(entered.is_set)
+            followers = [asyncio.create_task(http.get("/industries/tree")) for _ in range(3)]
+            await wait_for(lambda: singleflight.requests.coalesced == coalesced_before + 3)
+            release.set()
+            return await leader, await asyncio.gather(*followers)
+
+    leader, followers = asyncio.run(run())
+    assert len(calls) == 1
+    assert leader.status_code == 200 and "x-coalesced" not in leader.headers
+    for response in followers:
+        assert response.status_code == 200
+        assert response.headers["x-coalesced"] == "1"
+        assert response.content == leader.content
+    assert client.get("/health/singleflight").json()["coalesced_by_path"]["/industries/tree"] >= 3
+
+def test_write_starts_a_new_flight(monkeypatch):
+    calls, entered, release = block_industry_tree(monkeypatch)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.get("/industries/tree"))
+            await wait_for(entered.is_set)
+            await http.post("/industries/", json={"industry_name": "Singleflight Write", "category": "Main Industry"})
+            second = asyncio.create_task(http.get("/industries/tree"))
+            await wait_for(lambda: len(calls) == 2)
+            release.set()
+            return await first, await second
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 2
+    assert "x-coalesced" not in second.headers
+    assert b"Singleflight Write" in second.content
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test set-based subtree deletion for companies and groups, with an audit row set per deleted node
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from main import app
+from database import SessionLocal
+import query_stats
+from audit_logs import crud as audit_crud
+from companies import crud as company_crud, schemas as company_schemas
+from groups import crud as group_crud, schemas as group_schemas
+
+client = TestClient(app)
+
+def create_group(db, name, parent_id=None) -> int:
+    return group_crud.create_group(db, group_schemas.GroupCreate(group_print_name=name, legal_name=name, parent_id=parent_id)).record_id
+
+def create_company(db, name, parent_id=None) -> int:
+    return company_crud.create_company(db, company_schemas.CompanyCreate(company_group_print_name=name, legal_name=name, parent_id=parent_id)).record_id
+
+def deleted_ids(db, table_name):
+    return {int(log.record_id) for log in audit_crud.get_audit_logs(db, limit=10000, table_name=table_name, action_type="DELETE")}
+
+def test_group_subtree_is_deleted_in_a_fixed_number_of_statements():
+    db = SessionLocal()
+    try:
+        root = create_group(db, "Subtree Root")
+        ids, parent = [root], root
+        for i in range(12):
+            ids.append(create_group(db, f"Subtree Node {i}", parent))
+            if i % 3 == 0:
+                parent = ids[-1]
+        keep = create_group(db, "Subtree Sibling")
+
+        token, stats = query_stats.start_request()
+        try:
+            assert group_crud.delete_group(db, root, user_id="tester") == len(ids)
+        finally:
+            query_stats.finish_request(token, label="test")
+        # snapshot, detach, delete and one audit insert, regardless of size
+        assert stats.count == 4
+
+        assert all(group_crud.get_group(db, group_id) is None for group_id in ids)
+        assert group_crud.get_group(db, keep) is not None
+        assert set(ids) <= deleted_ids(db, "groups")
+        assert group_crud.delete_group(db, root) == 0
+    finally:
+        db.close()
+
+def test_company_delete_route_audits_every_descendant():
+    db = SessionLocal()
+    try:
+        root = create_company(db, "Subtree Company")
+        child = create_company(db, "Subtree Company Child", root)
+        grandchild = create_company(db, "Subtree Company Grandchild", child)
+    finally:
+        db.close()
+
+    response = client.delete(f"/companies/{root}")
+    assert response.status_code == 200
+    assert response.json()["deleted_count"] == 3
+    assert client.delete(f"/companies/{root}").status_code == 404
+
+    db = SessionLocal()
+    try:
+        assert {root, child, grandchild} <= deleted_ids(db, "companies")
+        names = {log.old_value for log in audit_crud.get_audit_logs_for_record(db, "companies", str(grandchild))
+                 if log.field_name == "company_group_print_name"}
+        assert names == {"Subtree Company Grandchild"}
+    finally:
+        db.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the lazy, paginated /tree/nodes endpoints
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from main import app
+from database import SessionLocal
+import tree_nodes
+from hierarchy import Hierarchy
+from groups import crud as group_crud, schemas as group_schemas
+from industries import crud as industry_crud, schemas as industry_schemas
+
+client = TestClient(app)
+
+class Row:
+    def __init__(self, record_id, parent_id):
+        self.record_id, self.parent_id = record_id, parent_id
+
+def describe(row):
+    return {"name": f"Node {row.record_id}", "type": None}
+
+def test_keyset_pages_cover_every_sibling_once():
+    view = Hierarchy([Row(1, None)] + [Row(i, 1) for i in range(2, 30)])
+    seen, cursor = [], None
+    while True:
+        page = tree_nodes.expand(view, describe, parent_id=1, cursor=cursor, limit=8)
+        seen += [node["id"] for node in page["nodes"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(2, 30))
+
+def test_depth_expands_first_pages_and_respects_the_node_budget(monkeypatch):
+    view = Hierarchy([Row(1, None), Row(2, None)] + [Row(i, 1) for i in range(3, 10)] + [Row(i, 3) for i in range(10, 13)])
+    page = tree_nodes.expand(view, describe, depth=3, limit=5)
+    first = page["nodes"][0]
+    assert (first["child_count"], len(first["children"]), first["next_cursor"]) == (7, 5, 7)
+    assert [c["id"] for c in first["children"][0]["children"]] == [10, 11, 12]
+    assert page["nodes"][1]["children"] == [] and page["nodes"][1]["child_count"] == 0
+
+    monkeypatch.setattr(tree_nodes, "TREE_NODES_MAX_NODES", 4)
+    page = tree_nodes.expand(view, describe, depth=3, limit=5)
+    first = page["nodes"][0]
+    assert [c["id"] for c in first["children"]] == [3, 4] and first["next_cursor"] == 4
+    assert first["children"][0]["children"] == []
+
+def test_group_and_industry_routes():
+    db = SessionLocal()
+    try:
+        root = group_crud.create_group(db, group_schemas.GroupCreate(group_print_name="Nodes Root", legal_name="N")).record_id
+        children = [group_crud.create_group(db, group_schemas.GroupCreate(group_print_name=f"Nodes Child {i}", legal_name="N", parent_id=root)).record_id
+                    for i in range(3)]
+        industry = industry_crud.create_industry(db, industry_schemas.IndustryCreate(industry_name="Nodes Industry", category="x")).id
+        sub = industry_crud.create_industry(db, industry_schemas.IndustryCreate(industry_name="Nodes Sub", category="x", parent_id=industry)).id
+    finally:
+        db.close()
+
+    response = client.get("/groups/tree/nodes", params={"parent_id": root, "limit": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert [node["id"] for node in page["nodes"]] == children[:2]
+    assert page["nodes"][0] == {"id": children[0], "name": "Nodes Child 0", "type": "Group", "child_count": 0, "children": [], "next_cursor": None}
+    rest = client.get("/groups/tree/nodes", params={"parent_id": root, "limit": 2, "cursor": page["next_cursor"]}).json()
+    assert [node["id"] for node in rest["nodes"]] == children[2:] and rest["next_cursor"] is None
+
+    roots = client.get("/industries/tree/nodes", params={"depth": 2, "limit": 500}).json()["nodes"]
+    node = next(node for node in roots if node["id"] == industry)
+    assert (node["type"], node["child_count"]) == ("Main Industry", 1)
+    assert node["children"][0]["id"] == sub and node["children"][0]["type"] == "sub"
+
+    assert client.get("/groups/tree/nodes", params={"parent_id": 10**9}).status_code == 404
+    assert client.get("/companies/tree/nodes", params={"depth": 0}).status_code == 422
+    assert client.get("/companies/tree/nodes").status_code == 200
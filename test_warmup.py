@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the startup warm-up and the /ready endpoint
+"""
+import sys
+import os
+import subprocess
+import textwrap
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from fastapi.testclient import TestClient
+from main import app
+import warmup
+
+def test_ready_after_warmup(monkeypatch):
+    monkeypatch.setattr(warmup, "state", {"ready": False, "started_at": None, "finished_at": None, "steps": [], "errors": []})
+    assert TestClient(app).get("/ready").status_code == 503
+
+    with TestClient(app) as client:
+        deadline = time.time() + 10
+        while client.get("/ready").status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+        body = client.get("/ready").json()
+
+    assert body["status"] == "ready"
+    assert body["errors"] == []
+    names = [step["name"] for step in body["steps"]]
+    assert names[0] == "load routers"
+    assert "open pool connections" in names
+    assert "prime reference data" in names
+    assert "exercise response models" in names
+
+def test_pool_warmup_does_not_block_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+    loop_threads = []
+
+    def slow_open(engine, count):
+        loop_threads.append(threading.current_thread() is threading.main_thread())
+        time.sleep(0.2)
+        return 0
+
+    monkeypatch.setattr(warmup, "state", {"ready": False, "started_at": None, "finished_at": None, "steps": [], "errors": []})
+    monkeypatch.setattr(warmup, "open_pool_connections", slow_open)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await warmup.run()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 5
+    assert loop_threads == [False]
+
+def test_routers_load_after_the_worker_can_serve():
+    code = textwrap.dedent("""
+        import sys
+        from fastapi.testclient import TestClient
+        from main import app
+        assert "companies.routes" not in sys.modules
+        client = TestClient(app)
+        assert client.get("/health").status_code == 200
+        assert "companies.routes" not in sys.modules
+        assert client.get("/industries/").status_code == 200  # the first routed request loads them all
+        assert "companies.routes" in sys.modules and "health.routes" in sys.modules
+        assert client.get("/health/startup").status_code == 200
+        assert "/companies/tree" in client.get("/openapi.json").json()["paths"]
+    """)
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), check=True, timeout=60)
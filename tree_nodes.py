@@ -0,0 +1,69 @@
+# tree_nodes.py
+"""
+Lazy tree expansion for the UI: a page of lightweight nodes (id, name, type, child count)
+under one parent, expanded a bounded number of levels, served from the in-memory forests.
+Siblings are kept sorted by id, so pagination is keyset: the cursor is the last id seen.
+"""
+import bisect
+import os
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import BaseModel
+from hierarchy import Hierarchy
+
+TREE_NODES_MAX_DEPTH = int(os.getenv("TREE_NODES_MAX_DEPTH", "3"))
+TREE_NODES_MAX_LIMIT = int(os.getenv("TREE_NODES_MAX_LIMIT", "500"))
+# Deeper levels stop being expanded once a response holds this many nodes
+TREE_NODES_MAX_NODES = int(os.getenv("TREE_NODES_MAX_NODES", "2000"))
+
+class TreeNode(BaseModel):
+    id: int
+    name: str
+    type: Optional[str] = None
+    child_count: int
+    children: List['TreeNode'] = []  # empty until expanded: fetch with parent_id=id when child_count > 0
+    next_cursor: Optional[int] = None  # set when children holds only the first page
+
+class TreeNodePage(BaseModel):
+    parent_id: Optional[int] = None
+    nodes: List[TreeNode]
+    next_cursor: Optional[int] = None
+
+TreeNode.model_rebuild()
+
+def page_of(view: Hierarchy, parent_id: Optional[int], cursor: Optional[int], limit: int):
+    """(child ids after cursor, next cursor or None)"""
+    siblings = view.children.get(parent_id, [])
+    start = bisect.bisect_right(siblings, cursor) if cursor is not None else 0
+    ids = siblings[start:start + limit]
+    more = start + limit < len(siblings)
+    return ids, (ids[-1] if more and ids else None)
+
+def expand(
+    view: Hierarchy,
+    describe: Callable[[Any], Dict[str, Any]],
+    parent_id: Optional[int] = None,
+    depth: int = 1,
+    cursor: Optional[int] = None,
+    limit: int = 100,
+) -> Dict[str, Any]:
+    """
+    One page of parent_id's children (roots for None), each expanded depth - 1 more levels with
+    the first page of its own children. describe(row) gives the node's name and type.
+    """
+    ids, next_cursor = page_of(view, parent_id, cursor, limit)
+    result = {"parent_id": parent_id, "nodes": [], "next_cursor": next_cursor}
+    # Breadth first, so the node budget is spent on the upper levels
+    queue = deque((node_id, result["nodes"], 1) for node_id in ids)
+    emitted = 0
+    while queue:
+        node_id, siblings, level = queue.popleft()
+        children = view.children.get(node_id, [])
+        node = {"id": node_id, **describe(view.rows[node_id]), "child_count": len(children), "children": [], "next_cursor": None}
+        siblings.append(node)
+        emitted += 1
+        budget = min(limit, TREE_NODES_MAX_NODES - emitted - len(queue))
+        if level < depth and children and budget > 0:
+            child_ids, node["next_cursor"] = page_of(view, node_id, None, budget)
+            queue.extend((child_id, node["children"], level + 1) for child_id in child_ids)
+    return result
@@ -0,0 +1,136 @@
+# warmup.py
+"""
+Startup warm-up: load the routers, open pool connections, prime reference data and exercise
+response models before the worker reports itself ready on /ready
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Pool connections opened before the worker reports ready (capped at the pool size)
+DB_WARM_CONNECTIONS = int(os.getenv("DB_WARM_CONNECTIONS", "2"))
+
+state: Dict[str, Any] = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "steps": [],
+    "errors": [],
+}
+
+def _step(name: str, func: Callable):
+    start = time.perf_counter()
+    try:
+        detail = func()
+        state["steps"].append({"name": name, "ms": round((time.perf_counter() - start) * 1000, 3), "detail": detail})
+    except Exception as e:
+        logger.warning("Warm-up step %s failed: %s", name, e)
+        state["errors"].append({"name": name, "error": str(e)})
+
+def open_pool_connections(engine, count: int) -> int:
+    """Check out count connections at once so the pool holds that many idle ones afterwards"""
+    count = min(count, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+async def open_async_pool_connections(async_engine, count: int) -> int:
+    count = min(count, async_engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await async_engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+def prime_reference_data() -> Dict[str, Any]:
+    """Map (or build) the pre-serialized /reference bundle (industries tree, departments, cities, enums)"""
+    from database import ReadSessionLocal
+    from reference import bundle
+
+    db = ReadSessionLocal()
+    try:
+        info = bundle.current(db).info()
+    finally:
+        db.close()
+    return {"bytes": info["bytes"], "gzip_bytes": info["gzip_bytes"], "source": info["source"]}
+
+def load_uniqueness_filters() -> Dict[str, int]:
+    """Load the Bloom filters behind the email / phone / NIC duplicate checks (from the primary)"""
+    from database import SessionLocal
+    import negative_cache
+
+    db = SessionLocal()
+    try:
+        return negative_cache.load_all(db)
+    finally:
+        db.close()
+
+def exercise_response_models() -> List[str]:
+    """Validate and serialize one representative payload through each hot response model"""
+    from companies import schemas as company_schemas
+    from groups import schemas as group_schemas
+    from persons import schemas as person_schemas
+    from emails import schemas as email_schemas
+    from cell_phones import schemas as phone_schemas
+    from industries import schemas as industry_schemas
+
+    now = datetime.utcnow()
+    company = {"record_id": 1, "uid": "CM-01", "company_group_print_name": "Warm-up", "legal_name": "Warm-up"}
+    group = {"record_id": 1, "group_print_name": "Warm-up", "legal_name": "Warm-up", "created_at": now, "updated_at": now}
+    association = {"association_id": 1, "company_id": 1, "departments": ["Board Member"], "created_at": now}
+    samples = [
+        (company_schemas.CompanyWithChildren, {**company, "children": [{**company, "record_id": 2}]}),
+        (group_schemas.GroupWithChildren, {**group, "children": [{**group, "record_id": 2}]}),
+        (person_schemas.Person, {"record_id": 1, "person_print_name": "Warm-up", "full_name": "Warm-up", "gender": "Male"}),
+        (email_schemas.EmailWithAssociations, {"email_id": 1, "email_address": "warmup@example.com", "created_at": now,
+                                               "associations": [{**association, "email_id": 1}]}),
+        (phone_schemas.CellPhoneWithAssociations, {"phone_id": 1, "phone_number": "03000000000", "created_at": now,
+                                                   "associations": [{**association, "phone_id": 1}]}),
+        (industry_schemas.Industry, {"id": 1, "industry_name": "Warm-up", "category": "Main Industry"}),
+    ]
+    for model, payload in samples:
+        model.model_validate(payload).model_dump_json()
+    return [model.__name__ for model, _ in samples]
+
+async def run(load_routers: Callable[[], int] = None):
+    """Warm the worker up, then flip state["ready"]"""
+    from database import engine, async_engine, read_engine, async_read_engine
+
+    state["started_at"] = time.time()
+    if load_routers is not None:
+        # First: the uniqueness filters and forests below are registered by the route modules
+        await asyncio.to_thread(_step, "load routers", load_routers)
+    # Connecting to the remote MySQL blocks - keep it off the event loop
+    await asyncio.to_thread(_step, "open pool connections", lambda: open_pool_connections(engine, DB_WARM_CONNECTIONS))
+    if read_engine is not engine:
+        await asyncio.to_thread(_step, "open replica pool connections", lambda: open_pool_connections(read_engine, DB_WARM_CONNECTIONS))
+    for name, target in (("open async pool connections", async_engine),
+                         ("open async replica pool connections", async_read_engine if async_read_engine is not async_engine else None)):
+        if target is None:
+            continue
+        start = time.perf_counter()
+        try:
+            opened = await open_async_pool_connections(target, DB_WARM_CONNECTIONS)
+            state["steps"].append({"name": name, "ms": round((time.perf_counter() - start) * 1000, 3), "detail": opened})
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            state["errors"].append({"name": name, "error": str(e)})
+    await asyncio.to_thread(_step, "prime reference data", prime_reference_data)
+    await asyncio.to_thread(_step, "load uniqueness filters", load_uniqueness_filters)
+    _step("exercise response models", exercise_response_models)
+    state["finished_at"] = time.time()
+    state["ready"] = True
+    logger.info("Warm-up finished in %.0f ms", (state["finished_at"] - state["started_at"]) * 1000)